@@ -0,0 +1,305 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Binary framing of the EdgeDB client/server protocol.
+
+Every message is a frame consisting of a fixed header followed by
+the payload.  The header holds the message type, the request id and
+the payload length.  The request id is chosen by the client and is
+echoed back by the server in the response, which allows clients to
+pipeline requests.  Payloads are single values in the binary encoding
+implemented by encode_value() and decode_value().
+
+Most requests are answered with a single MSG_RESULT or MSG_ERROR
+message.  MSG_STREAM requests are answered with any number of MSG_DATA
+messages, each carrying a chunk of result elements, followed by
+a MSG_RESULT or MSG_ERROR message that ends the stream.
+"""
+
+
+import json
+import struct
+
+
+PROTOCOL_VERSION = 1
+
+# Message type, request id, payload length.
+frame_header = struct.Struct('!cII')
+
+MAX_REQUEST_ID = 0xFFFFFFFF
+
+# Client messages
+MSG_INIT = b'I'
+MSG_SCRIPT = b'S'
+MSG_STREAM = b'C'
+MSG_LIST_DBS = b'L'
+MSG_GET_PGCON = b'P'
+
+# Server messages
+MSG_AUTHRESULT = b'A'
+MSG_RESULT = b'R'
+MSG_ERROR = b'E'
+MSG_DATA = b'D'
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class RawJSON:
+    """A serialized JSON document embedded into a message verbatim.
+
+    Allows passing JSON produced elsewhere (e.g. by the database)
+    through without decoding and re-encoding it.  Receivers get
+    the decoded document.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __repr__(self):
+        return f'<RawJSON {len(self.data)} bytes at 0x{id(self):x}>'
+
+
+_uint32 = struct.Struct('!I')
+_int64 = struct.Struct('!q')
+_float64 = struct.Struct('!d')
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+TAG_NONE = ord('N')
+TAG_TRUE = ord('T')
+TAG_FALSE = ord('F')
+TAG_INT = ord('i')
+TAG_BIGINT = ord('I')
+TAG_FLOAT = ord('f')
+TAG_STR = ord('s')
+TAG_BYTES = ord('b')
+TAG_LIST = ord('l')
+TAG_MAP = ord('m')
+TAG_JSON = ord('j')
+
+
+def encode_value(value, buf):
+    """Append the binary encoding of *value* to bytearray *buf*."""
+
+    if value is None:
+        buf.append(TAG_NONE)
+
+    elif value is True:
+        buf.append(TAG_TRUE)
+
+    elif value is False:
+        buf.append(TAG_FALSE)
+
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        buf.append(TAG_STR)
+        buf += _uint32.pack(len(data))
+        buf += data
+
+    elif isinstance(value, int):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            buf.append(TAG_INT)
+            buf += _int64.pack(value)
+        else:
+            data = str(value).encode('ascii')
+            buf.append(TAG_BIGINT)
+            buf += _uint32.pack(len(data))
+            buf += data
+
+    elif isinstance(value, float):
+        buf.append(TAG_FLOAT)
+        buf += _float64.pack(value)
+
+    elif isinstance(value, (list, tuple)):
+        buf.append(TAG_LIST)
+        buf += _uint32.pack(len(value))
+        for item in value:
+            encode_value(item, buf)
+
+    elif isinstance(value, dict):
+        buf.append(TAG_MAP)
+        buf += _uint32.pack(len(value))
+        for k, v in value.items():
+            encode_value(k, buf)
+            encode_value(v, buf)
+
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        buf.append(TAG_BYTES)
+        buf += _uint32.pack(len(value))
+        buf += value
+
+    elif isinstance(value, RawJSON):
+        buf.append(TAG_JSON)
+        buf += _uint32.pack(len(value.data))
+        buf += value.data
+
+    else:
+        raise TypeError(
+            f'cannot encode value of type {type(value).__name__!r}')
+
+
+def decode_value(data, pos=0):
+    """Decode a value from *data* starting at *pos*.
+
+    Returns a tuple of the decoded value and the position
+    immediately following it.
+    """
+
+    try:
+        tag = data[pos]
+    except IndexError:
+        raise ProtocolError('unexpected end of message') from None
+
+    pos += 1
+
+    if tag == TAG_NONE:
+        return None, pos
+
+    elif tag == TAG_TRUE:
+        return True, pos
+
+    elif tag == TAG_FALSE:
+        return False, pos
+
+    elif tag == TAG_STR:
+        end = _read_length(data, pos) + pos + 4
+        return str(data[pos + 4:end], 'utf-8'), end
+
+    elif tag == TAG_INT:
+        _check_length(data, pos + 8)
+        return _int64.unpack_from(data, pos)[0], pos + 8
+
+    elif tag == TAG_BIGINT:
+        end = _read_length(data, pos) + pos + 4
+        return int(str(data[pos + 4:end], 'ascii')), end
+
+    elif tag == TAG_FLOAT:
+        _check_length(data, pos + 8)
+        return _float64.unpack_from(data, pos)[0], pos + 8
+
+    elif tag == TAG_LIST:
+        count = _read_length(data, pos, is_count=True)
+        pos += 4
+        result = []
+        for _ in range(count):
+            item, pos = decode_value(data, pos)
+            result.append(item)
+        return result, pos
+
+    elif tag == TAG_MAP:
+        count = _read_length(data, pos, is_count=True)
+        pos += 4
+        result = {}
+        for _ in range(count):
+            k, pos = decode_value(data, pos)
+            v, pos = decode_value(data, pos)
+            result[k] = v
+        return result, pos
+
+    elif tag == TAG_BYTES:
+        end = _read_length(data, pos) + pos + 4
+        return bytes(data[pos + 4:end]), end
+
+    elif tag == TAG_JSON:
+        end = _read_length(data, pos) + pos + 4
+        return json.loads(str(data[pos + 4:end], 'utf-8')), end
+
+    else:
+        raise ProtocolError(f'unexpected value tag: {tag!r}')
+
+
+def _check_length(data, end):
+    if end > len(data):
+        raise ProtocolError('unexpected end of message')
+
+
+def _read_length(data, pos, *, is_count=False):
+    _check_length(data, pos + 4)
+    length = _uint32.unpack_from(data, pos)[0]
+    if not is_count:
+        _check_length(data, pos + 4 + length)
+    return length
+
+
+def encode_message(mtype, request_id, payload):
+    """Return a complete frame for a message with the given payload."""
+
+    buf = bytearray(frame_header.size)
+    encode_value(payload, buf)
+    frame_header.pack_into(
+        buf, 0, mtype, request_id, len(buf) - frame_header.size)
+    return buf
+
+
+class FrameReader:
+    """Incremental decoder of a stream of protocol frames."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Consume *data* and return a list of all complete messages.
+
+        Each message is a ``(type, request_id, payload)`` tuple.
+        Incomplete trailing data is retained until the next call.
+        """
+
+        buf = self._buffer
+        buf += data
+        buf_len = len(buf)
+        header_size = frame_header.size
+
+        messages = []
+        pos = 0
+
+        with memoryview(buf) as view:
+            while buf_len - pos >= header_size:
+                mtype, request_id, msg_len = \
+                    frame_header.unpack_from(view, pos)
+
+                start = pos + header_size
+                end = start + msg_len
+                if end > buf_len:
+                    break
+
+                with view[start:end] as payload:
+                    try:
+                        value, value_end = decode_value(payload)
+                    except (ValueError, TypeError, RecursionError) as e:
+                        # Invalid UTF-8, numbers or JSON documents,
+                        # unhashable map keys and excessive nesting.
+                        raise ProtocolError(
+                            f'malformed message {mtype!r}: {e}') from e
+
+                if value_end != msg_len:
+                    raise ProtocolError(
+                        f'unexpected trailing data in message {mtype!r}')
+
+                messages.append((mtype, request_id, value))
+                pos = end
+
+        if pos:
+            # Compact the buffer once for all consumed messages.
+            del buf[:pos]
+
+        return messages
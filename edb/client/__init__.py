@@ -54,9 +54,37 @@ class Connection:
             graphql=graphql,
             flags=flags)
 
+    def stream(self, query, *, chunk_size=100, graphql=False, flags={}):
+        """Execute a query and iterate over its result asynchronously.
+
+        The result is transferred in chunks of *chunk_size* elements,
+        so memory usage does not depend on the size of the result.
+        A stream that is not iterated to the end should be closed,
+        which discards the rest of the result.
+
+        Example:
+
+        .. code-block:: python
+
+            async with con.stream('SELECT User { name };') as users:
+                async for obj in users:
+                    if obj['name'] == 'admin':
+                        break
+        """
+        return self._protocol.stream_script(
+            query, chunk_size=chunk_size, graphql=graphql, flags=flags)
+
     def get_last_timings(self):
         return self._protocol._last_timings
 
+    def get_last_descriptors(self):
+        """Return output type descriptors of the last executed script.
+
+        The result is a list with an element per statement, which is
+        None for statements that do not return data.
+        """
+        return self._protocol._last_descriptors
+
     def close(self):
         self._transport.close()
 
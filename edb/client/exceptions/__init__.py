@@ -45,6 +45,10 @@ class NoActiveTransactionError(InvalidTransactionStateError):
     code = '25P01'
 
 
+class QueryCanceledError(_base.EdgeDBError):
+    code = '57014'
+
+
 class SchemaError(_base.EdgeDBError):
     code = '32000'
 
@@ -73,6 +77,7 @@ __all__ = _base.__all__ + (
     'IntegrityConstraintViolationError',
     'InvalidTransactionStateError',
     'NoActiveTransactionError',
+    'QueryCanceledError',
     'MissingRequiredPointerError',
     'ConstraintViolationError',
     'EdgeDBLanguageError',
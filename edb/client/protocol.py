@@ -18,10 +18,10 @@
 
 
 import asyncio
+import collections
 import enum
-import json
-import struct
 
+from edb.api import wire
 
 from . import exceptions
 from .future import create_future
@@ -34,7 +34,109 @@ class ConnectionState(enum.Enum):
     READY = 3
 
 
-msg_header = struct.Struct('!L')
+class ResultStream:
+    """Asynchronous iterator over the elements of a streamed result.
+
+    A stream that is not iterated to the end should be closed with
+    aclose(), or used as an asynchronous context manager.
+    """
+
+    # Reading from the transport is paused when this many chunks
+    # are buffered and not yet consumed.
+    max_buffered_chunks = 4
+
+    def __init__(self, protocol, loop):
+        self._protocol = protocol
+        self._loop = loop
+        self._chunks = collections.deque()
+        self._current = iter(())
+        self._waiter = None
+        self._exc = None
+        self._done = False
+        self._bounded = True
+        self._discarding = False
+        self.timings = None
+        self.descriptor = None
+
+    def _wakeup(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _wait(self):
+        self._waiter = create_future(self._loop)
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    def _feed(self, data):
+        if self._discarding:
+            return
+        self._chunks.append(data)
+        if (self._bounded and
+                len(self._chunks) >= self.max_buffered_chunks):
+            self._protocol._pause_reading()
+        self._wakeup()
+
+    def _unbound(self):
+        self._bounded = False
+        self._protocol._resume_reading()
+
+    def _finish(self, timings, descriptor):
+        self.timings = timings
+        self.descriptor = descriptor
+        self._done = True
+        self._wakeup()
+
+    def _set_exception(self, exc):
+        self._exc = exc
+        self._done = True
+        self._wakeup()
+
+    async def aclose(self):
+        """Stop iterating and discard the rest of the result.
+
+        The server sends the result to the end regardless, this waits
+        until it has been received.
+        """
+        self._discarding = True
+        self._chunks.clear()
+        self._current = iter(())
+        self._protocol._resume_reading()
+
+        while not self._done:
+            await self._wait()
+
+        # Errors of the discarded part of the result are not reported.
+        self._exc = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            for item in self._current:
+                return item
+
+            if self._chunks:
+                self._current = iter(self._chunks.popleft())
+                if len(self._chunks) < self.max_buffered_chunks:
+                    self._protocol._resume_reading()
+
+            elif self._done:
+                if self._exc is not None:
+                    exc, self._exc = self._exc, None
+                    raise exc
+                raise StopAsyncIteration
+
+            else:
+                await self._wait()
 
 
 class Protocol(asyncio.Protocol):
@@ -49,12 +151,18 @@ class Protocol(asyncio.Protocol):
         self._hash = (self._address, self._database)
 
         self._connect_waiter = connect_waiter
-        self._waiter = None
+        # Requests in flight, keyed by request id.  The server
+        # processes pipelined requests in order.
+        self._waiters = {}
+        self._streams = {}
+        self._next_request_id = 0
         self._state = ConnectionState.NOT_CONNECTED
 
         self._last_timings = None
+        self._last_descriptors = None
 
-        self.buffer = bytearray()
+        self._reader = wire.FrameReader()
+        self._reading_paused = False
 
     def connection_made(self, transport):
         self.transport = transport
@@ -63,83 +171,142 @@ class Protocol(asyncio.Protocol):
     def connection_lost(self, exc):
         self.transport.close()
 
+        if exc is None:
+            exc = ConnectionResetError('connection lost')
+
+        waiters, self._waiters = self._waiters, {}
+        for waiter in waiters.values():
+            if not waiter.done():
+                waiter.set_exception(exc)
+
+        streams, self._streams = self._streams, {}
+        for stream in streams.values():
+            stream._set_exception(exc)
+
+        if (self._connect_waiter is not None and
+                not self._connect_waiter.done()):
+            self._connect_waiter.set_exception(exc)
+        self._connect_waiter = None
+
+    def _pause_reading(self):
+        if not self._reading_paused:
+            self._reading_paused = True
+            self.transport.pause_reading()
+
+    def _resume_reading(self):
+        if self._reading_paused:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
     def data_received(self, data):
-        self.buffer.extend(data)
-        buf_len = len(self.buffer)
-        header_size = msg_header.size
-        if buf_len > header_size:
-            msg_len, = msg_header.unpack(self.buffer[:header_size])
-            if buf_len >= header_size + msg_len:
-                msg = self.buffer[header_size:header_size + msg_len]
-                self.buffer = self.buffer[header_size + msg_len:]
-                msg = json.loads(msg.decode('utf-8'))
-                self._loop.call_soon(self.process_message, msg)
+        for mtype, request_id, payload in self._reader.feed(data):
+            self.process_message(mtype, request_id, payload)
 
     def list_dbs(self):
-        msg = {
-            '__type__': 'list_dbs',
-        }
-
-        return self.send_message(msg)
+        return self.send_message(wire.MSG_LIST_DBS, None)
 
     def get_pgcon(self):
+        return self.send_message(wire.MSG_GET_PGCON, None)
+
+    def execute_script(self, script, *, graphql=False, flags={}):
         msg = {
-            '__type__': 'get_pgcon',
+            'graphql': graphql,
+            'flags': list(flags),
+            'script': script
         }
 
-        return self.send_message(msg)
+        return self.send_message(wire.MSG_SCRIPT, msg)
 
-    def execute_script(self, script, *, graphql=False, flags={}):
+    def stream_script(self, script, *, chunk_size, graphql=False, flags={}):
         msg = {
-            '__type__': 'script',
-            '__graphql__': graphql,
-            '__flags__': list(flags),
-            'script': script
+            'graphql': graphql,
+            'flags': list(flags),
+            'script': script,
+            'chunk_size': chunk_size,
         }
 
-        return self.send_message(msg)
+        request_id = self._new_request_id()
+        self._unbound_streams()
+        stream = self._streams[request_id] = ResultStream(self, self._loop)
+        self._write_message(wire.MSG_STREAM, request_id, msg)
+        return stream
 
-    def _new_waiter(self):
-        if self._waiter is not None:
-            raise RuntimeError('another operation is in progress')
-        self._waiter = create_future(self._loop)
+    def _unbound_streams(self):
+        # The server processes requests in order, so a new request
+        # is answered only after the pending streams are received in
+        # full, even if they were abandoned without being closed.
+        for stream in self._streams.values():
+            stream._unbound()
+
+    def _new_request_id(self):
+        request_id = self._next_request_id
+        if request_id == wire.MAX_REQUEST_ID:
+            self._next_request_id = 0
+        else:
+            self._next_request_id += 1
+        return request_id
+
+    def send_message(self, mtype, message):
+        request_id = self._new_request_id()
+        self._unbound_streams()
+        waiter = self._waiters[request_id] = create_future(self._loop)
+        self._write_message(mtype, request_id, message)
+        return waiter
 
-    def send_message(self, message):
-        self._new_waiter()
+    def _write_message(self, mtype, request_id, message):
+        self.transport.write(wire.encode_message(mtype, request_id, message))
 
-        em = json.dumps(message).encode('utf-8')
-        self.transport.write(msg_header.pack(len(em)) + em)
+    def process_message(self, mtype, request_id, message):
+        if request_id in self._streams:
+            self._process_stream_message(mtype, request_id, message)
+            return
 
-        return self._waiter
+        waiter = self._waiters.pop(request_id, None)
 
-    def process_message(self, message):
-        if message['__type__'] == 'authresult':
+        if mtype == wire.MSG_AUTHRESULT:
+            self._state = ConnectionState.READY
             if not self._connect_waiter.cancelled():
                 self._connect_waiter.set_result(None)
-            self._connect_waiter = self._waiter = None
+            self._connect_waiter = None
 
-        elif message['__type__'] == 'error':
+        elif mtype == wire.MSG_ERROR:
             if self._connect_waiter is not None:
                 self._connect_waiter.set_exception(
-                    exceptions.EdgeDBError.new(message['data']))
+                    exceptions.EdgeDBError.new(message))
                 self._connect_waiter = None
-            elif self._waiter is not None:
-                self._waiter.set_exception(
-                    exceptions.EdgeDBError.new(message['data']))
-                self._waiter = None
-
-        elif message['__type__'] == 'result':
-            if self._waiter is not None:
-                self._waiter.set_result(message['result'])
+            elif waiter is not None and not waiter.cancelled():
+                waiter.set_exception(
+                    exceptions.EdgeDBError.new(message))
+
+        elif mtype == wire.MSG_RESULT:
+            if waiter is not None and not waiter.cancelled():
+                waiter.set_result(message['result'])
                 self._last_timings = message['timings']
-            self._waiter = None
+                self._last_descriptors = message['descriptors']
+
+    def _process_stream_message(self, mtype, request_id, message):
+        stream = self._streams[request_id]
+
+        if mtype == wire.MSG_DATA:
+            stream._feed(message)
+
+        elif mtype == wire.MSG_RESULT:
+            del self._streams[request_id]
+            stream._finish(message['timings'], message['descriptors'][0])
+            self._last_timings = message['timings']
+            self._last_descriptors = message['descriptors']
+
+        elif mtype == wire.MSG_ERROR:
+            del self._streams[request_id]
+            stream._set_exception(exceptions.EdgeDBError.new(message))
 
     def _init_connection(self):
         msg = {
-            '__type__': 'init',
+            'version': wire.PROTOCOL_VERSION,
             'user': self._user,
             'database': self._database
         }
 
-        self.state = ConnectionState.AUTHENTICATING
-        return self.send_message(msg)
+        self._state = ConnectionState.AUTHENTICATING
+        # The init request completes through the connect waiter.
+        self._write_message(wire.MSG_INIT, self._new_request_id(), msg)
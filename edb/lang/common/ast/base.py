@@ -46,8 +46,21 @@ class Field:
 
 
 class MetaAST(type):
-    def __new__(mcls, name, bases, dct):
-        cls = super().__new__(mcls, name, bases, dct)
+    def __new__(mcls, name, bases, dct, **kwargs):
+        # Field values are stored in slots, which cannot coexist
+        # with class attributes of the same name, so the defaults
+        # are taken out of the class namespace.
+        defaults = {}
+        for f_name in dct.get('__annotations__', ()):
+            if f_name in dct:
+                defaults[f_name] = dct.pop(f_name)
+
+        # Explicit __slots__ are for attributes that are not fields.
+        dct['__slots__'] = (
+            tuple(dct.get('__slots__', ())) +
+            mcls._get_slots(name, bases, dct))
+
+        cls = super().__new__(mcls, name, bases, dct, **kwargs)
 
         if '__annotations__' not in dct:
             return cls
@@ -87,11 +100,7 @@ class MetaAST(type):
                 if f_type is object:
                     f_type = None
 
-                if f_name in dct:
-                    f_default = dct[f_name]
-                    delattr(cls, f_name)
-                else:
-                    f_default = None
+                f_default = defaults.get(f_name)
 
                 f_default = _check_annotation(f_type, f_fullname, f_default)
 
@@ -105,8 +114,45 @@ class MetaAST(type):
 
         return cls
 
-    def __init__(cls, name, bases, dct):
-        super().__init__(name, bases, dct)
+    @classmethod
+    def _get_slots(mcls, name, bases, dct):
+        """Return the slots for the fields not stored by the bases.
+
+        Python does not allow a class to have more than one base
+        with slots, unless the bases inherit each other.  Classes
+        that are mixed into other AST classes must therefore set
+        ``__ast_mixin__``: their fields are stored in the slots of
+        their subclasses.
+        """
+        if dct.get('__ast_mixin__'):
+            return ()
+
+        names = list(dct.get('__annotations__', ()))
+        for field in dct.get(f'_{name}__fields', ()):
+            names.append(field[0] if isinstance(field, tuple) else field)
+
+        for base in bases:
+            if isinstance(base, MetaAST):
+                names.extend(base._fields)
+
+        stored = set()
+        for base in bases:
+            for parent in base.__mro__:
+                slots = parent.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                stored.update(slots)
+
+        slots = []
+        for field_name in names:
+            if field_name not in stored:
+                slots.append(field_name)
+                stored.add(field_name)
+
+        return tuple(slots)
+
+    def __init__(cls, name, bases, dct, **kwargs):
+        super().__init__(name, bases, dct, **kwargs)
         fields = collections.OrderedDict()
 
         for parent in reversed(cls.__mro__):
@@ -149,20 +195,34 @@ class MetaAST(type):
 
         cls._fields = fields
 
+        # (name, default, default is a factory) for every field.
+        cls._field_defaults = tuple(
+            (f.name, f.default, callable(f.default))
+            for f in fields.values())
+
     def get_field(cls, name):
         return cls._fields.get(name)
 
 
+# Whether the types of field values are checked on assignment.
+_type_checks = __debug__
+
+
 class AST(object, metaclass=MetaAST):
+    # Nodes have no instance dict, attributes other than fields
+    # must be declared in the __slots__ of the node class.
+    __slots__ = ('parent',)
     __fields = []
 
     def __init__(self, **kwargs):
         object.__setattr__(self, 'parent', None)
         self._init_fields(kwargs)
 
+        fields = self.__class__._fields
+
         # XXX: use weakref here
         for arg, value in kwargs.items():
-            if hasattr(self, arg):
+            if arg in fields or hasattr(self, arg):
                 if is_ast_node(value):
                     object.__setattr__(value, 'parent', self)
                 elif isinstance(value, list):
@@ -182,42 +242,52 @@ class AST(object, metaclass=MetaAST):
             object.__setattr__(self, 'parent', kwargs['parent'])
 
     def _init_fields(self, values):
-        for field_name, field in self.__class__._fields.items():
+        cls = self.__class__
+
+        for field_name, default, is_factory in cls._field_defaults:
             if field_name in values:
                 value = values[field_name]
-            elif field.default is not None:
-                if callable(field.default):
-                    value = field.default()
-                else:
-                    value = field.default
+                if _type_checks:
+                    self.check_field_type(cls._fields[field_name], value)
+            elif is_factory:
+                value = default()
             else:
-                value = None
-
-            if __debug__:
-                self.check_field_type(field, value)
+                value = default
 
             # Bypass overloaded setattr
             object.__setattr__(self, field_name, value)
 
-    def __copy__(self):
-        copied = self.__class__()
-        for field, value in iter_fields(self, include_meta=False):
-            setattr(copied, field, value)
+    def _copy(self, copy_value):
+        cls = self.__class__
+        copied = cls.__new__(cls)
+        object.__setattr__(copied, 'parent', None)
+
+        for field_name, field in cls._fields.items():
+            if field.meta:
+                # Meta fields are not copied.
+                default = field.default
+                value = default() if callable(default) else default
+            else:
+                value = copy_value(getattr(self, field_name, None))
+
+            object.__setattr__(copied, field_name, value)
+
         return copied
 
+    def __copy__(self):
+        return self._copy(lambda value: value)
+
     def __deepcopy__(self, memo):
-        copied = self.__class__()
-        for field, value in iter_fields(self, include_meta=False):
-            setattr(copied, field, copy.deepcopy(value, memo))
-        return copied
+        return self._copy(lambda value: copy.deepcopy(value, memo))
 
-    if __debug__:
+    def _checked_setattr(self, name, value):
+        object.__setattr__(self, name, value)
+        field = self._fields.get(name)
+        if field:
+            self.check_field_type(field, value)
 
-        def __setattr__(self, name, value):
-            super().__setattr__(name, value)
-            field = self._fields.get(name)
-            if field:
-                self.check_field_type(field, value)
+    if _type_checks:
+        __setattr__ = _checked_setattr
 
     def check_field_type(self, field, value):
         def raise_error(field_type_name, value):
@@ -232,19 +302,43 @@ class AST(object, metaclass=MetaAST):
         markup.dump(self)
 
 
+def enable_type_checks(enabled=True):
+    """Enable or disable checking the types of AST field values.
+
+    The checks are enabled by default, unless Python runs with
+    optimizations.  They are relatively expensive, and ASTs are built
+    for every compiled query, so production servers disable them.
+    """
+    global _type_checks
+
+    _type_checks = enabled
+    if enabled:
+        AST.__setattr__ = AST._checked_setattr
+    elif '__setattr__' in AST.__dict__:
+        del AST.__setattr__
+
+
 class ImmutableASTMixin:
-    __frozen = False
+    # The flag is stored in the _frozen slot, which must be declared
+    # by the node class the mixin is combined with: two bases with
+    # non-empty __slots__ cannot be combined.
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.__frozen = True
+        self._frozen = True
 
     def __setattr__(self, name, value):
-        if self.__frozen:
+        if getattr(self, '_frozen', False):
             raise TypeError(f'cannot set {name} on immutable {self!r}')
         else:
             super().__setattr__(name, value)
 
+    def _copy(self, copy_value):
+        copied = super()._copy(copy_value)
+        object.__setattr__(copied, '_frozen', True)
+        return copied
+
 
 @markup.serializer.serializer.register(AST)
 def _serialize_to_markup(ast, *, ctx):
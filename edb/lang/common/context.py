@@ -36,11 +36,92 @@ import bisect
 from edb.lang.common import ast, markup
 
 
+class LineMap:
+    """Maps offsets in a source buffer to line and column numbers."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self._line_offsets = None
+
+    def get_position(self, pointer):
+        """Return a (line, column) tuple for the offset *pointer*."""
+        offsets = self._line_offsets
+        if offsets is None:
+            offsets = self._line_offsets = [0]
+            nl = '\n' if isinstance(self.buffer, str) else b'\n'
+            pos = self.buffer.find(nl)
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = self.buffer.find(nl, pos + 1)
+
+        line = bisect.bisect_right(offsets, pointer)
+        return line, pointer - offsets[line - 1] + 1
+
+
 class SourcePoint:
+    __slots__ = ('_line', '_column', '_pointer', '_linemap')
+
     def __init__(self, line, column, pointer):
-        self.line = line
-        self.column = column
-        self.pointer = pointer
+        self._line = line
+        self._column = column
+        self._pointer = pointer
+        self._linemap = None
+
+    @classmethod
+    def from_offset(cls, linemap, pointer):
+        """Create a point with line and column computed on first use."""
+        point = cls.__new__(cls)
+        point._line = point._column = None
+        point._pointer = pointer
+        point._linemap = linemap
+        return point
+
+    def copy(self):
+        point = type(self).__new__(type(self))
+        point._line = self._line
+        point._column = self._column
+        point._pointer = self._pointer
+        point._linemap = self._linemap
+        return point
+
+    def _resolve(self):
+        self._line, self._column = self._linemap.get_position(self._pointer)
+        self._linemap = None
+
+    @property
+    def line(self):
+        if self._linemap is not None:
+            self._resolve()
+        return self._line
+
+    @line.setter
+    def line(self, value):
+        if self._linemap is not None:
+            self._resolve()
+        self._line = value
+
+    @property
+    def column(self):
+        if self._linemap is not None:
+            self._resolve()
+        return self._column
+
+    @column.setter
+    def column(self, value):
+        if self._linemap is not None:
+            self._resolve()
+        self._column = value
+
+    @property
+    def pointer(self):
+        return self._pointer
+
+    @pointer.setter
+    def pointer(self, value):
+        if self._linemap is not None:
+            # The line and column are of the original offset.
+            self._resolve()
+        self._pointer = value
 
 
 class ParserContext(markup.MarkupExceptionContext):
@@ -167,10 +248,7 @@ def get_context(*kids):
 
     return ParserContext(
         name=start_ctx.name, buffer=start_ctx.buffer,
-        start=SourcePoint(
-            start_ctx.start.line, start_ctx.start.column,
-            start_ctx.start.pointer), end=SourcePoint(
-                end_ctx.end.line, end_ctx.end.column, end_ctx.end.pointer))
+        start=start_ctx.start.copy(), end=end_ctx.end.copy())
 
 
 def merge_context(ctxlist):
@@ -180,11 +258,7 @@ def merge_context(ctxlist):
     #
     return ParserContext(
         name=ctxlist[0].name, buffer=ctxlist[0].buffer,
-        start=SourcePoint(
-            ctxlist[0].start.line, ctxlist[0].start.column,
-            ctxlist[0].start.pointer), end=SourcePoint(
-                ctxlist[-1].end.line, ctxlist[-1].end.column,
-                ctxlist[-1].end.pointer))
+        start=ctxlist[0].start.copy(), end=ctxlist[-1].end.copy())
 
 
 def force_context(node, context):
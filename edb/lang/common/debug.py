@@ -89,6 +89,9 @@ class flags(metaclass=FlagsMeta):
     delta_execute = Flag(
         doc="Output SQL commands as executed during migration.")
 
+    delta_verify_schema = Flag(
+        doc="Verify the schema modified by DDL against the database.")
+
     server = Flag(
         doc="Print server errors.")
 
@@ -67,3 +67,7 @@ class InvalidTransactionStateError(_base.EdgeDBError):
 
 class NoActiveTransactionError(InvalidTransactionStateError):
     code = '25P01'
+
+
+class QueryCanceledError(_base.EdgeDBError):
+    code = '57014'
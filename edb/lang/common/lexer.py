@@ -85,6 +85,9 @@ def group(*literals, _re_alpha=re.compile(r'^\w+$'), asbytes=False):
     return result
 
 
+_re_word_char = re.compile(r'\w')
+
+
 class Lexer:
     NL = frozenset()
     MULTILINE_TOKENS = frozenset()
@@ -92,33 +95,57 @@ class Lexer:
     asbytes = False
     _NL = '\n'
 
+    # Keywords are lexed as identifiers and then looked up in this
+    # mapping of lowercase keywords to token types, which is much
+    # cheaper than a regexp alternative for each keyword.
+    keywords = {}
+
+    # Tokens of these types are not yielded by lex().
+    SKIP_TOKENS = frozenset()
+
+    # If true, token positions hold the offsets only, and the line and
+    # column numbers are computed from the input when requested.  The
+    # lexer lineno and column attributes are not maintained then, use
+    # get_position() instead.
+    LAZY_POSITIONS = False
+
     def __init__(self):
         self.reset()
+        self.re_states = self._get_re_states()
+
+        if self.asbytes:
+            self._NL = b'\n'
+
+    @classmethod
+    def _get_re_states(cls):
+        # State regexps are compiled once per lexer class.
+        try:
+            return cls.__dict__['_re_states']
+        except KeyError:
+            pass
 
         re_states = {}
-        for state, rules in self.states.items():
+        for state, rules in cls.states.items():
             res = []
             for rule in rules:
-                if self.asbytes:
+                if cls.asbytes:
                     res.append(b'(?P<%b>%b)' % (rule.id.encode(), rule.regexp))
                 else:
                     res.append('(?P<{}>{})'.format(rule.id, rule.regexp))
 
-            if self.asbytes:
+            if cls.asbytes:
                 res.append(b'(?P<err>.)')
             else:
                 res.append('(?P<err>.)')
 
-            if self.asbytes:
+            if cls.asbytes:
                 full_re = b' | '.join(res)
             else:
                 full_re = ' | '.join(res)
-            re_states[state] = re.compile(full_re, self.RE_FLAGS)
+            re_states[state] = re.compile(full_re, cls.RE_FLAGS)
 
-        self.re_states = re_states
-
-        if self.asbytes:
-            self._NL = b'\n'
+        cls._re_states = re_states
+        return re_states
 
     def reset(self):
         self.lineno = 1
@@ -134,6 +161,31 @@ class Lexer:
         self.reset()
         self._token_stream = None
 
+        if self.LAZY_POSITIONS:
+            self._linemap = pctx.LineMap(inputstr)
+
+    def get_position(self):
+        """Return the current lexer position as a SourcePoint."""
+        if self.LAZY_POSITIONS:
+            return pctx.SourcePoint.from_offset(self._linemap, self.start)
+        else:
+            return pctx.SourcePoint(self.lineno, self.column, self.start)
+
+    def get_keyword_token(self, txt):
+        """Return the token type of keyword *txt* or None.
+
+        Must be called before the lexer position is advanced past *txt*.
+        """
+        tok_type = self.keywords.get(txt.lower())
+
+        if (tok_type is not None and self.start and
+                _re_word_char.match(self.inputstr, self.start - 1)):
+            # Keywords start at a word boundary, so e.g. in "1select"
+            # "select" is an identifier.
+            return None
+
+        return tok_type
+
     def get_start_token(self):
         """Return a start token or None if no start token is wanted."""
         return None
@@ -147,37 +199,45 @@ class Lexer:
 
         Update the lexer lineno, column, and start.
         """
-        start_pos = pctx.SourcePoint(self.lineno, self.column, self.start)
-        len_txt = len(txt)
-
-        if rule_token is self.NL:
-            # Newline -- increase line number & set col to 1
-            self.lineno += 1
-            self.column = 1
-
-        elif rule_token in self.MULTILINE_TOKENS and self._NL in txt:
-            # Advance line & col according to how many new lines
-            # are in comments/strings/etc.
-            self.lineno += txt.count(self._NL)
-            self.column = len(txt.rsplit(self._NL, 1)[1]) + 1
-        else:
-            self.column += len_txt
-
-        self.start += len_txt
-        end_pos = pctx.SourcePoint(self.lineno, self.column, self.start)
+        start_pos = self.get_position()
+        self.skip_text(rule_token, txt)
+        end_pos = self.get_position()
 
         return Token(txt, type=rule_token, text=txt,
                      start=start_pos, end=end_pos,
                      filename=self.filename)
 
+    def skip_text(self, rule_token, txt):
+        """Advance the lexer position past txt without creating a token."""
+        if not self.LAZY_POSITIONS:
+            if rule_token is self.NL:
+                # Newline -- increase line number & set col to 1
+                self.lineno += 1
+                self.column = 1
+
+            elif rule_token in self.MULTILINE_TOKENS and self._NL in txt:
+                # Advance line & col according to how many new lines
+                # are in comments/strings/etc.
+                self.lineno += txt.count(self._NL)
+                self.column = len(txt.rsplit(self._NL, 1)[1]) + 1
+
+            else:
+                self.column += len(txt)
+
+        self.start += len(txt)
+
     def lex(self):
         """Tokenize the src.
 
-        Generator. Yields tokens (as defined by the rules).
+        Generator. Yields tokens (as defined by the rules), except
+        for the tokens of SKIP_TOKENS types.
 
         May yield special start and EOF tokens.
         May raise UnknownTokenError exception.
         """
+        return self._tokenize(self.SKIP_TOKENS)
+
+    def _tokenize(self, skip_tokens):
         src = self.inputstr
 
         start_tok = self.get_start_token()
@@ -197,9 +257,10 @@ class Lexer:
                 rule = Rule._map[rule_id]
                 rule_token = rule.token
 
-                token = self.token_from_text(rule_token, txt)
-
-                yield token
+                if rule_token in skip_tokens:
+                    self.skip_text(rule_token, txt)
+                else:
+                    yield self.token_from_text(rule_token, txt)
 
                 if rule.next_state and rule.next_state != self._state:
                     # Rule dictates that the lexer state should be
@@ -213,9 +274,10 @@ class Lexer:
             yield eof_tok
 
     def handle_error(self, txt):
+        position = self.get_position()
         raise UnknownTokenError(
             f"Unexpected '{txt}'",
-            line=self.lineno, col=self.column, filename=self.filename)
+            line=position.line, col=position.column, filename=self.filename)
 
     def token(self):
         """Return the next token produced by the lexer.
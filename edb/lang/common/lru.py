@@ -0,0 +1,104 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import collections
+
+
+class LRUMapping:
+    """A size-bounded mapping that evicts least recently used items."""
+
+    def __init__(self, *, maxsize, on_evict=None):
+        if maxsize < 0:
+            raise ValueError('maxsize must not be negative')
+
+        self._maxsize = maxsize
+        self._on_evict = on_evict
+        self._dict = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def get(self, key, default=None):
+        try:
+            value = self._dict[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        else:
+            self.hits += 1
+            self._dict.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        if not self._maxsize:
+            return
+
+        existing = self._dict.get(key)
+        self._dict[key] = value
+        self._dict.move_to_end(key)
+
+        if existing is not None and existing is not value:
+            self._evicted(existing)
+
+        while len(self._dict) > self._maxsize:
+            _, evicted = self._dict.popitem(last=False)
+            self._evicted(evicted)
+
+    def __delitem__(self, key):
+        self._evicted(self._dict.pop(key))
+
+    def __contains__(self, key):
+        return key in self._dict
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def pop(self, key, default=None):
+        try:
+            value = self._dict.pop(key)
+        except KeyError:
+            return default
+        else:
+            self._evicted(value)
+            return value
+
+    def clear(self):
+        items = list(self._dict.values())
+        self._dict.clear()
+        for item in items:
+            self._evicted(item)
+
+    def get_stats(self):
+        return {
+            'size': len(self._dict),
+            'maxsize': self._maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def _evicted(self, value):
+        if self._on_evict is not None:
+            self._on_evict(value)
@@ -17,7 +17,11 @@
 #
 
 
+import contextlib
+import hashlib
 import os
+import pathlib
+import pickle
 import sys
 import types
 
@@ -295,6 +299,34 @@ class Parser:
         self.parser = None
         self.parser_data = parser_data
 
+    @classmethod
+    @contextlib.contextmanager
+    def pooled(cls):
+        """Borrow an idle parser instance for the duration of the block.
+
+        Parser instances are reused, as creating the parser driver and
+        the lexer is expensive.  Parsing never yields to the event loop,
+        so an instance is not shared by asyncio tasks; nested parsing
+        borrows another instance.
+        """
+        try:
+            pool = cls.__dict__['_pool']
+        except KeyError:
+            pool = cls._pool = []
+
+        try:
+            parser = pool.pop()
+        except IndexError:
+            parser = cls()
+
+        try:
+            yield parser
+        finally:
+            if parser.parser is not None:
+                # Drop the references to the input and the result.
+                parser.reset_parser('')
+            pool.append(parser)
+
     def cleanup(self):
         self.__class__.parser_spec = None
         self.__class__.lexer_spec = None
@@ -323,10 +355,20 @@ class Parser:
                 return spec
 
         mod = self.get_parser_spec_module()
-        spec = parsing.Spec(
-            mod, pickleFile=self.localpath(mod, "pickle"),
-            skinny=not self.get_debug(), logFile=self.localpath(mod, "log"),
-            verbose=self.get_debug())
+
+        if self.get_debug():
+            spec = parsing.Spec(
+                mod, skinny=False, logFile=self.localpath(mod, "log"),
+                verbose=True)
+        else:
+            spec = load_spec(mod)
+            if spec is None:
+                spec = build_spec(mod)
+                try:
+                    save_spec(mod, spec)
+                except OSError:
+                    # Installations might be read-only.
+                    pass
 
         self.__class__.parser_spec = spec
         return spec
@@ -392,8 +434,7 @@ class Parser:
         name = lex.filename if lex.filename else '<string>'
 
         if tok is None:
-            position = pctx.SourcePoint(
-                line=lex.lineno, column=lex.column, pointer=lex.start)
+            position = lex.get_position()
             context = pctx.ParserContext(
                 name=name, buffer=lex.inputstr, start=position, end=position)
 
@@ -405,6 +446,100 @@ class Parser:
         return context
 
 
+# Files with precompiled parser tables consist of the format signature,
+# the hash of the grammar the tables were generated from, the checksum
+# of the pickled tables, and the pickled parsing.Spec.
+_SPEC_SIGNATURE = b'EDBSPEC\x01'
+_HASH_SIZE = hashlib.sha256().digest_size
+_SPEC_HEADER_SIZE = len(_SPEC_SIGNATURE) + 2 * _HASH_SIZE
+
+
+def get_grammar_hash(mod):
+    """Return a hash identifying the grammar defined in module *mod*.
+
+    The hash covers all modules in the package of *mod*, as grammars
+    are usually split into several modules.
+    """
+    h = hashlib.sha256()
+    h.update(getattr(parsing, '__version__', '').encode())
+    h.update(mod.__name__.encode())
+    h.update(pathlib.Path(__file__).read_bytes())
+
+    for path in sorted(pathlib.Path(mod.__file__).parent.glob('*.py')):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+
+    return h.digest()
+
+
+def get_spec_path(mod):
+    return os.path.join(
+        os.path.dirname(mod.__file__),
+        mod.__name__.rpartition('.')[2] + '.spec')
+
+
+def build_spec(mod):
+    """Generate parser tables for the grammar defined in module *mod*."""
+    return parsing.Spec(mod, skinny=True, verbose=False)
+
+
+def save_spec(mod, spec, path=None):
+    """Store parser tables generated by build_spec()."""
+    if path is None:
+        path = get_spec_path(mod)
+
+    payload = pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_SPEC_SIGNATURE)
+            f.write(get_grammar_hash(mod))
+            f.write(hashlib.sha256(payload).digest())
+            f.write(payload)
+        # Concurrent readers never see a partially written file.
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_spec(mod, path=None):
+    """Load parser tables stored by save_spec().
+
+    Returns None if the tables are missing, damaged, or were generated
+    from a different grammar.
+    """
+    if path is None:
+        path = get_spec_path(mod)
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if (len(data) < _SPEC_HEADER_SIZE or
+            not data.startswith(_SPEC_SIGNATURE)):
+        return None
+
+    pos = len(_SPEC_SIGNATURE)
+    grammar_hash = data[pos:pos + _HASH_SIZE]
+    checksum = data[pos + _HASH_SIZE:_SPEC_HEADER_SIZE]
+
+    payload = data[_SPEC_HEADER_SIZE:]
+
+    if (grammar_hash != get_grammar_hash(mod) or
+            hashlib.sha256(payload).digest() != checksum):
+        return None
+
+    try:
+        return pickle.loads(payload)
+    except Exception:
+        return None
+
+
 def line_col_from_char_offset(source, position):
     line = source[:position].count('\n') + 1
     col = source.rfind('\n', 0, position)
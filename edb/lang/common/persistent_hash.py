@@ -20,7 +20,7 @@
 """Persistent hash implementation for builtin types."""
 
 
-__all__ = ('persistent_hash', 'PersistentlyHashable')
+__all__ = ('persistent_hash', 'PersistentlyHashable', 'SetHash')
 
 
 import abc
@@ -114,14 +114,46 @@ def _frozenset(value):
     """Compute a persistent hash for a frozenset."""
     # This algorithm is borrowed from CPython implementation.
 
-    result = 1927868237
+    result = 0
 
-    for hash in sorted(persistent_hash(item) for item in value):
-        result ^= (hash ^ (hash << 16) ^ 89869747) * 3644798167
+    for item in value:
+        result ^= _frozenset_item(persistent_hash(item))
 
-    result = result * 69069 + 907133923
+    return _frozenset_result(result)
 
-    return result
+
+def _frozenset_item(hash):
+    return (hash ^ (hash << 16) ^ 89869747) * 3644798167
+
+
+def _frozenset_result(items):
+    return (1927868237 ^ items) * 69069 + 907133923
+
+
+class SetHash:
+    """Persistent hash of a set maintained incrementally.
+
+    Items are added and discarded by their persistent hashes.
+    The value is equal to the persistent hash of a frozenset of
+    the current items, but is updated in constant time.
+    """
+
+    __slots__ = ('_items',)
+
+    def __init__(self, hashes=()):
+        self._items = 0
+        for hash in hashes:
+            self.add(hash)
+
+    def add(self, hash):
+        self._items ^= _frozenset_item(hash)
+
+    def discard(self, hash):
+        # XOR is its own inverse.
+        self._items ^= _frozenset_item(hash)
+
+    def value(self):
+        return _frozenset_result(self._items)
 
 
 class PersistentlyHashable(metaclass=abc.ABCMeta):
@@ -378,6 +378,8 @@ class Statement(Expr):
 
 
 class SubjStatement(Statement):
+    __ast_mixin__ = True
+
     subject: Expr
     subject_alias: str
 
@@ -518,7 +520,7 @@ class Rename(DDL):
 
 
 class Delta:
-    pass
+    __slots__ = ()
 
 
 class CreateDelta(CreateObject, Delta):
@@ -544,7 +546,7 @@ class CommitDelta(ObjectDDL, Delta):
 
 
 class Database:
-    pass
+    __slots__ = ()
 
 
 class CreateDatabase(CreateObject, Database):
@@ -22,8 +22,8 @@ from .. import ast as qlast
 
 
 def parse_fragment(expr):
-    parser = EdgeQLExpressionParser()
-    return parser.parse(expr)
+    with EdgeQLExpressionParser.pooled() as parser:
+        return parser.parse(expr)
 
 
 def parse(expr, module_aliases=None):
@@ -47,5 +47,11 @@ def parse(expr, module_aliases=None):
 
 
 def parse_block(expr):
-    parser = EdgeQLBlockParser()
-    return parser.parse(expr)
+    with EdgeQLBlockParser.pooled() as parser:
+        return parser.parse(expr)
+
+
+def preload():
+    """Load the parser tables ahead of the first query."""
+    EdgeQLExpressionParser().get_parser_spec()
+    EdgeQLBlockParser().get_parser_spec()
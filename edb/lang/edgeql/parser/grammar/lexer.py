@@ -32,6 +32,7 @@ STATE_BASE = 1
 
 
 re_dquote = r'\$([A-Za-z\200-\377_][0-9]*)*\$'
+re_badident = re.compile(r'__[^\W\d]\w*__')
 
 Rule = lexer.Rule
 
@@ -43,14 +44,17 @@ class EdgeQLLexer(lexer.Lexer):
     NL = 'NL'
     MULTILINE_TOKENS = frozenset(('SCONST',))
     RE_FLAGS = re.X | re.M | re.I
+    SKIP_TOKENS = frozenset(('WS', 'NL', 'COMMENT'))
+    LAZY_POSITIONS = True
 
-    # Basic keywords
-    keyword_rules = [Rule(token=tok[0],
-                          next_state=STATE_KEEP,
-                          regexp=lexer.group(val))
-                     for val, tok in edgeql_keywords.items()]
+    keywords = {val: tok[0] for val, tok in edgeql_keywords.items()}
+
+    common_rules = [
+        # Identifiers and keywords
+        Rule(token='IDENT',
+             next_state=STATE_KEEP,
+             regexp=r'[^\W\d]\w*'),
 
-    common_rules = keyword_rules + [
         Rule(token='WS',
              next_state=STATE_KEEP,
              regexp=r'[^\S\n]+'),
@@ -131,15 +135,7 @@ class EdgeQLLexer(lexer.Lexer):
 
         Rule(token='BADIDENT',
              next_state=STATE_KEEP,
-             regexp=r'''
-                    __[^\W\d]\w*__
-                    |
-                    `__.*?__`
-                '''),
-
-        Rule(token='IDENT',
-             next_state=STATE_KEEP,
-             regexp=r'[^\W\d]\w*'),
+             regexp=r'`__.*?__`'),
 
         Rule(token='QIDENT',
              next_state=STATE_KEEP,
@@ -156,7 +152,16 @@ class EdgeQLLexer(lexer.Lexer):
     }
 
     def token_from_text(self, rule_token, txt):
-        if rule_token == 'BADIDENT':
+        if rule_token == 'IDENT':
+            kw_token = self.get_keyword_token(txt)
+            if kw_token is not None:
+                rule_token = kw_token
+            else:
+                badident = re_badident.match(txt)
+                if badident:
+                    self.handle_error(badident.group())
+
+        elif rule_token == 'BADIDENT':
             self.handle_error(txt)
 
         tok = super().token_from_text(rule_token, txt)
@@ -169,20 +174,5 @@ class EdgeQLLexer(lexer.Lexer):
 
         return tok
 
-    def lex(self):
-        buffer = []
-
-        for tok in super().lex():
-            tok_type = tok.type
-
-            if tok_type in {'WS', 'NL', 'COMMENT'}:
-                # Strip out whitespace and comments
-                continue
-            else:
-                if buffer:
-                    yield from iter(buffer)
-                    buffer[:] = []
-                yield tok
-
     def lex_highlight(self):
-        return super().lex()
+        return self._tokenize(frozenset())
@@ -21,8 +21,8 @@ from .parser import GraphQLParser
 
 
 def parse_fragment(expr):
-    parser = GraphQLParser()
-    return parser.parse(expr)
+    with GraphQLParser.pooled() as parser:
+        return parser.parse(expr)
 
 
 def parse(expr, module_aliases=None):
@@ -721,8 +721,8 @@ def translate(schema, graphql, *, variables=None, operation_name=None):
     query = re.sub(r'@edgedb\(.*?\)', '', graphql)
     schema2 = gt.GQLCoreSchema(schema)
 
-    parser = gqlparser.GraphQLParser()
-    gqltree = parser.parse(graphql)
+    with gqlparser.GraphQLParser.pooled() as parser:
+        gqltree = parser.parse(graphql)
     context = GraphQLTranslatorContext(
         schema=schema, gqlcore=schema2, query=query,
         variables=variables, operation_name=operation_name)
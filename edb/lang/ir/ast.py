@@ -57,6 +57,9 @@ class ASTError(EdgeDBError):
 
 class Base(ast.AST):
 
+    # Results memoized by type and cardinality inference.
+    __slots__ = ('_inferred_type_', '_inferred_cardinality_')
+
     __ast_hidden__ = {'context'}
 
     context: parsing.ParserContext
@@ -26,9 +26,18 @@ from edb.lang.schema import types as s_types
 class PathId:
     """Unique identifier of a path in an expression."""
 
-    __slots__ = ('_path', '_norm_path', '_namespace', '_prefix', '_is_ptr')
+    __slots__ = ('_path', '_norm_path', '_namespace', '_prefix', '_is_ptr',
+                 '_hash', '_extensions', '_prefixes')
 
     def __init__(self, initializer=None, *, namespace=None):
+        # PathIds are immutable once returned to the caller, so the
+        # hash is computed once, and the results of extend() and
+        # _get_prefix() are memoized, so that the same paths are
+        # represented by the same objects.
+        self._hash = None
+        self._extensions = None
+        self._prefixes = None
+
         if isinstance(initializer, PathId):
             self._path = initializer._path
             self._norm_path = initializer._norm_path
@@ -60,15 +69,21 @@ class PathId:
             self._is_ptr = False
 
     def __hash__(self):
-        return hash((
-            self.__class__, self._norm_path,
-            self._namespace, self._prefix, self._is_ptr))
+        if self._hash is None:
+            self._hash = hash((
+                self.__class__, self._norm_path,
+                self._namespace, self._prefix, self._is_ptr))
+        return self._hash
 
     def __eq__(self, other):
+        if self is other:
+            return True
+
         if not isinstance(other, PathId):
             return NotImplemented
 
         return (
+            hash(self) == hash(other) and
             self._norm_path == other._norm_path and
             self._namespace == other._namespace and
             self._prefix == other._prefix and
@@ -102,7 +117,14 @@ class PathId:
             elif prefix_len > size:
                 return self._prefix._get_prefix(size)
 
-        result = self.__class__()
+        if self._prefixes is None:
+            self._prefixes = {}
+        else:
+            result = self._prefixes.get(size)
+            if result is not None:
+                return result
+
+        result = self._prefixes[size] = self.__class__()
         result._path = self._path[0:size]
         result._norm_path = self._norm_path[0:size]
         result._prefix = self._prefix
@@ -333,6 +355,14 @@ class PathId:
         if target is None:
             target = link.get_far_endpoint(direction)
 
+        key = (link, direction, target, frozenset(ns) if ns else None)
+        if self._extensions is None:
+            self._extensions = {}
+        else:
+            result = self._extensions.get(key)
+            if result is not None:
+                return result
+
         is_linkprop = link.is_link_property()
         if is_linkprop and not self._is_ptr:
             raise ValueError('link property path extension on a non-link path')
@@ -368,6 +398,7 @@ class PathId:
         else:
             result._prefix = self._prefix
 
+        self._extensions[key] = result
         return result
 
     def ptr_path(self):
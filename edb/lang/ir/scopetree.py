@@ -19,6 +19,7 @@
 
 """Query scope tree implementation."""
 
+import contextlib
 import textwrap
 import typing
 import weakref
@@ -36,15 +37,6 @@ class InvalidScopeConfiguration(Exception):
 
 
 class ScopeTreeNode:
-    unique_id: typing.Optional[int]
-    """A unique identifier used to map scopes on sets."""
-
-    path_id: typing.Optional[pathid.PathId]
-    """Node path id, or None for branch nodes."""
-
-    fenced: bool
-    """Whether the subtree represents a SET OF argument."""
-
     protect_parent: bool
     """Whether the subtree represents a scope that must not affect parents."""
 
@@ -68,9 +60,10 @@ class ScopeTreeNode:
 
     def __init__(self, *, path_id: typing.Optional[pathid.PathId]=None,
                  fenced: bool=False, unique_id: typing.Optional[int]=None):
-        self.unique_id = unique_id
-        self.path_id = path_id
-        self.fenced = fenced
+        self._unique_id = unique_id
+        self._path_id = path_id
+        self._path_key = _path_key(path_id)
+        self._fenced = fenced
         self.protect_parent = False
         self.unnest_fence = False
         self.optional = False
@@ -78,6 +71,21 @@ class ScopeTreeNode:
         self.namespaces = set()
         self._parent = None
 
+        # Indexes of the subtree maintained by _set_parent().
+        # Path nodes are indexed by their path id with namespaces
+        # stripped (see _path_key()), so that a namespace-aware
+        # lookup only needs to check the nodes of a single bucket.
+
+        # Path key -> set of child nodes.
+        self._child_index = {}
+        # Path key -> set of strict descendants.
+        self._descendant_index = {}
+        # Path key -> set of strict descendants reachable
+        # without crossing a fence (strict_unfenced_descendants).
+        self._unfenced_index = {}
+        # Unique id -> set of strict descendants.
+        self._unique_id_index = {}
+
     def __repr__(self):
         return (f'<{type(self).__name__} '
                 f'{self.path_id!r} at {id(self):0x}>')
@@ -97,6 +105,44 @@ class ScopeTreeNode:
 
         return cp
 
+    @property
+    def unique_id(self) -> typing.Optional[int]:
+        """A unique identifier used to map scopes on sets."""
+        return self._unique_id
+
+    @unique_id.setter
+    def unique_id(self, unique_id: typing.Optional[int]) -> None:
+        with self._reindexing():
+            self._unique_id = unique_id
+
+    @property
+    def path_id(self) -> typing.Optional[pathid.PathId]:
+        """Node path id, or None for branch nodes."""
+        return self._path_id
+
+    @path_id.setter
+    def path_id(self, path_id: typing.Optional[pathid.PathId]) -> None:
+        with self._reindexing():
+            self._path_id = path_id
+            self._path_key = _path_key(path_id)
+
+    @property
+    def fenced(self) -> bool:
+        """Whether the subtree represents a SET OF argument."""
+        return self._fenced
+
+    @fenced.setter
+    def fenced(self, fenced: bool) -> None:
+        parent = self.parent
+        if parent is not None and fenced != self._fenced:
+            # Fencing changes the reachability of the whole subtree,
+            # so reattach it to reindex.
+            self._set_parent(None)
+            self._fenced = fenced
+            self._set_parent(parent)
+        else:
+            self._fenced = fenced
+
     @property
     def name(self):
         return self._name(debug=False)
@@ -366,7 +412,10 @@ class ScopeTreeNode:
 
         matching = set()
 
-        for node in self.descendants:
+        if _paths_equal_to_shortest_ns(self.path_id, path_id):
+            matching.add(self)
+
+        for node in self._descendant_index.get(_path_key(path_id), ()):
             if _paths_equal_to_shortest_ns(node.path_id, path_id):
                 matching.add(node)
 
@@ -404,7 +453,7 @@ class ScopeTreeNode:
         if self.path_id is not None:
             subtree = ScopeTreeNode()
 
-            for child in self.children:
+            for child in tuple(self.children):
                 subtree.attach_child(child)
         else:
             subtree = self
@@ -437,17 +486,19 @@ class ScopeTreeNode:
     def find_visible(self, path_id: pathid.PathId) \
             -> typing.Optional['ScopeTreeNode']:
         """Find the visible node with the given *path_id*."""
-        namespaces = set()
+        key = _path_key(path_id)
+        namespaces = frozenset()
 
-        for node, ans in self.ancestors_and_namespaces:
+        for node in self.ancestors:
             if _paths_equal(node.path_id, path_id, namespaces):
                 return node
 
-            for child in node.children:
+            for child in node._child_index.get(key, ()):
                 if _paths_equal(child.path_id, path_id, namespaces):
                     return child
 
-            namespaces |= ans
+            if node.namespaces:
+                namespaces |= node.namespaces
 
         return None
 
@@ -463,7 +514,7 @@ class ScopeTreeNode:
 
     def find_child(self, path_id: pathid.PathId) \
             -> typing.Optional['ScopeTreeNode']:
-        for child in self.children:
+        for child in self._child_index.get(_path_key(path_id), ()):
             if child.path_id == path_id:
                 return child
 
@@ -471,35 +522,65 @@ class ScopeTreeNode:
 
     def find_descendant(self, path_id: pathid.PathId) \
             -> typing.Optional['ScopeTreeNode']:
-        for child in self.strict_descendants:
-            if child.path_id == path_id:
-                return child
+        matching = {
+            node for node in self._descendant_index.get(
+                _path_key(path_id), ())
+            if node.path_id == path_id
+        }
 
-        return None
+        return self._find_topmost(matching)
 
     def find_unfenced(self, path_id: pathid.PathId) \
             -> typing.Tuple[typing.Optional['ScopeTreeNode'], bool]:
         """Find the unfenced node with the given *path_id*."""
-        namespaces = set()
+        key = _path_key(path_id)
+        namespaces = frozenset()
         unnest_fence_seen = False
 
-        for node, ans in self.ancestors_and_namespaces:
-            for descendant in node.unfenced_descendants:
-                if _paths_equal(descendant.path_id, path_id, namespaces):
-                    return descendant, unnest_fence_seen
+        for node in self.ancestors:
+            if _paths_equal(node.path_id, path_id, namespaces):
+                return node, unnest_fence_seen
 
-            namespaces |= ans
+            matching = {
+                descendant
+                for descendant in node._unfenced_index.get(key, ())
+                if _paths_equal(descendant.path_id, path_id, namespaces)
+            }
+
+            if matching:
+                return node._find_topmost(matching), unnest_fence_seen
+
+            if node.namespaces:
+                namespaces |= node.namespaces
             unnest_fence_seen = unnest_fence_seen or node.unnest_fence
 
         return None, unnest_fence_seen
 
     def find_by_unique_id(self, unique_id: int) \
             -> typing.Optional['ScopeTreeNode']:
-        for node in self.descendants:
-            if node.unique_id == unique_id:
-                return node
+        if self.unique_id == unique_id:
+            return self
 
-        return None
+        return self._find_topmost(self._unique_id_index.get(unique_id))
+
+    def _find_topmost(self, nodes) -> typing.Optional['ScopeTreeNode']:
+        """Return the node in *nodes* that is closest to this node.
+
+        This is the node that a top-first scan of the descendants
+        would find first: none of its ancestors below this node
+        are in *nodes*.
+        """
+        if not nodes:
+            return None
+
+        result = next(iter(nodes))
+        for ancestor in result.strict_ancestors:
+            if ancestor is self:
+                break
+            elif ancestor in nodes:
+                result = ancestor
+
+        return result
 
     def copy(self) -> 'ScopeTreeNode':
         """Return a complete copy of this subtree."""
@@ -545,13 +626,95 @@ class ScopeTreeNode:
         if current_parent is not None:
             # Make sure no other node refers to us.
             current_parent.children.remove(self)
+            current_parent._update_indexes(self, remove=True)
 
         if parent is not None:
             self._parent = weakref.ref(parent)
             parent.children.add(self)
+            parent._update_indexes(self)
         else:
             self._parent = None
 
+    @contextlib.contextmanager
+    def _reindexing(self):
+        """Update the parent indexes when this node's own key changes."""
+        parent = self.parent
+        if parent is None:
+            yield
+        else:
+            parent._update_indexes(self, remove=True, subtree=False)
+            yield
+            parent._update_indexes(self, subtree=False)
+
+    def _update_indexes(self, child: 'ScopeTreeNode', *,
+                        remove: bool=False, subtree: bool=True) -> None:
+        """Add (or remove) *child* to the indexes of this node's ancestors.
+
+        If *subtree* is True, the descendants of *child* are
+        (un)indexed too.  Every ancestor indexes every node of the
+        subtree, so attaching or detaching a subtree costs
+        O(depth * size of the subtree), and so does a change of its
+        fence.  The lookups, which are far more frequent than the tree
+        changes, are then independent of the size of the tree.
+        """
+        if subtree:
+            nodes = list(child.descendants)
+            if child.fenced:
+                unfenced = []
+            else:
+                unfenced = list(child.unfenced_descendants)
+        else:
+            nodes = [child]
+            unfenced = [] if child.fenced else [child]
+
+        path_nodes = [n for n in nodes if n._path_key is not None]
+        unfenced = [n for n in unfenced if n._path_key is not None]
+        id_nodes = [n for n in nodes if n.unique_id is not None]
+
+        update = _index_remove if remove else _index_add
+
+        if child._path_key is not None:
+            update(self._child_index, child._path_key, child)
+
+        for ancestor in self.ancestors:
+            for node in path_nodes:
+                update(ancestor._descendant_index, node._path_key, node)
+
+            for node in id_nodes:
+                update(ancestor._unique_id_index, node.unique_id, node)
+
+            for node in unfenced:
+                update(ancestor._unfenced_index, node._path_key, node)
+
+            if ancestor.fenced:
+                # The nodes are not reachable from the outer
+                # ancestors without crossing this fence.
+                unfenced = []
+
+
+def _path_key(path_id: typing.Optional[pathid.PathId]) \
+        -> typing.Optional[pathid.PathId]:
+    # Path ids that are equal with some namespaces stripped
+    # are equal with all namespaces stripped.
+    if path_id is not None and path_id.namespace:
+        return path_id.replace_namespace(None)
+    else:
+        return path_id
+
+
+def _index_add(index, key, node):
+    try:
+        index[key].add(node)
+    except KeyError:
+        index[key] = {node}
+
+
+def _index_remove(index, key, node):
+    nodes = index[key]
+    nodes.discard(node)
+    if not nodes:
+        del index[key]
+
 
 def _paths_equal(path_id_1: pathid.PathId, path_id_2: pathid.PathId,
                  namespaces: typing.Set[str]) -> bool:
@@ -111,6 +111,7 @@ class ScalarTypeDeclaration(Declaration):
 
 
 class AttributeDeclaration(Declaration):
+    abstract: bool = False
     type: qlast.TypeExpr
 
 
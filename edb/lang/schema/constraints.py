@@ -80,6 +80,10 @@ class Constraint(inheriting.InheritingObject):
 
     errmessage = so.Field(str, default=None, compcoef=0.971)
 
+    # Whether a backend check emulating the constraint on descendant
+    # tables runs once per INSERT statement instead of once per row.
+    check_per_statement = so.Field(bool, default=None, compcoef=0.971)
+
     def generic(self):
         return self.subject is None
 
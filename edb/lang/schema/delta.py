@@ -441,6 +441,11 @@ class Command(struct.MixedStruct, metaclass=CommandMeta):
             op.copy() for op in self.before_ops)
         return result
 
+    def __setstate__(self, state):
+        # Struct.__setstate__() restores the fields with update(),
+        # which is overridden here to add subcommands.
+        self.__dict__.update(state)
+
     @classmethod
     def adapt(cls, obj):
         result = obj.copy_with_class(cls)
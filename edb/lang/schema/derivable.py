@@ -53,7 +53,9 @@ class DerivableObjectBase:
         else:
             derived_name = name
 
-        derived = self.copy()
+        # References of the derived object are rederived or
+        # inherited from the bases, copying them would be a waste.
+        derived = self.copy(shared_refs=True)
         if attrs is not None:
             derived.update(attrs)
         derived.name = derived_name
@@ -149,6 +149,9 @@ class AlterInheritingObject(named.AlterNamedObject, InheritingObjectCommand):
         for op in self.get_subcommands(type=RebaseNamedObject):
             op.apply(schema, context)
 
+        # The bases might have also been altered directly.
+        schema.drop_inheritance_cache_for_child(scls)
+
         scls.acquire_ancestor_inheritance(schema)
 
         return scls
@@ -203,6 +206,7 @@ class RebaseNamedObject(named.NamedObjectCommand):
             index = {b.name: i for i, b in enumerate(bases)}
 
         scls.bases = bases
+        schema.drop_inheritance_cache_for_child(scls)
 
         return scls
 
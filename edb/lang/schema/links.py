@@ -97,8 +97,8 @@ class Link(sources.Source, pointers.Pointer):
 
         return super().compare(other, context=context)
 
-    def copy(self):
-        result = super().copy()
+    def copy(self, *, shared_refs=False):
+        result = super().copy(shared_refs=shared_refs)
         result.source = self.source
         result.target = self.target
         result.default = self.default
@@ -91,8 +91,8 @@ class Property(pointers.Pointer):
             raise ValueError(f'{self.name} is abstract')
         return isinstance(self.source, pointers.Pointer)
 
-    def copy(self):
-        result = super().copy()
+    def copy(self, *, shared_refs=False):
+        result = super().copy(shared_refs=shared_refs)
         result.source = self.source
         result.target = self.target
         result.default = self.default
@@ -20,7 +20,7 @@
 import builtins
 import collections
 
-from edb.lang.common.persistent_hash import persistent_hash
+from edb.lang.common.persistent_hash import persistent_hash, SetHash
 from edb.lang.common.ordered import OrderedSet
 
 from edb.lang.edgeql import ast as qlast
@@ -47,6 +47,15 @@ class Module(named.NamedObject):
         self.index_by_name = collections.OrderedDict()
         self.index_by_type = {}
         self.index_derived = set()
+        # Base name -> names of objects directly inheriting from it.
+        self.index_by_base = {}
+        # Object name -> base names it is indexed under.
+        self._indexed_bases = {}
+        # Object -> its hash included in _checksum, or None.
+        self._object_hashes = {}
+        # Objects whose hashes changed since the last checksum.
+        self._changed_objects = set()
+        self._checksum = SetHash()
 
     def copy(self):
         result = self.__class__(name=self.name, imports=self.imports)
@@ -72,6 +81,13 @@ class Module(named.NamedObject):
         if getattr(obj, 'is_derived', None):
             self.index_derived.add(obj.name)
 
+        self._index_bases(obj)
+
+        # The module subscribes to changes of the object once it has
+        # hashed it, which is not needed for most objects of overlays.
+        self._object_hashes[obj] = None
+        self._changed_objects.add(obj)
+
     def discard(self, obj):
         existing = self.index_by_name.pop(obj.name, None)
         if existing is not None:
@@ -96,6 +112,48 @@ class Module(named.NamedObject):
         self.index_by_name.pop(obj.name, None)
         self.index_by_type[obj.__class__._type].remove(obj.name)
         self.index_derived.discard(obj.name)
+        self._unindex_bases(obj.name)
+
+        if obj in self._object_hashes:
+            obj_hash = self._object_hashes.pop(obj)
+            if obj_hash is not None:
+                self._checksum.discard(obj_hash)
+            self._changed_objects.discard(obj)
+            obj._discard_hash_dependent(self)
+
+    def _hash_dependency_changed(self, obj):
+        if obj in self._object_hashes:
+            self._changed_objects.add(obj)
+        else:
+            super()._hash_dependency_changed(obj)
+
+    def update_bases(self, obj):
+        """Update the inheritance index after the bases of *obj* changed."""
+        if self.index_by_name.get(obj.name) is obj:
+            self._unindex_bases(obj.name)
+            self._index_bases(obj)
+
+    def rename_base(self, old_name, new_name):
+        """Update the inheritance index after a base was renamed."""
+        children = self.index_by_base.pop(old_name, None)
+        if children:
+            self.index_by_base.setdefault(new_name, set()).update(children)
+            for name in children:
+                bases = self._indexed_bases[name]
+                self._indexed_bases[name] = (bases - {old_name}) | {new_name}
+
+    def _index_bases(self, obj):
+        bases = frozenset(b.name for b in getattr(obj, 'bases', None) or ())
+        self._indexed_bases[obj.name] = bases
+        for base in bases:
+            self.index_by_base.setdefault(base, set()).add(obj.name)
+
+    def _unindex_bases(self, name):
+        for base in self._indexed_bases.pop(name, ()):
+            children = self.index_by_base[base]
+            children.discard(name)
+            if not children:
+                del self.index_by_base[base]
 
     def lookup_qname(self, name):
         return self.index_by_name.get(name)
@@ -195,13 +253,24 @@ class Module(named.NamedObject):
         return SchemaIterator(self, type, include_derived=include_derived)
 
     def get_checksum(self):
-        if self.index_by_name:
-            objects = frozenset(self)
-            checksum = persistent_hash(objects)
-        else:
-            checksum = persistent_hash(None)
+        if not self._object_hashes:
+            return persistent_hash(None)
+
+        # Only the hashes of the objects that changed since the last
+        # call are recomputed.
+        for obj in self._changed_objects:
+            old_hash = self._object_hashes[obj]
+            if old_hash is not None:
+                self._checksum.discard(old_hash)
+            else:
+                obj._add_hash_dependent(self)
+            new_hash = obj.persistent_hash()
+            self._checksum.add(new_hash)
+            self._object_hashes[obj] = new_hash
+
+        self._changed_objects.clear()
 
-        return checksum
+        return self._checksum.value()
 
 
 class SchemaIterator:
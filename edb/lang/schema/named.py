@@ -237,6 +237,7 @@ class RenameNamedObject(NamedObjectCommand):
         schema.delete(scls)
         scls.name = self.new_name
         schema.add(scls)
+        schema.rename_base(self.old_name, self.new_name)
 
         parent_ctx = context.get(sd.CommandContextToken)
         for subop in parent_ctx.op.get_subcommands(type=NamedObjectCommand):
@@ -22,6 +22,7 @@ import itertools
 import pathlib
 import re
 import uuid
+import weakref
 
 from edb.lang.common import nlang
 from edb.lang.common import parsing
@@ -36,6 +37,9 @@ from . import name as sn
 
 _TYPE_IDS = None
 
+# Objects whose persistent hash is being computed, innermost last.
+_hashing_stack = []
+
 
 def load_type_ids():
     import edb.api
@@ -166,6 +170,15 @@ class ObjectMeta(struct.MixedStructMeta):
         return mcls._schema_metaclasses
 
 
+class _HashDependents(weakref.WeakSet):
+    """Objects whose cached persistent hashes depend on an object."""
+
+    def __reduce__(self):
+        # Schema snapshots pickle the whole object graph, so the
+        # dependents are restored along with the object.
+        return self.__class__, (list(self),)
+
+
 class Object(struct.MixedStruct, metaclass=ObjectMeta):
     """Base schema item class."""
 
@@ -215,6 +228,39 @@ class Object(struct.MixedStruct, metaclass=ObjectMeta):
 
         return tuple(criteria)
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._fields:
+            self._invalidate_hash()
+
+    def _invalidate_hash(self):
+        """Drop the cached persistent hash of this object.
+
+        Must be called after in-place changes of the values of
+        hashable fields.  Objects and modules whose hashes were
+        computed from the hash of this object are notified.
+        """
+        if self.__dict__.pop('_persistent_hash', None) is not None:
+            dependents = self.__dict__.get('_hash_dependents')
+            if dependents:
+                for dependent in list(dependents):
+                    dependent._hash_dependency_changed(self)
+
+    def _hash_dependency_changed(self, obj):
+        self._invalidate_hash()
+
+    def _add_hash_dependent(self, dependent):
+        try:
+            dependents = self.__dict__['_hash_dependents']
+        except KeyError:
+            dependents = self._hash_dependents = _HashDependents()
+        dependents.add(dependent)
+
+    def _discard_hash_dependent(self, dependent):
+        dependents = self.__dict__.get('_hash_dependents')
+        if dependents:
+            dependents.discard(dependent)
+
     def set_attribute(self, name, value, *,
                       dctx=None, source=None, source_context=None):
         """Set the attribute `name` to `value`."""
@@ -239,6 +285,18 @@ class Object(struct.MixedStruct, metaclass=ObjectMeta):
             if source_context is not None:
                 self._attr_source_contexts[name] = source_context
 
+    def copy(self, *, shared_refs=False):
+        """Return a copy of this object.
+
+        Objects referenced by the copy, such as the pointers of
+        an object type, are copied as well, unless *shared_refs* is
+        true, in which case the copy refers to the same objects as the
+        original.  The collections holding the references are always
+        copied, so references can be replaced without affecting the
+        original.
+        """
+        return super().copy()
+
     def get_attribute_source_context(self, name):
         return self._attr_source_contexts.get(name)
 
@@ -253,8 +311,23 @@ class Object(struct.MixedStruct, metaclass=ObjectMeta):
         The hash must be externally stable, i.e. stable across the runs
         and thus must not contain default object hashes (addresses),
         including that of None.
+
+        The hash is cached until a field of the object, or of an
+        object it was computed from, changes.
         """
-        return phash.persistent_hash(self.hash_criteria())
+        if _hashing_stack:
+            self._add_hash_dependent(_hashing_stack[-1])
+
+        result = self.__dict__.get('_persistent_hash')
+        if result is None:
+            _hashing_stack.append(self)
+            try:
+                result = phash.persistent_hash(self.hash_criteria())
+            finally:
+                _hashing_stack.pop()
+            self._persistent_hash = result
+
+        return result
 
     def inheritable_fields(self):
         for fn, f in self.__class__.get_fields().items():
@@ -648,6 +721,8 @@ class Object(struct.MixedStruct, metaclass=ObjectMeta):
 
     def __getstate__(self):
         state = self.__dict__.copy()
+        state.pop('_persistent_hash', None)
+        state.pop('_hash_dependents', None)
 
         refs = []
 
@@ -21,8 +21,8 @@ from .parser import EdgeSchemaParser
 
 
 def parse_fragment(expr):
-    parser = EdgeSchemaParser()
-    return parser.parse(expr)
+    with EdgeSchemaParser.pooled() as parser:
+        return parser.parse(expr)
 
 
 def parse(expr, module_aliases=None):
@@ -49,6 +49,7 @@ re_intpart = r"(?:{dec}(?:{dec_}*{dec})?)".format(dec_=re_decdigit_,
                                                   dec=re_decdigit)
 re_exppart = r"(?:[eE](?:[\+\-])?{int})".format(int=re_intpart)
 re_dquote = r'\$([A-Za-z\200-\377_][0-9]*)*\$'
+re_badident = re.compile(r'__[^\W\d]\w*__')
 
 
 Rule = lexer.Rule
@@ -126,14 +127,11 @@ class EdgeSchemaLexer(lexer.Lexer):
         next_state=STATE_KEEP,
         regexp=r'\\.+?$')
 
-    # Basic keywords
-    keyword_rules = [Rule(token=tok[0],
-                          next_state=STATE_KEEP,
-                          regexp=lexer.group(val))
-                     for val, tok in edge_schema_keywords.items()
-                     if tok[0] not in {'LINK', 'TO', 'EXTENDING', 'ATTRIBUTE'}]
+    # Keywords that need rules of their own are not in the table.
+    keywords = {val: tok[0] for val, tok in edge_schema_keywords.items()
+                if tok[0] not in {'LINK', 'TO', 'EXTENDING', 'ATTRIBUTE'}}
 
-    common_rules = keyword_rules + [
+    common_rules = [
         Rule(token='LINK',
              next_state=STATE_KEEP,
              regexp=r'\bLINK\b'),
@@ -152,6 +150,9 @@ class EdgeSchemaLexer(lexer.Lexer):
              next_state=STATE_ATTRIBUTE_RAW_TYPE,
              regexp=r'\bATTRIBUTE\b'),
 
+        # Identifiers and keywords
+        ident_rule,
+
         comment_rule,
 
         Rule(token='WS',
@@ -209,14 +210,9 @@ class EdgeSchemaLexer(lexer.Lexer):
 
         Rule(token='BADIDENT',
              next_state=STATE_KEEP,
-             regexp=r'''
-                    __[^\W\d]\w*__
-                    |
-                    `__.*?__`
-                '''),
+             regexp=r'`__.*?__`'),
 
         string_rule,
-        ident_rule,
         qident_rule,
     ]
 
@@ -340,7 +336,16 @@ class EdgeSchemaLexer(lexer.Lexer):
     }
 
     def token_from_text(self, rule_token, txt):
-        if rule_token == 'BADIDENT':
+        if rule_token == 'IDENT':
+            kw_token = self.get_keyword_token(txt)
+            if kw_token is not None:
+                rule_token = kw_token
+            else:
+                badident = re_badident.match(txt)
+                if badident:
+                    self.handle_error(badident.group())
+
+        elif rule_token == 'BADIDENT':
             self.handle_error(txt)
 
         tok = super().token_from_text(rule_token, txt)
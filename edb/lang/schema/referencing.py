@@ -416,8 +416,8 @@ class ReferencingObject(inheriting.InheritingObject,
             self._resolve_inherited_classref_dict(
                 _objects, _resolve, attr, local_attr)
 
-    def copy(self):
-        result = super(ReferencingObject, self).copy()
+    def copy(self, *, shared_refs=False):
+        result = super(ReferencingObject, self).copy(shared_refs=shared_refs)
 
         for refdict in self.__class__.get_refdicts():
             attr = refdict.attr
@@ -425,7 +425,10 @@ class ReferencingObject(inheriting.InheritingObject,
             all_coll = getattr(self, attr)
             local_coll = getattr(self, local_attr)
 
-            coll_copy = {n: p.copy() for n, p in all_coll.items()}
+            if shared_refs:
+                coll_copy = dict(all_coll)
+            else:
+                coll_copy = {n: p.copy() for n, p in all_coll.items()}
             setattr(result, attr, coll_copy)
             setattr(result, local_attr, {n: coll_copy[n] for n in local_coll})
 
@@ -561,6 +564,7 @@ class ReferencingObject(inheriting.InheritingObject,
 
         local_coll[key] = obj
         all_coll[key] = obj
+        self._invalidate_hash()
 
     def del_classref(self, collection, obj_name, schema):
         refdict = self.__class__.get_refdict(collection)
@@ -584,6 +588,7 @@ class ReferencingObject(inheriting.InheritingObject,
                     descendant_coll.pop(key, None)
 
         local_coll.pop(key, None)
+        self._invalidate_hash()
 
     def _get_classref_dict(self, attr):
         values = getattr(self, attr)
@@ -605,6 +610,8 @@ class ReferencingObject(inheriting.InheritingObject,
                 if isinstance(v, so.ObjectRef):
                     values[n] = _resolve(v.classname)
 
+            self._invalidate_hash()
+
     def _resolve_inherited_classref_dict(self, _objects, _resolve,
                                          attr, local_attr):
         values = getattr(self, attr)
@@ -78,8 +78,8 @@ class ScalarType(nodes.Node, constraints.ConsistencySubject,
 
         return deps
 
-    def copy(self):
-        result = super().copy()
+    def copy(self, *, shared_refs=False):
+        result = super().copy(shared_refs=shared_refs)
         result.default = self.default
         return result
 
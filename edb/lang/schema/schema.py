@@ -47,6 +47,9 @@ class Schema(TypeContainer):
         self._policy_schema = None
         self._virtual_inheritance_cache = {}
         self._inheritance_cache = {}
+        # Bumped on every change that might affect inheritance,
+        # invalidating the entries of _inheritance_cache.
+        self._inheritance_generation = 0
 
     def copy(self):
         result = type(self)()
@@ -65,6 +68,7 @@ class Schema(TypeContainer):
         name = class_module.name
         self.modules[name] = class_module
         self._policy_schema = None
+        self._inheritance_generation += 1
 
     def get_module(self, module):
         return self.modules[module]
@@ -84,6 +88,7 @@ class Schema(TypeContainer):
             module_name = class_module.name
 
         del self.modules[module_name]
+        self._inheritance_generation += 1
 
     def add_delta(self, delta):
         """Add a delta to the schema.
@@ -117,6 +122,7 @@ class Schema(TypeContainer):
                 f'module {obj.name.module!r} is not in this schema') from e
 
         module.add(obj)
+        self._inheritance_generation += 1
 
     def discard(self, obj):
         try:
@@ -124,6 +130,7 @@ class Schema(TypeContainer):
         except KeyError:
             return
 
+        self._inheritance_generation += 1
         return module.discard(obj)
 
     def delete(self, obj):
@@ -133,12 +140,14 @@ class Schema(TypeContainer):
             raise s_err.SchemaModuleNotFoundError(
                 f'module {obj.name.module} is not in this schema') from e
 
+        self._inheritance_generation += 1
         return module.delete(obj)
 
     def clear(self):
         self.modules.clear()
         self._virtual_inheritance_cache.clear()
         self._inheritance_cache.clear()
+        self._inheritance_generation += 1
         self._policy_schema = None
 
     def reorder(self, new_order):
@@ -240,28 +249,43 @@ class Schema(TypeContainer):
 
         class_children.update(c.name for c in children if c is not scls)
         scls._virtual_children = set(children)
+        self._inheritance_generation += 1
 
     def drop_inheritance_cache(self, scls):
-        self._inheritance_cache.pop(scls.name, None)
+        self._inheritance_generation += 1
 
     def drop_inheritance_cache_for_child(self, scls):
-        bases = getattr(scls, 'bases', ())
+        """Update the inheritance index after the bases of *scls* changed."""
+        for module in self._resolve_module(scls.name.module):
+            module.update_bases(scls)
 
-        for base in bases:
-            self._inheritance_cache.pop(base.name, None)
+        self._inheritance_generation += 1
+
+    def rename_base(self, old_name, new_name):
+        """Update the inheritance index after a base was renamed."""
+        for module in self.modules.values():
+            module.rename_base(old_name, new_name)
+
+        self._inheritance_generation += 1
+
+    def _get_inheritance_generation(self):
+        return self._inheritance_generation
 
     def _get_descendants(self, scls, *, max_depth=None, depth=0):
+        generation = self._get_inheritance_generation()
+        key = (scls.name, max_depth, depth)
+
+        cached = self._inheritance_cache.get(key)
+        if (cached is not None and cached[0] == generation and
+                cached[1] is scls):
+            return set(cached[2])
+
         result = set()
 
         try:
             children = scls._virtual_children
         except AttributeError:
-            try:
-                child_names = self._inheritance_cache[scls.name]
-                raise KeyError
-            except KeyError:
-                child_names = self._find_children(scls)
-                self._inheritance_cache[scls.name] = child_names
+            child_names = self._find_children(scls)
         else:
             child_names = [c.material_type().name for c in children]
 
@@ -274,12 +298,23 @@ class Schema(TypeContainer):
                     child, max_depth=max_depth, depth=depth + 1))
 
         result.update(children)
+
+        self._inheritance_cache[key] = (generation, scls, frozenset(result))
         return result
 
     def _find_children(self, scls):
-        flt = lambda p: scls in p.bases
-        it = self.get_objects(type=scls._type)
-        return {c.name for c in filter(flt, it)}
+        result = set()
+
+        for module in self.get_modules():
+            for name in module.index_by_base.get(scls.name, ()):
+                if name in module.index_derived:
+                    continue
+
+                child = module.index_by_name[name]
+                if child._type == scls._type and scls in child.bases:
+                    result.add(name)
+
+        return result
 
     def get_event_policy(self, subject_class, event_class):
         from . import policy as spol
@@ -306,7 +341,8 @@ class Schema(TypeContainer):
         return persistent_hash(frozenset(c))
 
     def get_checksum_details(self):
-        objects = list(sorted(self, key=lambda e: e.name))
+        objects = sorted(self.get_objects(include_derived=True),
+                         key=lambda e: e.name)
         return [(str(o.name), persistent_hash(o)) for o in objects]
 
     def get_objects(self, *, type=None, include_derived=False):
@@ -330,9 +366,10 @@ class SchemaOverlay(Schema):
         self._local_vic = {}
         self._virtual_inheritance_cache = collections.ChainMap(
             self._local_vic, schema._virtual_inheritance_cache)
-        self._local_ic = {}
-        self._inheritance_cache = collections.ChainMap(
-            self._local_ic, schema._inheritance_cache)
+        # Entries of the underlying schema cache do not account
+        # for the objects in this overlay.
+        self._inheritance_cache = {}
+        self._inheritance_generation = 0
 
         if extra:
             for v in extra.values():
@@ -346,6 +383,23 @@ class SchemaOverlay(Schema):
         yield from self.local_modules.values()
         yield from self.schema.get_modules()
 
+    def drop_inheritance_cache_for_child(self, scls):
+        # The object might be in the underlying schema.
+        self.schema.drop_inheritance_cache_for_child(scls)
+        super().drop_inheritance_cache_for_child(scls)
+
+    def rename_base(self, old_name, new_name):
+        # Children in the underlying schema are indexed there.
+        self.schema.rename_base(old_name, new_name)
+        for module in self.local_modules.values():
+            module.rename_base(old_name, new_name)
+
+        self._inheritance_generation += 1
+
+    def _get_inheritance_generation(self):
+        return (self._inheritance_generation,
+                self.schema._get_inheritance_generation())
+
     def add(self, obj):
         if obj.name.module not in self.local_modules:
             self.local_modules[obj.name.module] = s_modules.Module(
@@ -443,8 +443,8 @@ class Source(indexes.IndexableSubject):
             module = next(iter(names)).module
         return sn.Name(name=name, module=module)
 
-    def copy(self):
-        result = super().copy()
+    def copy(self, *, shared_refs=False):
+        result = super().copy(shared_refs=shared_refs)
 
         virt_children = getattr(self, '_virtual_children', None)
         if virt_children:
@@ -156,9 +156,14 @@ def resolve_typeref(ref: so.Object, schema) -> so.Object:
         else:
             obj = ref
 
-    else:
+    elif isinstance(ref, so.ObjectRef):
         obj = schema.get(ref.classname)
 
+    else:
+        # An object of another schema, such as the one the
+        # referencing delta command was canonicalized against.
+        obj = schema.get(ref.name)
+
     return obj
 
 
@@ -0,0 +1,307 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A pool of processes compiling queries off the event loop.
+
+Workers are given the schema by its version in the server schema
+cache and receive the pickled schema only if they don't have that
+version already.  Errors raised by the compilation are re-raised by
+the pool.  Scripts that do anything but querying are not compiled by
+the pool, and neither are scripts that a worker fails to respond to:
+in these cases the caller is expected to compile the script in
+process.
+"""
+
+
+import asyncio
+import collections
+import multiprocessing
+import pickle
+
+from edb.lang.common import ast
+from edb.lang.common import exceptions
+
+from edb.server import cluster
+from edb.server import defines
+from edb.server import planner
+from edb.server import protocol
+from edb.server.pgsql import backend
+from edb.server.pgsql import schemacache
+
+
+# Worker responses
+_OK = 'ok'
+_NO_SCHEMA = 'no-schema'
+_NOT_COMPILED = 'not-compiled'
+_ERROR = 'error'
+
+
+def _compile(bk, script, *, graphql, flags, output_format):
+    timer = protocol.Timer()
+
+    statements = planner.parse_script(
+        script, bk.schema, graphql=graphql, timer=timer)
+
+    if not all(planner.is_query(stmt) for stmt in statements):
+        return None, None
+
+    plans = [
+        planner.plan_statement(
+            stmt, bk, flags, timer=timer, output_format=output_format)
+        for stmt in statements
+    ]
+
+    return plans, timer.as_dict()
+
+
+def _worker_main(conn):
+    if not cluster.is_in_dev_mode():
+        ast.enable_type_checks(False)
+
+    schema_cache = schemacache.SchemaCache()
+    backends = {}
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+
+        (dbname, version, snapshot, script, modaliases,
+            graphql, flags, output_format) = request
+
+        if snapshot is not None:
+            try:
+                schema_cache.load_snapshot(snapshot)
+            except Exception:
+                conn.send((_NOT_COMPILED,))
+                continue
+
+        entry = schema_cache.get(dbname)
+        if entry is None or entry.version != version:
+            conn.send((_NO_SCHEMA,))
+            continue
+
+        bk = backends.get(dbname)
+        if bk is None:
+            bk = backends[dbname] = backend.Backend(None)
+        if bk.schema is not entry.schema:
+            bk.use_cached_schema(entry)
+        bk.modaliases = modaliases
+
+        try:
+            plans, timings = _compile(
+                bk, script, graphql=graphql, flags=flags,
+                output_format=output_format)
+        except Exception as e:
+            try:
+                error = pickle.dumps(e)
+            except Exception:
+                # The error is reported by compiling in process.
+                conn.send((_NOT_COMPILED,))
+            else:
+                conn.send((_ERROR, error))
+        else:
+            conn.send((_OK, plans, timings))
+
+
+class _Worker:
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+
+
+class CompilerPool:
+    """A fixed number of compiler processes shared by all connections."""
+
+    def __init__(self, *, size, loop,
+                 timeout=defines.COMPILE_TIMEOUT):
+        self._size = size
+        self._timeout = timeout
+        self._loop = loop
+
+        self._mp = multiprocessing.get_context('forkserver')
+        self._mp.set_forkserver_preload([__name__])
+
+        self._workers = []
+        self._idle = collections.deque()
+        self._waiters = collections.deque()
+        self._closed = False
+
+    def start(self):
+        for _ in range(self._size):
+            self._idle.append(self._start_worker())
+
+    async def compile(self, entry, script, *, modaliases, graphql, flags,
+                      timer, output_format):
+        """Compile a script consisting of queries.
+
+        Returns a list of query plans, or None if the script must be
+        compiled in process.  Compilation errors are re-raised.
+        """
+
+        worker = await self._acquire()
+        try:
+            result = await asyncio.wait_for(
+                self._compile(
+                    worker, entry, script, modaliases=modaliases,
+                    graphql=graphql, flags=flags,
+                    output_format=output_format),
+                self._timeout, loop=self._loop)
+
+        except asyncio.TimeoutError:
+            # There is no way to interrupt the compilation other than
+            # to kill the worker.
+            self._replace_worker(worker)
+            worker = None
+            raise exceptions.QueryCanceledError(
+                'query compilation timed out') from None
+
+        except (EOFError, OSError):
+            # The worker died, the script is compiled in process.
+            self._replace_worker(worker)
+            worker = None
+            return None
+
+        except BaseException:
+            # The worker might be in the middle of a response.
+            self._replace_worker(worker)
+            worker = None
+            raise
+
+        finally:
+            if worker is not None:
+                self._release(worker)
+
+        status, *payload = result
+        if status == _ERROR:
+            try:
+                error = pickle.loads(payload[0])
+            except Exception:
+                return None
+            raise error
+
+        elif status != _OK:
+            return None
+
+        plans, timings = payload
+        if plans is not None:
+            timer.add(timings)
+        return plans
+
+    async def _compile(self, worker, entry, script, *, modaliases,
+                       graphql, flags, output_format):
+        def request(snapshot):
+            return (entry.dbname, entry.version, snapshot, script,
+                    modaliases, graphql, flags, output_format)
+
+        result = await self._call(worker, request(None))
+        if result[0] == _NO_SCHEMA:
+            # The snapshot is large, the worker might not read it
+            # as fast as it is written.
+            result = await self._call(
+                worker, request(entry.get_snapshot()), send_in_thread=True)
+
+        return result
+
+    async def _call(self, worker, request, *, send_in_thread=False):
+        loop = self._loop
+        fd = worker.conn.fileno()
+        response = loop.create_future()
+
+        def on_readable():
+            loop.remove_reader(fd)
+            try:
+                response.set_result(worker.conn.recv())
+            except Exception as e:
+                response.set_exception(e)
+
+        if send_in_thread:
+            await loop.run_in_executor(None, worker.conn.send, request)
+        else:
+            worker.conn.send(request)
+        loop.add_reader(fd, on_readable)
+        try:
+            return await response
+        finally:
+            loop.remove_reader(fd)
+
+    async def _acquire(self):
+        if self._closed:
+            raise RuntimeError('the compiler pool is closed')
+
+        while not self._idle:
+            waiter = self._loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wakeup_waiter()
+                raise
+
+        return self._idle.popleft()
+
+    def _release(self, worker):
+        self._idle.append(worker)
+        self._wakeup_waiter()
+
+    def _wakeup_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _start_worker(self):
+        conn, child_conn = self._mp.Pipe()
+        process = self._mp.Process(
+            target=_worker_main, args=(child_conn,),
+            name='edgedb-compiler', daemon=True)
+        process.start()
+        child_conn.close()
+
+        worker = _Worker(process, conn)
+        self._workers.append(worker)
+        return worker
+
+    def _stop_worker(self, worker):
+        self._workers.remove(worker)
+        worker.conn.close()
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join()
+
+    def _replace_worker(self, worker):
+        self._stop_worker(worker)
+        if not self._closed:
+            self._release(self._start_worker())
+
+    def close(self):
+        self._closed = True
+
+        for worker in list(self._workers):
+            self._stop_worker(worker)
+        self._idle.clear()
+
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(
+                    RuntimeError('the compiler pool is closed'))
+        self._waiters.clear()
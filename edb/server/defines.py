@@ -21,3 +21,26 @@ EDGEDB_PORT = 5656
 EDGEDB_SUPERUSER = 'edgedb'
 EDGEDB_TEMPLATE_DB = 'edgedb0'
 EDGEDB_SUPERUSER_DB = 'edgedb'
+
+# Maximum number of compiled scripts cached per connection.
+QUERY_CACHE_SIZE = 1000
+# Scripts longer than this are never put into the compiled query cache.
+QUERY_CACHE_MAX_TEXT_LEN = 10 * 1024
+# Maximum number of prepared statements kept per Postgres connection.
+PREPARED_STMT_CACHE_SIZE = 1000
+
+# Postgres connections kept open per database and user.
+BACKEND_POOL_MIN_SIZE = 1
+# Maximum number of Postgres connections per database and user.
+BACKEND_POOL_MAX_SIZE = 20
+# Seconds after which idle connections above the minimum are closed.
+BACKEND_POOL_IDLE_TIMEOUT = 60
+
+# Number of processes compiling queries off the event loop,
+# queries are compiled in process by default.
+COMPILER_POOL_SIZE = 0
+# Seconds after which the compilation of a query is aborted.
+COMPILE_TIMEOUT = 30
+
+# The application_name of Postgres connections made by the server.
+BACKEND_APP_NAME = 'edgedb'
@@ -20,6 +20,7 @@
 import asyncpg
 
 from edb.lang.ir import ast as irast
+from edb.lang.schema import database as s_db
 from edb.lang.schema import delta as s_delta
 from edb.lang.schema import deltas as s_deltas
 from edb.lang.common import exceptions
@@ -35,6 +36,9 @@ async def execute_plan(plan, protocol):
         return await backend.run_delta_command(plan)
 
     elif isinstance(plan, s_delta.Command):
+        if isinstance(plan, s_db.DropDatabase):
+            # Idle pooled connections would prevent dropping the database.
+            await protocol.drop_database_connections(plan.name)
         return await backend.run_ddl_command(plan)
 
     elif isinstance(plan, planner.TransactionStatement):
@@ -48,6 +52,8 @@ async def execute_plan(plan, protocol):
                     'there is no transaction in progress')
             transaction = protocol.transactions.pop()
             await transaction.commit()
+            if not protocol.transactions:
+                backend.publish_schema()
 
         elif plan.op == 'rollback':
             if not protocol.transactions:
@@ -64,7 +70,7 @@ async def execute_plan(plan, protocol):
 
     elif isinstance(plan, edgedb_query.Query):
         try:
-            ps = await backend.connection.prepare(plan.text)
+            ps = await backend.prepare_statement(plan.text)
             return [r[0] for r in await ps.fetch()]
 
         except asyncpg.PostgresError as e:
@@ -81,3 +87,40 @@ async def execute_plan(plan, protocol):
 
     else:
         raise exceptions.InternalError('unexpected plan: {!r}'.format(plan))
+
+
+async def execute_plan_streaming(plan, protocol, *, chunk_size):
+    """Execute a query plan yielding lists of at most *chunk_size* rows."""
+
+    backend = protocol.backend
+
+    try:
+        if protocol.transactions:
+            async for chunk in _fetch_chunks(plan, backend, chunk_size):
+                yield chunk
+        else:
+            # Cursors are only available within a transaction.
+            async with backend.connection.transaction():
+                async for chunk in _fetch_chunks(plan, backend, chunk_size):
+                    yield chunk
+
+    except asyncpg.PostgresError as e:
+        _error = await backend.translate_pg_error(plan, e)
+        if _error is not None:
+            raise _error from e
+        else:
+            raise
+
+
+async def _fetch_chunks(plan, backend, chunk_size):
+    ps = await backend.prepare_statement(plan.text)
+
+    chunk = []
+    async for row in ps.cursor(prefetch=chunk_size):
+        chunk.append(row[0])
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
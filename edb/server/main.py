@@ -18,6 +18,7 @@
 
 
 import asyncio
+import functools
 import getpass
 import ipaddress
 import logging
@@ -85,32 +86,174 @@ def _sd_notify(message):
 
 def _run_server(cluster, args):
     loop = asyncio.get_event_loop()
-    srv = None
 
     _init_cluster(cluster, args)
 
+    from edb.lang.common import ast
+    from edb.lang.edgeql import parser as ql_parser
+    from edb.server.pgsql import schemacache
+
+    if not edgedb_cluster.is_in_dev_mode():
+        # AST field type checks are a development aid.
+        ast.enable_type_checks(False)
+
+    # Loaded before forking, the tables are shared by the workers.
+    ql_parser.preload()
+
+    if args['workers'] > 1:
+        _run_workers(cluster, args, loop)
+    else:
+        _serve(cluster, args, loop,
+               schema_cache=schemacache.SchemaCache(), notify=_sd_notify)
+
+
+def _run_workers(cluster, args, loop):
+    from . import supervisor
+
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        abort('Multiple workers require SO_REUSEPORT socket option support.')
+
+    # Introspect once, so that workers do not have to.
+    snapshot = loop.run_until_complete(_make_schema_snapshot(cluster, loop))
+
+    sup = supervisor.Supervisor(
+        functools.partial(_run_worker, cluster, args, snapshot),
+        workers=args['workers'], loop=loop,
+        # Notify systemd that we've started up or are shutting down.
+        on_ready=functools.partial(_sd_notify, 'READY=1'),
+        on_stopping=functools.partial(_sd_notify, 'STOPPING=1'))
+
+    sup.run()
+
+
+async def _make_schema_snapshot(cluster, loop):
+    from edb.server.pgsql import backend
+    from edb.server.pgsql import intromech
+    from edb.server.pgsql import schemacache
+
+    schema_cache = schemacache.SchemaCache()
+
+    conn = await cluster.connect(loop=loop)
+    try:
+        dbnames = await backend.list_databases(conn)
+    finally:
+        await conn.close()
+
+    for dbname in dbnames:
+        conn = await cluster.connect(database=dbname, loop=loop)
+        try:
+            await schema_cache.load(dbname, intromech.IntrospectionMech(conn))
+        finally:
+            await conn.close()
+
+    return schema_cache.dump_snapshot()
+
+
+def _make_worker_socket(args):
+    addrinfo = socket.getaddrinfo(
+        args['bind_address'], args['port'],
+        type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    family, type_, proto, _, addr = addrinfo[0]
+
+    sock = socket.socket(family, type_, proto)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Every worker binds its own socket to the same address and
+        # the kernel distributes incoming connections among them.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(addr)
+        sock.listen(100)
+        sock.setblocking(False)
+    except Exception:
+        sock.close()
+        raise
+
+    return sock
+
+
+def _run_worker(cluster, args, snapshot, startup):
+    from edb.server.pgsql import schemacache
+
+    # Shutdown is initiated by the supervisor.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    async def connect(dbname):
+        return await cluster.connect(
+            database=dbname, loop=loop,
+            server_settings={'application_name': defines.BACKEND_APP_NAME})
+
+    # Connections queue up in the socket backlog until the worker
+    # starts serving.
+    sock = _make_worker_socket(args)
+    schema_cache = schemacache.SchemaCache(connect=connect)
+
+    try:
+        if startup is not None:
+            # Workers started after a failure of another worker
+            # introspect the databases themselves, as the snapshot
+            # might be stale by then.
+            schema_cache.load_snapshot(snapshot)
+            loop.run_until_complete(schema_cache.start())
+            startup.prepared()
+            loop.run_until_complete(startup.wait_go(loop))
+
+        _serve(cluster, args, loop, schema_cache=schema_cache, sock=sock)
+    finally:
+        sock.close()
+        loop.close()
+
+
+def _serve(cluster, args, loop, *, schema_cache, sock=None, notify=None):
+    from edb.server import compilerpool
     from edb.server import protocol as edgedb_protocol
+    from edb.server.pgsql import pool as pgpool
+
+    srv = None
+    pool = pgpool.PoolManager(
+        cluster, loop=loop,
+        min_size=args['backend_pool_min_size'],
+        max_size=args['backend_pool_max_size'],
+        idle_timeout=args['backend_pool_idle_timeout'])
+
+    if args['compiler_pool_size']:
+        compiler_pool = compilerpool.CompilerPool(
+            size=args['compiler_pool_size'],
+            timeout=args['compile_timeout'], loop=loop)
+        compiler_pool.start()
+    else:
+        compiler_pool = None
 
     def protocol_factory():
-        return edgedb_protocol.Protocol(cluster, loop=loop)
+        return edgedb_protocol.Protocol(
+            cluster, loop=loop, schema_cache=schema_cache, pool=pool,
+            compiler_pool=compiler_pool)
 
     try:
-        srv = loop.run_until_complete(
-            loop.create_server(
-                protocol_factory,
-                host=args['bind_address'], port=args['port']))
+        if sock is not None:
+            srv = loop.run_until_complete(
+                loop.create_server(protocol_factory, sock=sock))
+        else:
+            srv = loop.run_until_complete(
+                loop.create_server(
+                    protocol_factory,
+                    host=args['bind_address'], port=args['port']))
 
         loop.add_signal_handler(signal.SIGTERM, terminate_server, srv, loop)
         logger.info('Serving on %s:%s', args['bind_address'], args['port'])
 
-        # Notify systemd that we've started up.
-        _sd_notify('READY=1')
+        if notify is not None:
+            # Notify systemd that we've started up.
+            notify('READY=1')
 
         loop.run_forever()
 
     except KeyboardInterrupt:
         logger.info('Shutting down.')
-        _sd_notify('STOPPING=1')
+        if notify is not None:
+            notify('STOPPING=1')
         srv.close()
         loop.run_until_complete(srv.wait_closed())
         srv = None
@@ -120,6 +263,11 @@ def _run_server(cluster, args):
             logger.info('Shutting down.')
             srv.close()
 
+        loop.run_until_complete(pool.close())
+        loop.run_until_complete(schema_cache.close())
+        if compiler_pool is not None:
+            compiler_pool.close()
+
 
 def run_server(args):
     if edgedb_cluster.is_in_dev_mode():
@@ -221,6 +369,28 @@ def run_server(args):
 @click.option(
     '-p', '--port', type=int, default=defines.EDGEDB_PORT,
     help='port to listen on')
+@click.option(
+    '--workers', type=click.IntRange(min=1), default=1,
+    help='number of server worker processes')
+@click.option(
+    '--compiler-pool-size', type=click.IntRange(min=0),
+    default=defines.COMPILER_POOL_SIZE,
+    help='number of query compiler processes, 0 to compile in process')
+@click.option(
+    '--compile-timeout', type=float, default=defines.COMPILE_TIMEOUT,
+    help='seconds after which the compilation of a query is aborted')
+@click.option(
+    '--backend-pool-min-size', type=int,
+    default=defines.BACKEND_POOL_MIN_SIZE,
+    help='number of Postgres connections kept open per database')
+@click.option(
+    '--backend-pool-max-size', type=int,
+    default=defines.BACKEND_POOL_MAX_SIZE,
+    help='maximum number of Postgres connections per database')
+@click.option(
+    '--backend-pool-idle-timeout', type=float,
+    default=defines.BACKEND_POOL_IDLE_TIMEOUT,
+    help='seconds after which idle Postgres connections are closed')
 @click.option(
     '-b', '--background', is_flag=True, help='daemonize')
 @click.option(
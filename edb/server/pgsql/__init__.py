@@ -19,5 +19,6 @@
 
 from . import backend  # NOQA
 from .backend import open_database  # NOQA
+from .backend import list_databases  # NOQA
 from .bootstrap import bootstrap  # NOQA
 from . import common  # NOQA
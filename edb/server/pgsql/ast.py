@@ -39,7 +39,7 @@ class Base(ast.AST):
 
 
 class ImmutableBase(ast.ImmutableASTMixin, Base):
-    pass
+    __slots__ = ('_frozen',)
 
 
 class _Ref(Base):
@@ -102,6 +102,8 @@ class OutputVar(BaseExpr):
 class EdgeQLPathInfo(Base):
     """A general mixin providing EdgeQL-specific metadata on certain nodes."""
 
+    __ast_mixin__ = True
+
     # Ignore the below fields in AST visitor/transformer.
     __ast_meta__ = {
         'path_scope', 'path_outputs', 'path_id', 'is_distinct', 'value_scope',
@@ -129,6 +131,9 @@ class EdgeQLPathInfo(Base):
 class BaseRangeVar(Base):
     """Range variable, used in FROM clauses."""
 
+    # Set on the nullable side of an outer join.
+    __slots__ = ('nullable',)
+
     alias: Alias
 
     @property
@@ -316,6 +321,10 @@ class NullRelation(BaseRelation, EdgeQLPathInfo):
 class Query(BaseRelation, EdgeQLPathInfo):
     """Generic superclass representing a query."""
 
+    # Set when the query can produce NULL in place of an empty set,
+    # see pathctx.is_nullable() for queries that do not set it.
+    __slots__ = ('nullable',)
+
     # Ignore the below fields in AST visitor/transformer.
     __ast_meta__ = {'ptr_join_map', 'path_rvar_map', 'path_namespace',
                     'view_path_id_map', 'argnames', 'nullable'}
@@ -336,6 +345,8 @@ class Query(BaseRelation, EdgeQLPathInfo):
 class DML(Base):
     """Generic superclass for INSERT/UPDATE/DELETE statements."""
 
+    __ast_mixin__ = True
+
     # Target relation to perform the operation on.
     relation: RangeTypes
     # List of expressions returned
@@ -18,9 +18,12 @@
 
 
 import collections
+import functools
 import uuid
+import weakref
 
 from edb.lang.common import debug
+from edb.lang.common import lru
 
 from edb.lang.schema import delta as sd
 
@@ -30,6 +33,7 @@ from edb.lang.schema import deltarepo as s_deltarepo
 from edb.lang.schema import deltas as s_deltas
 from edb.lang.schema import types as s_types
 
+from edb.server import defines
 from edb.server import query as backend_query
 from edb.server.pgsql import dbops
 from edb.server.pgsql import delta as delta_cmds
@@ -38,6 +42,8 @@ from edb.server.pgsql import deltadbops
 from . import compiler
 from . import deltarepo as pgsql_deltarepo
 from . import intromech
+from . import pool as pgpool
+from . import schemacache
 
 
 class Query(backend_query.Query):
@@ -53,6 +59,14 @@ class Query(backend_query.Query):
         self.output_desc = output_desc
         self.output_format = output_format
 
+    def __getstate__(self):
+        # Queries are pickled to be sent from the compiler processes,
+        # schema objects are sent by name.
+        state = self.__dict__.copy()
+        state['argument_types'] = collections.OrderedDict(
+            (k, v.name) for k, v in self.argument_types.items())
+        return state
+
 
 class TypeDescriptor:
     def __init__(self, type_id, schema_type, subtypes, element_names):
@@ -62,32 +76,167 @@ class TypeDescriptor:
         self.element_names = element_names
         self.cardinality = '1'
 
+    def as_dict(self):
+        if self.subtypes is not None:
+            subtypes = [st.as_dict() for st in self.subtypes]
+        else:
+            subtypes = None
+
+        return {
+            'id': self.type_id.bytes,
+            'name': str(self.schema_type.name),
+            'cardinality': self.cardinality,
+            'elements': self.element_names,
+            'subtypes': subtypes,
+        }
+
 
 class OutputDescriptor:
     def __init__(self, type_desc, tuple_registry):
         self.type_desc = type_desc
         self.tuple_registry = tuple_registry
+        self._dict = None
+
+    def as_dict(self):
+        """Return the description of the output for the client."""
+        if self._dict is None:
+            self._dict = self.type_desc.as_dict()
+        return self._dict
+
+    def __getstate__(self):
+        # Only the client description is pickled, the type
+        # descriptors refer to schema objects.
+        return {'type_desc': None, 'tuple_registry': None,
+                '_dict': self.as_dict()}
 
 
 class Backend(s_deltarepo.DeltaProvider):
 
-    def __init__(self, connection):
+    def __init__(self, connection, *, dbname=None, schema_cache=None,
+                 stmt_cache_size=defines.PREPARED_STMT_CACHE_SIZE):
         self.schema = None
         self.modaliases = {None: 'default'}
 
         self._intro_mech = intromech.IntrospectionMech(connection)
 
-        self.connection = connection
+        self._dbname = dbname
+        self._schema_cache = schema_cache if dbname is not None else None
+        self._schema_version = None
+        # Whether self.schema reflects uncommitted DDL and thus
+        # must not be replaced by the shared schema.
+        self._schema_dirty = False
+        # Incremented every time self.schema is replaced.
+        self._schema_generation = 0
 
-        repo = pgsql_deltarepo.MetaDeltaRepository(self.connection)
+        self._query_cache = lru.LRUMapping(
+            maxsize=defines.QUERY_CACHE_SIZE)
+
+        # The connection is set by attach_connection() below.
+        repo = pgsql_deltarepo.MetaDeltaRepository(None)
         super().__init__(repo)
 
+        self._pconn = None
+        self.connection = None
+
+        # A backend without a connection can only compile queries.
+        if connection is not None:
+            if not isinstance(connection, pgpool.PooledConnection):
+                connection = pgpool.PooledConnection(
+                    connection, stmt_cache_size=stmt_cache_size)
+            self.attach_connection(connection)
+
+    def attach_connection(self, pconn):
+        """Make the backend use the given pooled connection."""
+
+        if self._pconn is not None:
+            raise RuntimeError('backend already has a connection')
+
+        self._pconn = pconn
+        self.connection = pconn.connection
+        self._intro_mech.connection = pconn.connection
+        self.deltarepo.connection = pconn.connection
+
+    def detach_connection(self):
+        """Detach and return the current pooled connection."""
+
+        pconn = self._pconn
+        self._pconn = None
+        self.connection = None
+        self._intro_mech.connection = None
+        self.deltarepo.connection = None
+        return pconn
+
     async def getschema(self):
         if self.schema is None:
-            self.schema = await self._intro_mech.getschema()
+            if (self._schema_cache is not None and
+                    not self.connection.is_in_transaction()):
+                entry = await self._schema_cache.load(
+                    self._dbname, self._intro_mech)
+                self.use_cached_schema(entry)
+            else:
+                self._set_schema(await self._intro_mech.getschema())
+                self._schema_dirty = self._schema_cache is not None
 
         return self.schema
 
+    def _set_schema(self, schema):
+        self.schema = schema
+        self._schema_generation += 1
+        self._query_cache.clear()
+
+    def use_cached_schema(self, entry):
+        """Switch to the schema in the given schema cache entry."""
+        self._intro_mech.set_cache_snapshot(entry.intro_caches)
+        self._set_schema(entry.schema)
+        self._schema_version = entry.version
+        self._schema_dirty = False
+
+    def get_shared_schema(self):
+        """Return the schema cache entry of the current schema, if any."""
+        if self._schema_cache is None or self._schema_dirty:
+            return None
+
+        entry = self._schema_cache.get(self._dbname)
+        if entry is None or entry.schema is not self.schema:
+            return None
+
+        return entry
+
+    async def sync_schema(self):
+        """Switch to the most recent shared schema, if necessary."""
+
+        if self._schema_cache is None or self._schema_dirty:
+            return
+
+        entry = self._schema_cache.get(self._dbname)
+        if entry is None:
+            await self.invalidate_schema_cache()
+            await self.getschema()
+        elif entry.version != self._schema_version:
+            self.use_cached_schema(entry)
+
+    def publish_schema(self):
+        """Share the schema modified by committed DDL with other backends."""
+
+        if self._schema_cache is None or not self._schema_dirty:
+            return
+
+        entry = self._schema_cache.publish(self._dbname, self._intro_mech)
+        self._schema_version = entry.version
+        self._schema_dirty = False
+
+    async def _reload_schema(self):
+        self.invalidate_transient_cache()
+        self._use_modified_schema(await self._intro_mech.getschema())
+
+    def _use_modified_schema(self, schema):
+        self._set_schema(schema)
+
+        if self._schema_cache is not None:
+            self._schema_dirty = True
+            if not self.connection.is_in_transaction():
+                self.publish_schema()
+
     def adapt_delta(self, delta):
         return delta_cmds.CommandMeta.adapt(delta)
 
@@ -126,8 +275,17 @@ class Backend(s_deltarepo.DeltaProvider):
                 result = s_ddl.ddl_text_from_delta(schema, delta)
 
             elif isinstance(delta_cmd, s_deltas.CreateDelta):
+                entry = self.get_shared_schema()
+                if entry is not None:
+                    # The shared schema must not be modified, create
+                    # the delta in a copy and publish it instead.
+                    schema = entry.copy_schema()
+
                 delta_cmd.apply(schema, context)
 
+                self._intro_mech.schema = schema
+                self._use_modified_schema(schema)
+
             else:
                 raise RuntimeError(
                     f'unexpected delta command: {delta_cmd!r}')
@@ -153,19 +311,36 @@ class Backend(s_deltarepo.DeltaProvider):
     async def run_ddl_command(self, ddl_plan):
         schema = await self.getschema()
 
+        # Each copy unpickles the whole schema, so DDL commands cost
+        # O(schema) regardless of the size of the delta.  Copying
+        # only the modified objects is not possible, as the delta
+        # commands modify objects that refer to each other in place.
+        entry = self.get_shared_schema()
+        if entry is not None:
+            # The current schema is shared with other connections
+            # and must not be modified, copy it from the pickled
+            # snapshot of the shared entry.
+            copy_schema = entry.copy_schema
+        else:
+            copy_schema = functools.partial(
+                schemacache.loads, schemacache.dumps(schema))
+
         if debug.flags.delta_plan_input:
             debug.header('Delta Plan Input')
             debug.dump(ddl_plan)
 
         # Do a dry-run on test_schema to canonicalize
         # the schema delta-commands.
-        test_schema = await self._intro_mech.readschema()
+        test_schema = copy_schema()
         context = sd.CommandContext()
         canonical_ddl_plan = ddl_plan.copy()
         canonical_ddl_plan.apply(test_schema, context=context)
 
         # Apply and adapt delta, build native delta plan, which
-        # will also update the schema.
+        # will also update the schema.  The delta is applied to
+        # a copy, so that the current schema remains intact should
+        # the execution fail.
+        schema = copy_schema()
         plan = self.process_delta(canonical_ddl_plan, schema)
 
         context = delta_cmds.CommandContext(self.connection)
@@ -175,22 +350,117 @@ class Backend(s_deltarepo.DeltaProvider):
                 async with self.connection.transaction():
                     # Execute all pgsql/delta commands.
                     await plan.execute(context)
+                    if self._schema_cache is not None:
+                        await self._schema_cache.notify_change(
+                            self.connection)
             else:
                 await plan.execute(context)
+                if (isinstance(plan, s_db.DropDatabase) and
+                        self._schema_cache is not None):
+                    self._schema_cache.invalidate(plan.name)
         except Exception as e:
+            # The database might have been left in a state that does
+            # not match the current schema, re-read it from Postgres.
+            await self._reload_schema()
             raise RuntimeError('failed to apply delta to data backend') from e
-        finally:
-            # Exception or not, re-read the schema from Postgres.
-            await self.invalidate_schema_cache()
-            await self.getschema()
+
+        if schema.get_checksum() != test_schema.get_checksum():
+            # The adapted delta did not modify the schema like the
+            # dry run did, so the modified schema is not trusted to
+            # match the database.  Checksums are maintained
+            # incrementally, so this check is cheap.
+            await self._reload_schema()
+            return
+
+        # The schema has been modified in memory, only the introspection
+        # caches, which also hold backend ids of the new objects, need
+        # to be refreshed.
+        await self._intro_mech.refresh_caches()
+
+        if debug.flags.delta_verify_schema:
+            schema = await self._verify_schema(schema)
+
+        self._intro_mech.schema = schema
+        self._use_modified_schema(schema)
+
+    async def _verify_schema(self, schema):
+        """Compare *schema* with the schema introspected from Postgres."""
+
+        introspected = await self._intro_mech.readschema()
+        if schema.get_checksum() == introspected.get_checksum():
+            return schema
+
+        ours = dict(schema.get_checksum_details())
+        theirs = dict(introspected.get_checksum_details())
+        debug.header('Schema Mismatch After DDL')
+        debug.dump({
+            name: (ours.get(name), theirs.get(name))
+            for name in ours.keys() | theirs.keys()
+            if ours.get(name) != theirs.get(name)
+        })
+
+        return introspected
 
     async def invalidate_schema_cache(self):
-        self.schema = None
+        self._set_schema(None)
         self.invalidate_transient_cache()
 
     def invalidate_transient_cache(self):
         self._intro_mech.invalidate_cache()
 
+    def _get_query_cache_key(self, source, graphql):
+        source = source.strip()
+        if len(source) > defines.QUERY_CACHE_MAX_TEXT_LEN:
+            return None
+
+        return (source, bool(graphql), frozenset(self.modaliases.items()),
+                self._schema_generation)
+
+    def get_cached_queries(self, source, *, graphql=False):
+        """Return compiled queries previously cached for *source*.
+
+        Returns None if the script is not in the cache.
+        """
+        key = self._get_query_cache_key(source, graphql)
+        if key is None:
+            return None
+
+        return self._query_cache.get(key)
+
+    def cache_queries(self, source, queries, *, graphql=False):
+        key = self._get_query_cache_key(source, graphql)
+        if key is not None:
+            self._query_cache[key] = tuple(queries)
+
+    def get_query_cache_stats(self):
+        return self._query_cache.get_stats()
+
+    async def prepare_statement(self, text):
+        """Return a prepared statement for SQL *text*.
+
+        Statements are cached per connection, so that Postgres does not
+        have to parse and plan frequently executed queries every time.
+        """
+        pconn = self._pconn
+        stmt_cache = pconn.stmt_cache
+
+        cached_schema = pconn.stmt_cache_schema
+        if cached_schema is None or cached_schema() is not self.schema:
+            # Cached statements might refer to tables or columns
+            # that were altered or dropped since.
+            stmt_cache.clear()
+            pconn.stmt_cache_schema = weakref.ref(self.schema)
+
+        ps = stmt_cache.get(text)
+        if ps is None:
+            ps = await self.connection.prepare(text)
+            stmt_cache[text] = ps
+
+        return ps
+
+    def get_stmt_cache_stats(self):
+        return self._pconn.stmt_cache.get_stats()
+
     async def exec_session_state_cmd(self, cmd):
         for alias, module in cmd.modaliases.items():
             self.modaliases[alias] = module.name
@@ -284,7 +554,12 @@ class Backend(s_deltarepo.DeltaProvider):
 
         sql_text, argmap = compiler.compile_ir_to_sql(
             query_ir, schema=self.schema,
-            output_format=output_format, timer=timer)
+            output_format=output_format,
+            type_ids=self._intro_mech.type_cache,
+            ptr_ids=collections.ChainMap(
+                self._intro_mech.link_cache,
+                self._intro_mech.link_property_cache),
+            timer=timer)
 
         argtypes = {}
         for k, v in query_ir.params.items():
@@ -300,7 +575,24 @@ class Backend(s_deltarepo.DeltaProvider):
         return await self._intro_mech.translate_pg_error(query, error)
 
 
-async def open_database(pgconn):
-    bk = Backend(pgconn)
+async def open_database(pgconn, *, dbname=None, schema_cache=None,
+                        stmt_cache_size=defines.PREPARED_STMT_CACHE_SIZE):
+    bk = Backend(pgconn, dbname=dbname, schema_cache=schema_cache,
+                 stmt_cache_size=stmt_cache_size)
     await bk.getschema()
     return bk
+
+
+async def list_databases(pgconn):
+    """Return the names of EdgeDB databases in the cluster."""
+
+    result = await pgconn.fetch('''
+        SELECT d.datname
+            FROM pg_database d
+            INNER JOIN pg_shdescription c ON c.objoid = d.oid
+        WHERE
+            d.datistemplate = false AND
+            substr(c.description, 1, 4) = '$CMR';
+    ''')
+
+    return [r['datname'] for r in result]
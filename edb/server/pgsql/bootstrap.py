@@ -22,14 +22,21 @@ import os.path
 
 from edb.lang import edgeql
 from edb.lang import schema as edgedb_schema
+from edb.lang.edgeql import ast as qlast
+from edb.lang.schema import database as s_db
 from edb.lang.schema import ddl as s_ddl
+from edb.lang.schema import delta as sd
+from edb.lang.schema import deltas as s_deltas
 
 from edb.server import defines as edgedb_defines
+from edb.server import executor as edgedb_executor
+from edb.server import planner as edgedb_planner
 from edb.server import protocol as edgedb_protocol
 
 from . import backend
 from . import dbops
 from . import delta
+from . import intromech
 from . import metaschema
 
 
@@ -155,6 +162,63 @@ async def _ensure_meta_schema(conn):
     await metaschema.bootstrap(conn)
 
 
+def _ddl_plan_from_statement(statement, schema, *, modaliases):
+    if isinstance(statement, qlast.Delta):
+        # CREATE/COMMIT MIGRATION
+        cmd = s_ddl.cmd_from_ddl(
+            statement, schema=schema, modaliases=modaliases)
+        context = sd.CommandContext()
+
+        with context(s_deltas.DeltaCommandContext(cmd)):
+            if isinstance(cmd, s_deltas.CreateDelta):
+                cmd.apply(schema, context)
+                return None
+
+            elif isinstance(cmd, s_deltas.CommitDelta):
+                migration = schema.get_delta(cmd.classname)
+                ddl_plan = s_db.AlterDatabase()
+                ddl_plan.update(migration.commands)
+                return ddl_plan
+
+            else:
+                raise RuntimeError(f'unexpected delta command: {cmd!r}')
+
+    else:
+        # CREATE/DELETE/ALTER (FUNCTION, TYPE, etc)
+        return s_ddl.delta_from_ddl(
+            statement, schema=schema, modaliases=modaliases)
+
+
+async def _execute_ddl(bk, statements, *, modaliases):
+    """Execute a sequence of DDL statements in a single transaction.
+
+    Unlike Backend.run_ddl_command(), which introspects the entire
+    schema twice for every command, the commands are canonicalized
+    against a schema maintained in memory, and the database schema
+    is introspected only once all of them have been executed.
+    """
+    conn = bk.connection
+    schema = await bk.getschema()
+    test_schema = await intromech.IntrospectionMech(conn).readschema()
+    context = delta.CommandContext(conn)
+
+    async with conn.transaction():
+        for statement in statements:
+            ddl_plan = _ddl_plan_from_statement(
+                statement, test_schema, modaliases=modaliases)
+            if ddl_plan is None:
+                continue
+
+            canonical_ddl_plan = ddl_plan.copy()
+            canonical_ddl_plan.apply(test_schema, context=sd.CommandContext())
+
+            plan = bk.process_delta(canonical_ddl_plan, schema)
+            await plan.execute(context)
+
+    await bk.invalidate_schema_cache()
+    await bk.getschema()
+
+
 async def _init_std_schema(conn):
     logger.info('Bootstrapping std module...')
 
@@ -166,19 +230,32 @@ async def _init_std_schema(conn):
     statements = edgeql.parse_block(stdschema_script)
 
     bk = await backend.open_database(conn)
-
-    for statement in statements:
-        cmd = s_ddl.delta_from_ddl(
-            statement, schema=bk.schema, modaliases={None: 'std'})
-        await bk.run_ddl_command(cmd)
+    await _execute_ddl(bk, statements, modaliases={None: 'std'})
 
     await metaschema.generate_views(conn, bk.schema)
 
 
 async def _run_script(script, conn, cluster, loop):
     protocol = edgedb_protocol.Protocol(cluster, loop=loop)
-    protocol.backend = await backend.open_database(conn)
-    await protocol._run_script(script)
+    protocol.backend = bk = await backend.open_database(conn)
+    timer = edgedb_protocol.Timer()
+    ddl = []
+
+    for statement in edgeql.parse_block(script):
+        if isinstance(statement, (qlast.Delta, qlast.DDL)):
+            # Consecutive DDL statements are executed together.
+            ddl.append(statement)
+            continue
+
+        if ddl:
+            await _execute_ddl(bk, ddl, modaliases=bk.modaliases)
+            ddl = []
+
+        plan = edgedb_planner.plan_statement(statement, bk, timer=timer)
+        await edgedb_executor.execute_plan(plan, protocol)
+
+    if ddl:
+        await _execute_ddl(bk, ddl, modaliases=bk.modaliases)
 
 
 async def _init_graphql_schema(conn, cluster, loop):
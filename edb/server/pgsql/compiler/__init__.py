@@ -18,6 +18,7 @@
 
 
 import typing
+import uuid
 
 from edb.lang.common import debug
 from edb.lang.common import exceptions as edgedb_error
@@ -39,12 +40,17 @@ from . import errors
 from .context import OutputFormat  # NOQA
 
 
+IdMap = typing.Mapping[str, uuid.UUID]
+
+
 def compile_ir_to_sql_tree(
         ir_expr: irast.Base, *,
         schema: s_schema.Schema,
         output_format: typing.Optional[OutputFormat]=None,
         ignore_shapes: bool=False,
-        singleton_mode: bool=False) -> pgast.Base:
+        singleton_mode: bool=False,
+        type_ids: typing.Optional[IdMap]=None,
+        ptr_ids: typing.Optional[IdMap]=None) -> pgast.Base:
     try:
         # Transform to sql tree
         ctx_stack = context.CompilerContext()
@@ -60,7 +66,7 @@ def compile_ir_to_sql_tree(
         ctx.env = context.Environment(
             schema=schema, output_format=output_format,
             singleton_mode=singleton_mode,
-            views=views)
+            views=views, type_ids=type_ids, ptr_ids=ptr_ids)
         if ignore_shapes:
             ctx.expr_exposed = False
         qtree = dispatch.compile(ir_expr, ctx=ctx)
@@ -83,17 +89,21 @@ def compile_ir_to_sql(
         schema: s_schema.Schema,
         output_format: typing.Optional[OutputFormat]=None,
         ignore_shapes: bool=False,
+        type_ids: typing.Optional[IdMap]=None,
+        ptr_ids: typing.Optional[IdMap]=None,
         timer=None) -> typing.Tuple[str, typing.Dict[str, int]]:
 
     if timer is None:
         qtree = compile_ir_to_sql_tree(
             ir_expr, schema=schema, output_format=output_format,
-            ignore_shapes=ignore_shapes)
+            ignore_shapes=ignore_shapes, type_ids=type_ids,
+            ptr_ids=ptr_ids)
     else:
         with timer.timeit('compile_ir_to_sql'):
             qtree = compile_ir_to_sql_tree(
                 ir_expr, schema=schema, output_format=output_format,
-                ignore_shapes=ignore_shapes)
+                ignore_shapes=ignore_shapes, type_ids=type_ids,
+                ptr_ids=ptr_ids)
 
     if debug.flags.edgeql_compile:  # pragma: no cover
         debug.header('SQL Tree')
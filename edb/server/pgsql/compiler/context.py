@@ -44,7 +44,16 @@ class ShapeFormat(enum.Enum):
 
 class OutputFormat(enum.Enum):
     NATIVE = enum.auto()
+    # The whole result is aggregated into a single JSON array.
     JSON = enum.auto()
+    # Every element of the result is a separate JSON-encoded row.
+    JSON_ELEMENTS = enum.auto()
+
+
+JSON_OUTPUT_FORMATS = frozenset({
+    OutputFormat.JSON,
+    OutputFormat.JSON_ELEMENTS,
+})
 
 
 NO_VOLATILITY = object()
@@ -137,11 +146,16 @@ class CompilerContext(compiler.CompilerContext):
 class Environment:
     """Static compilation environment."""
 
-    def __init__(self, *, schema, output_format, singleton_mode, views):
+    def __init__(self, *, schema, output_format, singleton_mode, views,
+                 type_ids, ptr_ids):
         self.singleton_mode = singleton_mode
         self.aliases = aliases.AliasGenerator()
         self.root_rels = set()
         self.rel_overlays = collections.defaultdict(list)
         self.output_format = output_format
         self.schema = schema.get_overlay(extra=views)
+        # Backend ids of schema types by name, if known.
+        self.type_ids = type_ids
+        # Backend ids of schema pointers by name, if known.
+        self.ptr_ids = ptr_ids
         self.tuple_formats = {}
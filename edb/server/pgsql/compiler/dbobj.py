@@ -220,7 +220,6 @@ def range_for_ptrcls(
 
         qry = pgast.SelectStmt()
         qry.from_clause.append(table)
-        qry.rptr_rvar = table
 
         # Make sure all property references are pulled up properly
         for colname in cols:
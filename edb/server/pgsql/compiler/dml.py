@@ -31,6 +31,7 @@
 #
 
 import typing
+import uuid
 
 from edb.lang.common import ast
 
@@ -299,25 +300,26 @@ def process_insert_body(
         iterator_cte = None
         iterator_id = None
 
-    values.append(
-        pgast.ResTarget(
-            val=pgast.SelectStmt(
-                target_list=[
-                    pgast.ResTarget(
-                        val=pgast.ColumnRef(name=['id']))
-                ],
-                from_clause=[
-                    pgast.RangeVar(relation=pgast.Relation(
-                        name='objecttype', schemaname='edgedb'))
-                ],
-                where_clause=astutils.new_binop(
-                    op=ast.ops.EQ,
-                    lexpr=pgast.ColumnRef(name=['name']),
-                    rexpr=pgast.Constant(val=ir_stmt.subject.scls.shortname)
-                )
+    subject_name = ir_stmt.subject.scls.shortname
+    type_id = _get_backend_id(ctx.env.type_ids, subject_name)
+    if type_id is None:
+        type_id = pgast.SelectStmt(
+            target_list=[
+                pgast.ResTarget(
+                    val=pgast.ColumnRef(name=['id']))
+            ],
+            from_clause=[
+                pgast.RangeVar(relation=pgast.Relation(
+                    name='objecttype', schemaname='edgedb'))
+            ],
+            where_clause=astutils.new_binop(
+                op=ast.ops.EQ,
+                lexpr=pgast.ColumnRef(name=['name']),
+                rexpr=pgast.Constant(val=subject_name)
             )
         )
-    )
+
+    values.append(pgast.ResTarget(val=type_id))
 
     external_inserts = []
     tuple_elements = []
@@ -598,14 +600,6 @@ def process_link_update(
     """
     toplevel = ctx.toplevel_stmt
 
-    edgedb_ptr_tab = pgast.RangeVar(
-        relation=pgast.Relation(
-            schemaname='edgedb', name='pointer'
-        ),
-        alias=pgast.Alias(aliasname=ctx.env.aliases.get(hint='ptr')))
-
-    ltab_alias = edgedb_ptr_tab.alias.aliasname
-
     rptr = ir_expr.rptr
     ptrcls = rptr.ptrcls
     target_is_scalar = isinstance(ptrcls.target, s_scalars.ScalarType)
@@ -618,27 +612,40 @@ def process_link_update(
     # base material type.
     mptrcls = ptrcls.material_type()
 
-    # Lookup link class id by link name.
-    lname_to_id = pgast.CommonTableExpr(
-        query=pgast.SelectStmt(
-            from_clause=[
-                edgedb_ptr_tab
-            ],
-            target_list=[
-                pgast.ResTarget(
-                    val=pgast.ColumnRef(name=[ltab_alias, 'id']))
-            ],
-            where_clause=astutils.new_binop(
-                lexpr=pgast.ColumnRef(name=[ltab_alias, 'name']),
-                rexpr=pgast.Constant(val=mptrcls.name),
-                op=ast.ops.EQ
-            )
-        ),
-        name=ctx.env.aliases.get(hint='lid')
-    )
+    ptr_id_ref = _get_backend_id(ctx.env.ptr_ids, mptrcls.name)
+    if ptr_id_ref is not None:
+        ptr_id_sources = []
+    else:
+        # Lookup link class id by link name.
+        edgedb_ptr_tab = pgast.RangeVar(
+            relation=pgast.Relation(
+                schemaname='edgedb', name='pointer'
+            ),
+            alias=pgast.Alias(aliasname=ctx.env.aliases.get(hint='ptr')))
+
+        ltab_alias = edgedb_ptr_tab.alias.aliasname
+
+        lname_to_id = pgast.CommonTableExpr(
+            query=pgast.SelectStmt(
+                from_clause=[
+                    edgedb_ptr_tab
+                ],
+                target_list=[
+                    pgast.ResTarget(
+                        val=pgast.ColumnRef(name=[ltab_alias, 'id']))
+                ],
+                where_clause=astutils.new_binop(
+                    lexpr=pgast.ColumnRef(name=[ltab_alias, 'name']),
+                    rexpr=pgast.Constant(val=mptrcls.name),
+                    op=ast.ops.EQ
+                )
+            ),
+            name=ctx.env.aliases.get(hint='lid')
+        )
 
-    lname_to_id_rvar = pgast.RangeVar(relation=lname_to_id)
-    toplevel.ctes.append(lname_to_id)
+        toplevel.ctes.append(lname_to_id)
+        ptr_id_ref = pgast.ColumnRef(name=[lname_to_id.name, 'id'])
+        ptr_id_sources = [pgast.RangeVar(relation=lname_to_id)]
 
     target_rvar = dbobj.range_for_ptrcls(
         mptrcls, '>', include_overlays=False, env=ctx.env)
@@ -657,12 +664,7 @@ def process_link_update(
     )
 
     col_data = {
-        'ptr_item_id': pgast.ColumnRef(
-            name=[
-                lname_to_id.name,
-                'id'
-            ]
-        ),
+        'ptr_item_id': ptr_id_ref,
         'std::source': pathctx.get_rvar_path_identity_var(
             dml_cte_rvar, ir_stmt.subject.path_id, env=ctx.env)
     }
@@ -701,7 +703,7 @@ def process_link_update(
     # into a subquery returning records for the link table.
     data_cte, specified_cols = process_link_values(
         ir_stmt, ir_expr, target_tab_name, tab_cols, col_data,
-        dml_cte_rvar, [lname_to_id_rvar],
+        dml_cte_rvar, ptr_id_sources,
         props_only, target_is_scalar, iterator_cte, ctx=ctx)
 
     toplevel.ctes.append(data_cte)
@@ -791,6 +793,33 @@ def process_link_update(
     return data_cte
 
 
+def _get_backend_id(
+        ids: typing.Optional[typing.Mapping[str, uuid.UUID]],
+        name: str) -> typing.Optional[pgast.Base]:
+    """Return the backend id of a schema object as a uuid constant.
+
+    :param ids:
+        Mapping of schema object names to backend ids, if known.
+    :param name:
+        Name of the schema object.
+
+    :return:
+        A constant expression, or `None` if the id is not known, in
+        which case it must be looked up in the metaschema at runtime.
+    """
+    if not ids:
+        return None
+
+    backend_id = ids.get(name)
+    if backend_id is None:
+        return None
+
+    return pgast.TypeCast(
+        arg=pgast.Constant(val=str(backend_id)),
+        type_name=pgast.TypeName(name=('uuid',))
+    )
+
+
 def process_linkprop_update(
         ir_stmt: irast.MutatingStmt, ir_expr: irast.Base,
         wrapper: pgast.Query, dml_cte: pgast.CommonTableExpr, *,
@@ -26,6 +26,7 @@ from edb.lang.common import ast
 from edb.lang.ir import ast as irast
 from edb.lang.ir import utils as irutils
 
+from edb.lang.schema import inheriting as s_inh
 from edb.lang.schema import scalars as s_scalars
 from edb.lang.schema import objects as s_obj
 from edb.lang.schema import types as s_types
@@ -434,11 +435,26 @@ def compile_TypeCheckOp(
     with ctx.new() as newctx:
         newctx.expr_exposed = False
         left = dispatch.compile(expr.left, ctx=newctx)
-        right = dispatch.compile(expr.right, ctx=newctx)
-
-    result = pgast.FuncCall(
-        name=('edgedb', 'issubclass'),
-        args=[left, right])
+        type_ids = _get_matching_type_ids(expr.right, ctx=newctx)
+
+        if type_ids is not None:
+            # The matching types are known statically, so avoid
+            # looking up the MRO of every tested object.
+            result = astutils.new_binop(
+                left,
+                pgast.SubLink(
+                    type=pgast.SubLinkType.ANY,
+                    expr=pgast.TypeCast(
+                        arg=pgast.Constant(
+                            val='{' + ','.join(map(str, type_ids)) + '}'),
+                        type_name=pgast.TypeName(
+                            name=('uuid',), array_bounds=[-1]))),
+                op='=')
+        else:
+            right = dispatch.compile(expr.right, ctx=newctx)
+            result = pgast.FuncCall(
+                name=('edgedb', 'issubclass'),
+                args=[left, right])
 
     if expr.op == ast.ops.IS_NOT:
         result = astutils.new_unop(ast.ops.NOT, result)
@@ -446,6 +462,53 @@ def compile_TypeCheckOp(
     return result
 
 
+def _get_matching_type_ids(
+        typeref: typing.Union[irast.TypeRef, irast.Array], *,
+        ctx: context.CompilerContextLevel) -> typing.Optional[list]:
+    """Return the backend ids of all types matching a type check.
+
+    Returns None if the ids cannot be determined at compile time.
+    """
+    all_type_ids = ctx.env.type_ids
+    if not all_type_ids:
+        return None
+
+    if isinstance(typeref, irast.Array):
+        typerefs = typeref.elements
+    else:
+        typerefs = [typeref]
+
+    schema = ctx.env.schema
+    types = set()
+
+    for typeref in typerefs:
+        if not isinstance(typeref, irast.TypeRef) or typeref.subtypes:
+            return None
+
+        scls = schema.get(typeref.maintype, None)
+        if (not isinstance(scls, s_inh.InheritingObject) or
+                scls.is_derived):
+            return None
+
+        pending = [scls]
+        while pending:
+            scls = pending.pop()
+            # Derived types, such as views, are never the type of
+            # a stored object.
+            if scls not in types and not scls.is_derived:
+                types.add(scls)
+                pending.extend(scls.children(schema))
+
+    type_ids = []
+    for scls in types:
+        type_id = all_type_ids.get(scls.name)
+        if type_id is None:
+            return None
+        type_ids.append(type_id)
+
+    return sorted(type_ids)
+
+
 @dispatch.compile.register(irast.IfElseExpr)
 def compile_IfElseExpr(
         expr: irast.Base, *, ctx: context.CompilerContextLevel) -> pgast.Base:
@@ -105,7 +105,7 @@ def serialize_expr(
         nested: bool=False,
         env: context.Environment) -> pgast.Base:
 
-    if env.output_format == context.OutputFormat.JSON:
+    if env.output_format in context.JSON_OUTPUT_FORMATS:
         if isinstance(expr, pgast.TupleVar):
             val = tuple_var_as_json_object(expr, path_id=path_id, env=env)
 
@@ -140,7 +140,7 @@ def get_pg_type(
         ctx: context.CompilerContextLevel) -> typing.Tuple[str]:
 
     if in_serialization_ctx(ctx):
-        if ctx.env.output_format == context.OutputFormat.JSON:
+        if ctx.env.output_format in context.JSON_OUTPUT_FORMATS:
             return ('jsonb',)
         elif isinstance(schema_type, s_objtypes.ObjectType):
             return ('record',)
@@ -155,7 +155,7 @@ def prepare_tuple_for_aggregation(
         expr: pgast.Base, *,
         env: context.Environment) -> pgast.Base:
 
-    if env.output_format == context.OutputFormat.JSON:
+    if env.output_format in context.JSON_OUTPUT_FORMATS:
         result = expr
     else:
         # PostgreSQL sometimes "forgets" the structure of an anonymous
@@ -147,6 +147,30 @@ async def fetch_inheritance(
     """, schema_pattern, table_pattern, max_depth)
 
 
+async def fetch_bases(
+        conn: asyncpg.connection.Connection, *,
+        schema_pattern: str=None,
+        table_pattern: str=None) -> typing.List[asyncpg.Record]:
+    return await conn.fetch("""
+        SELECT
+                ns.nspname                            AS schema,
+                c.relname                             AS name,
+                array_agg(ARRAY[pns.nspname, pc.relname]::text[]
+                          ORDER BY pgi.inhseqno)      AS bases
+            FROM
+                pg_inherits pgi
+                INNER JOIN pg_class c ON c.oid = pgi.inhrelid
+                INNER JOIN pg_namespace ns ON ns.oid = c.relnamespace
+                INNER JOIN pg_class pc ON pc.oid = pgi.inhparent
+                INNER JOIN pg_namespace pns ON pns.oid = pc.relnamespace
+            WHERE
+                ($1::text IS NULL OR ns.nspname LIKE $1::text) AND
+                ($2::text IS NULL OR c.relname LIKE $2::text)
+            GROUP BY
+                ns.nspname, c.relname
+    """, schema_pattern, table_pattern)
+
+
 async def fetch_descendants(
         conn: asyncpg.connection.Connection, *,
         schema_pattern: str=None, table_pattern: str=None,
@@ -79,3 +79,22 @@ async def fetch_properties(
             ORDER BY
                 p.id, p.target NULLS FIRST
     """)
+
+
+async def fetch_ids(
+        conn: asyncpg.connection.Connection) -> typing.List[asyncpg.Record]:
+    return await conn.fetch("""
+        SELECT
+                l.id                    AS id,
+                l.name                  AS name,
+                FALSE                   AS is_property
+            FROM
+                edgedb.link l
+        UNION ALL
+        SELECT
+                p.id                    AS id,
+                p.name                  AS name,
+                TRUE                    AS is_property
+            FROM
+                edgedb.Property p
+    """)
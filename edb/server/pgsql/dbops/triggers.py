@@ -18,6 +18,7 @@
 
 
 import json
+import re
 
 from .. import common
 from ..datasources import introspection
@@ -53,7 +54,7 @@ class Trigger(tables.InheritableTableObject):
     def __init__(
             self, name, *, table_name, events, timing='after',
             granularity='row', procedure, condition=None, is_constraint=False,
-            inherit=False, metadata=None):
+            new_table=None, inherit=False, metadata=None):
         super().__init__(inherit=inherit, metadata=metadata)
 
         self.name = name
@@ -64,6 +65,8 @@ class Trigger(tables.InheritableTableObject):
         self.procedure = procedure
         self.condition = condition
         self.is_constraint = is_constraint
+        # Name of the transition table with the new rows, if any.
+        self.new_table = new_table
 
         if is_constraint and granularity != 'row':
             msg = 'invalid granularity for ' \
@@ -130,10 +133,17 @@ class Trigger(tables.InheritableTableObject):
 
                 condition = definition[when_off + 6:pos - 1]
 
+        new_table = None
+        if definition:
+            m = re.search(r'REFERENCING NEW TABLE AS (\w+)', definition)
+            if m:
+                new_table = m.group(1)
+
         trg = cls(
             name=name, table_name=table_name, events=events, timing=timing,
             granularity=granularity, procedure=proc, condition=condition,
-            is_constraint=bool(constraint), metadata=metadata)
+            is_constraint=bool(constraint), new_table=new_table,
+            metadata=metadata)
 
         return trg
 
@@ -142,7 +152,8 @@ class Trigger(tables.InheritableTableObject):
             name=self.name, table_name=self.table_name, events=self.events,
             timing=self.timing, granularity=self.granularity,
             procedure=self.procedure, condition=self.condition,
-            is_constraint=self.is_constraint, metadata=self.metadata.copy())
+            is_constraint=self.is_constraint, new_table=self.new_table,
+            metadata=self.metadata.copy())
 
     def __repr__(self):
         return \
@@ -166,7 +177,7 @@ class CreateTrigger(tables.CreateInheritableTableObject):
     async def code(self, context):
         return '''
             CREATE {constr}TRIGGER {trigger_name} {timing} {events}
-                   ON {table_name}
+                   ON {table_name} {referencing}
                    FOR EACH {granularity} {condition}
                    EXECUTE PROCEDURE {procedure}
         '''.format(
@@ -175,6 +186,10 @@ class CreateTrigger(tables.CreateInheritableTableObject):
             timing=self.trigger.timing,
             events=' OR '.join(self.trigger.events),
             table_name=common.qname(*self.trigger.table_name),
+            referencing=(
+                'REFERENCING NEW TABLE AS {}'.format(
+                    common.quote_ident(self.trigger.new_table))
+                if self.trigger.new_table else ''),
             granularity=self.trigger.granularity, condition=(
                 'WHEN ({})'.format(self.trigger.condition)
                 if self.trigger.condition else ''),
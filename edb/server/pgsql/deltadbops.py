@@ -33,6 +33,10 @@ from edb.server.pgsql import metaschema
 from edb.server.pgsql.dbops import catalogs as pg_catalogs
 
 
+# Name of the transition table of statement-level constraint triggers.
+NEW_ROWS_TABLE = '__edb_new_rows'
+
+
 class SchemaDBObjectMeta(adapter.Adapter, type(s_obj.Object)):
     def __init__(cls, name, bases, dct, *, adapts=None):
         adapter.Adapter.__init__(cls, name, bases, dct, adapts=adapts)
@@ -247,17 +251,12 @@ class SchemaConstraintTableConstraint(ConstraintCommon, dbops.TableConstraint):
                  'constraint {constr}'.format(constr=constr_name)
 
         subject_table = self.get_subject_name()
+        stmt_chunks = []
 
         for expr in self._exprdata:
             exprdata = expr['exprdata']
 
-            text = '''
-                PERFORM
-                    TRUE
-                  FROM
-                    {table}
-                  WHERE
-                    {plain_expr} = {new_expr};
+            raise_text = '''
                 IF FOUND THEN
                   RAISE unique_violation
                       USING
@@ -268,14 +267,55 @@ class SchemaConstraintTableConstraint(ConstraintCommon, dbops.TableConstraint):
                           DETAIL = 'Key ({plain_expr}) already exists.';
                 END IF;
             '''.format(
-                plain_expr=exprdata['plain'], new_expr=exprdata['new'],
-                table=subject_table, constr=raw_constr_name, errmsg=errmsg)
+                plain_expr=exprdata['plain'], table=subject_table,
+                constr=raw_constr_name, errmsg=errmsg)
 
-            chunks.append(text)
-
-        text = 'BEGIN\n' + '\n\n'.join(chunks) + '\nRETURN NEW;\nEND;'
-
-        return text
+            text = '''
+                PERFORM
+                    TRUE
+                  FROM
+                    {table}
+                  WHERE
+                    {plain_expr} = {new_expr};
+            '''.format(
+                plain_expr=exprdata['plain'], new_expr=exprdata['new'],
+                table=subject_table)
+
+            chunks.append(text + raise_text)
+
+            if self.is_checked_per_statement():
+                # The whole batch of inserted rows is checked at once.
+                text = '''
+                    PERFORM
+                        TRUE
+                      FROM
+                        {new_rows}
+                      WHERE
+                        EXISTS (
+                          SELECT
+                              TRUE
+                            FROM
+                              {table}
+                            WHERE
+                              {plain_expr} = {new_rows_expr}
+                        );
+                '''.format(
+                    plain_expr=exprdata['plain'], new_rows=NEW_ROWS_TABLE,
+                    new_rows_expr=exprdata['new_rows'], table=subject_table)
+
+                stmt_chunks.append(text + raise_text)
+
+        text = '\n\n'.join(chunks) + '\nRETURN NEW;'
+
+        if stmt_chunks:
+            # The same procedure serves the statement-level insert
+            # trigger and the row-level update trigger.
+            text = (
+                "IF TG_LEVEL = 'STATEMENT' THEN\n" +
+                '\n\n'.join(stmt_chunks) + '\nRETURN NULL;\nEND IF;\n' +
+                text)
+
+        return 'BEGIN\n' + text + '\nEND;'
 
     def is_multiconstraint(self):
         """Determine if multiple database constraints are needed."""
@@ -285,6 +325,10 @@ class SchemaConstraintTableConstraint(ConstraintCommon, dbops.TableConstraint):
         """Determine if this constraint can be inherited natively."""
         return self._type == 'check'
 
+    def is_checked_per_statement(self):
+        """Determine if inserts are checked by a statement-level trigger."""
+        return bool(self._constraint.check_per_statement)
+
     def __repr__(self):
         return '<{}.{} {!r}>'.format(
             self.__class__.__module__, self.__class__.__name__,
@@ -454,9 +498,16 @@ class AlterTableInheritableConstraintBase(
         cname = constraint.raw_constraint_name()
 
         ins_trigger_name = common.edgedb_name_to_pg_name(cname + '_instrigger')
-        ins_trigger = dbops.Trigger(
-            name=ins_trigger_name, table_name=table_name, events=('insert', ),
-            procedure=proc_name, is_constraint=True, inherit=True)
+        if constraint.is_checked_per_statement():
+            ins_trigger = dbops.Trigger(
+                name=ins_trigger_name, table_name=table_name,
+                events=('insert', ), granularity='statement',
+                procedure=proc_name, new_table=NEW_ROWS_TABLE, inherit=True)
+        else:
+            ins_trigger = dbops.Trigger(
+                name=ins_trigger_name, table_name=table_name,
+                events=('insert', ), procedure=proc_name, is_constraint=True,
+                inherit=True)
         cr_ins_trigger = dbops.CreateTrigger(ins_trigger)
         cmds.append(cr_ins_trigger)
 
@@ -601,7 +652,7 @@ class AlterTableInheritableConstraintBase(
 
         else:
             # Some other modification, drop/create
-            self.drop_constraint(new_constraint)
+            self.drop_constraint(old_constraint)
             self.create_constraint(new_constraint)
 
     def drop_constraint(self, constraint):
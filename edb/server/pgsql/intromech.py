@@ -60,8 +60,30 @@ from . import types
 
 class IntrospectionMech:
 
+    # Introspection state that is derived from the schema and can be
+    # shared between connections to the same database.
+    _shared_caches = (
+        'schema', '_constr_mech', '_type_mech', 'scalar_cache',
+        'link_cache', 'link_property_cache', 'type_cache', 'table_cache',
+        'domain_to_scalar_map', 'table_id_to_class_name_cache',
+        'classname_to_table_id_cache', 'attribute_link_map_cache',
+    )
+
     def __init__(self, connection):
         self.schema = None
+        self._reset_caches()
+        self._record_mapping_cache = {}
+
+        self.parser = parser.PgSQLParser()
+        self.search_idx_expr = astexpr.TextSearchExpr()
+        self.type_expr = astexpr.TypeExpr()
+        self.constant_expr = None
+
+        self.connection = connection
+
+    def _reset_caches(self):
+        # Caches are always rebound rather than cleared in place,
+        # as they might be referenced by a shared cache snapshot.
         self._constr_mech = schemamech.ConstraintMech()
         self._type_mech = schemamech.TypeMech()
 
@@ -74,28 +96,17 @@ class IntrospectionMech:
         self.table_id_to_class_name_cache = {}
         self.classname_to_table_id_cache = {}
         self.attribute_link_map_cache = {}
-        self._record_mapping_cache = {}
-
-        self.parser = parser.PgSQLParser()
-        self.search_idx_expr = astexpr.TextSearchExpr()
-        self.type_expr = astexpr.TypeExpr()
-        self.constant_expr = None
-
-        self.connection = connection
 
     def invalidate_cache(self):
         self.schema = None
-        self._constr_mech.invalidate_schema_cache()
-        self._type_mech.invalidate_schema_cache()
-        self.link_cache.clear()
-        self.link_property_cache.clear()
-        self.type_cache.clear()
-        self.scalar_cache.clear()
-        self.table_cache.clear()
-        self.domain_to_scalar_map.clear()
-        self.table_id_to_class_name_cache.clear()
-        self.classname_to_table_id_cache.clear()
-        self.attribute_link_map_cache.clear()
+        self._reset_caches()
+
+    def get_cache_snapshot(self):
+        return {attr: getattr(self, attr) for attr in self._shared_caches}
+
+    def set_cache_snapshot(self, snapshot):
+        for attr in self._shared_caches:
+            setattr(self, attr, snapshot[attr])
 
     def get_type_id(self, objtype):
         objtype_id = None
@@ -118,6 +129,9 @@ class IntrospectionMech:
             for row in await cl_ds.fetch(self.connection):
                 self.type_cache[row['name']] = row['id']
                 self.type_cache[row['id']] = sn.Name(row['name'])
+                table_name = common.objtype_name_to_table_name(
+                    sn.Name(row['name']), catenate=False)
+                self.table_cache[table_name] = row
 
             cl_ds = datasources.schema.scalars
 
@@ -134,6 +148,24 @@ class IntrospectionMech:
         # ObjectType map needed early for type filtering operations
         # in schema queries
         await self.get_type_map(force_reload=True)
+        await self._init_pointer_cache()
+
+    async def _init_pointer_cache(self):
+        for row in await datasources.schema.links.fetch_ids(self.connection):
+            if row['is_property']:
+                self.link_property_cache[row['name']] = row['id']
+            else:
+                self.link_cache[row['name']] = row['id']
+
+    async def refresh_caches(self):
+        """Reload the introspection caches without reading the schema.
+
+        The caches hold backend state, such as ids of schema objects,
+        which is only known once DDL applied to the schema in memory
+        has been executed.
+        """
+        self._reset_caches()
+        await self._init_introspection_cache()
 
     def table_name_to_object_name(self, table_name):
         return self.table_cache.get(table_name)['name']
@@ -160,6 +192,7 @@ class IntrospectionMech:
 
     async def readschema(self):
         schema = so.Schema()
+        self._reset_caches()
         await self._init_introspection_cache()
         await self.read_modules(schema)
         await self.read_scalars(schema)
@@ -294,6 +327,7 @@ class IntrospectionMech:
                 pass
             else:
                 scalar.bases = [schema.get(sn.Name(basename[0]))]
+                schema.drop_inheritance_cache_for_child(scalar)
 
         sequence = schema.get('std::sequence', None)
         for scalar in schema.get_objects(type='ScalarType'):
@@ -392,8 +426,9 @@ class IntrospectionMech:
                 is_final=r['is_final'], expr=r['expr'],
                 subjectexpr=r['subjectexpr'],
                 localfinalexpr=r['localfinalexpr'], finalexpr=r['finalexpr'],
-                errmessage=r['errmessage'], paramtypes=paramtypes,
-                varparam=r['varparam'], args=r['args'])
+                errmessage=r['errmessage'],
+                check_per_statement=r['check_per_statement'],
+                paramtypes=paramtypes, varparam=r['varparam'], args=r['args'])
 
             if subject:
                 subject.add_constraint(constraint)
@@ -407,6 +442,7 @@ class IntrospectionMech:
                 pass
             else:
                 constraint.bases = [schema.get(b) for b in bases]
+                schema.drop_inheritance_cache_for_child(constraint)
 
         for constraint in schema.get_objects(type='constraint'):
             constraint.acquire_ancestor_inheritance(schema)
@@ -642,6 +678,7 @@ class IntrospectionMech:
                 pass
             else:
                 link.bases = [schema.get(b) for b in bases]
+                schema.drop_inheritance_cache_for_child(link)
 
         for link in schema.get_objects(type='link'):
             link.acquire_ancestor_inheritance(schema)
@@ -732,6 +769,7 @@ class IntrospectionMech:
                 prop.bases = [
                     schema.get(b, type=s_props.Property) for b in bases
                 ]
+                schema.drop_inheritance_cache_for_child(prop)
 
     async def order_link_properties(self, schema):
         g = {}
@@ -824,6 +862,7 @@ class IntrospectionMech:
                 pass
             else:
                 event.bases = [schema.get(b) for b in bases]
+                schema.drop_inheritance_cache_for_child(event)
 
         for event in schema.get_objects(type='event'):
             event.acquire_ancestor_inheritance(schema)
@@ -866,10 +905,10 @@ class IntrospectionMech:
 
         visited_tables = set()
 
-        self.table_cache.update({
-            common.objtype_name_to_table_name(n, catenate=False): c
-            for n, c in objtype_list.items()
-        })
+        # Fetch the inheritance of all data tables at once rather
+        # than querying each table separately.
+        table_bases = await self.pg_table_inheritance_to_bases(
+            'edgedb%', '%_data', self.table_cache)
 
         basemap = {}
 
@@ -898,10 +937,7 @@ class IntrospectionMech:
 
             visited_tables.add(table_name)
 
-            bases = await self.pg_table_inheritance_to_bases(
-                table['name'], table['schema'], self.table_cache)
-
-            basemap[name] = bases
+            basemap[name] = table_bases.get(table_name, ())
 
             objtype = s_objtypes.ObjectType(
                 name=name, title=objtype['title'],
@@ -920,6 +956,7 @@ class IntrospectionMech:
                 pass
             else:
                 objtype.bases = [schema.get(b) for b in bases]
+                schema.drop_inheritance_cache_for_child(objtype)
 
         derived = await datasources.schema.objtypes.fetch_derived(
             self.connection)
@@ -963,14 +1000,20 @@ class IntrospectionMech:
         return tuple(i[:2] for i in inheritance[1:])
 
     async def pg_table_inheritance_to_bases(
-            self, table_name, schema_name, table_to_objtype_map):
-        bases = []
+            self, schema_pattern, table_pattern, table_to_objtype_map):
+        """Return the names of base types for all matching tables."""
+        result = {}
 
-        for table in await self.pg_table_inheritance(table_name, schema_name):
-            base = table_to_objtype_map[tuple(table[:2])]
-            bases.append(base['name'])
+        rows = await introspection.tables.fetch_bases(
+            self.connection,
+            schema_pattern=schema_pattern, table_pattern=table_pattern)
+
+        for row in rows:
+            result[(row['schema'], row['name'])] = tuple(
+                table_to_objtype_map[tuple(base)]['name']
+                for base in row['bases'])
 
-        return tuple(bases)
+        return result
 
     def parse_pg_type(self, type_expr):
         tree = self.parser.parse('None::' + type_expr)
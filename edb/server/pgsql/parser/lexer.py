@@ -48,14 +48,9 @@ class PgSQLLexer(lexer.Lexer):
     MULTILINE_TOKENS = frozenset(('COMMENT', 'SCONST'))
     RE_FLAGS = re.X | re.M | re.I
 
-    # Basic keywords
-    keyword_rules = [
-        Rule(
-            token='KEYWORD', next_state=STATE_KEEP,
-            regexp=lexer.group(*pg_keywords.keys()))
-    ]
+    keywords = {val: tok[0] for val, tok in pg_keywords.items()}
 
-    common_rules = keyword_rules + [
+    common_rules = [
         Rule(token='WS', next_state=STATE_KEEP, regexp=r'[^\S\n]+'),
         Rule(token='NL', next_state=STATE_KEEP, regexp=r'\n'),
         Rule(
@@ -168,22 +163,17 @@ class PgSQLLexer(lexer.Lexer):
     states = {STATE_BASE: common_rules, }
 
     def token_from_text(self, rule_token, txt):
+        if rule_token == 'IDENT':
+            # Keywords are lowercased just like identifiers.
+            tok_type = self.get_keyword_token(txt) or rule_token
+            tok = super().token_from_text(tok_type, txt)
+            return tok._replace(value=txt.lower())
+
         tok = super().token_from_text(rule_token, txt)
 
         if rule_token == 'self':
             tok = tok._replace(type=txt)
 
-        elif rule_token == 'IDENT':
-            tok = tok._replace(value=txt.lower())
-
-        elif rule_token == 'KEYWORD':
-            # process keywords here since having separate rules for them
-            # creates > 100 re groups.
-            txt_low = txt.lower()
-            tok = tok._replace(
-                value=txt_low,
-                type=pg_keywords[txt_low][0])
-
         elif rule_token in ('SCONST', 'BCONST', 'XCONST'):
             txt = txt[:-1].split("'", 1)[1]
             txt = clean_string.sub('', txt.replace("''", "'"))
@@ -0,0 +1,256 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Pools of Postgres connections shared by client connections."""
+
+
+import asyncio
+import collections
+import logging
+import time
+
+from edb.lang.common import lru
+
+from edb.server import defines
+
+
+logger = logging.getLogger('edb.server')
+
+
+class PooledConnection:
+    """A Postgres connection and the state cached for it."""
+
+    def __init__(self, connection, *,
+                 stmt_cache_size=defines.PREPARED_STMT_CACHE_SIZE):
+        self.connection = connection
+        # Evicted statements are deallocated by asyncpg once
+        # they are no longer referenced.
+        self.stmt_cache = lru.LRUMapping(maxsize=stmt_cache_size)
+        # The schema the cached statements were compiled against.
+        self.stmt_cache_schema = None
+        self.released_at = None
+
+    def is_usable(self):
+        return (not self.connection.is_closed() and
+                not self.connection.is_in_transaction())
+
+
+class Pool:
+    """A pool of connections to one database as one user.
+
+    Connections are handed out for the duration of a request or,
+    if a transaction is started, until the transaction is finished.
+    At least *min_size* connections are kept open, connections above
+    that are closed after being idle for *idle_timeout* seconds.
+    """
+
+    def __init__(self, connect, *, min_size, max_size, idle_timeout,
+                 stmt_cache_size, loop):
+        if max_size <= 0:
+            raise ValueError('max_size must be greater than zero')
+
+        if min_size > max_size:
+            raise ValueError('min_size must not be greater than max_size')
+
+        self._connect = connect
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._stmt_cache_size = stmt_cache_size
+        self._loop = loop
+
+        # Idle connections, the most recently released ones last.
+        self._idle = collections.deque()
+        self._size = 0
+        self._waiters = collections.deque()
+        self._reaper = None
+        self._closed = False
+
+    async def start(self):
+        while self._size < self._min_size:
+            self._size += 1
+            try:
+                pconn = await self._new_connection()
+            except Exception:
+                self._size -= 1
+                raise
+            self._put_idle(pconn)
+
+    async def acquire(self):
+        if self._closed:
+            raise RuntimeError('the connection pool is closed')
+
+        while self._idle:
+            pconn = self._idle.pop()
+            if pconn.is_usable():
+                return pconn
+            self._discard(pconn)
+
+        if self._size < self._max_size:
+            self._size += 1
+            try:
+                return await self._new_connection()
+            except Exception:
+                self._size -= 1
+                self._wakeup_waiter()
+                raise
+
+        waiter = self._loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Woken up, but cancelled before getting the turn,
+                # pass it on.
+                self._wakeup_waiter()
+            raise
+
+        return await self.acquire()
+
+    def release(self, pconn):
+        if self._closed or not pconn.is_usable():
+            # Connections that are broken or left in the middle of
+            # a transaction cannot be reused.
+            self._discard(pconn)
+        else:
+            self._put_idle(pconn)
+
+        self._wakeup_waiter()
+
+    def discard(self, pconn):
+        """Close a connection that is in an unknown state."""
+        self._discard(pconn)
+        self._wakeup_waiter()
+
+    async def close(self):
+        self._closed = True
+
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        idle, self._idle = self._idle, collections.deque()
+        for pconn in idle:
+            self._size -= 1
+            await pconn.connection.close()
+
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(
+                    RuntimeError('the connection pool is closed'))
+        self._waiters.clear()
+
+    async def _new_connection(self):
+        connection = await self._connect()
+        return PooledConnection(
+            connection, stmt_cache_size=self._stmt_cache_size)
+
+    def _put_idle(self, pconn):
+        pconn.released_at = time.monotonic()
+        self._idle.append(pconn)
+        self._schedule_reaper()
+
+    def _discard(self, pconn):
+        self._size -= 1
+        if not pconn.connection.is_closed():
+            pconn.connection.terminate()
+
+    def _wakeup_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _schedule_reaper(self):
+        if (self._reaper is None and self._idle_timeout and
+                len(self._idle) > self._min_size):
+            self._reaper = self._loop.call_later(
+                self._idle_timeout, self._reap_idle)
+
+    def _reap_idle(self):
+        self._reaper = None
+        deadline = time.monotonic() - self._idle_timeout
+
+        # The least recently used connections are at the left.
+        while (len(self._idle) > self._min_size and
+                self._idle[0].released_at <= deadline):
+            pconn = self._idle.popleft()
+            self._size -= 1
+            self._loop.create_task(self._close_idle(pconn))
+
+        self._schedule_reaper()
+
+    async def _close_idle(self, pconn):
+        try:
+            await pconn.connection.close()
+        except Exception:
+            logger.exception('error while closing an idle connection')
+
+
+class PoolManager:
+    """Connection pools for each database and user."""
+
+    def __init__(self, cluster, *, loop,
+                 min_size=defines.BACKEND_POOL_MIN_SIZE,
+                 max_size=defines.BACKEND_POOL_MAX_SIZE,
+                 idle_timeout=defines.BACKEND_POOL_IDLE_TIMEOUT,
+                 stmt_cache_size=defines.PREPARED_STMT_CACHE_SIZE):
+        self._cluster = cluster
+        self._loop = loop
+        self._min_size = min_size
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._stmt_cache_size = stmt_cache_size
+        self._pools = {}
+
+    async def get_pool(self, database, user):
+        key = (database, user)
+        pool = self._pools.get(key)
+
+        if pool is None:
+            async def connect():
+                return await self._cluster.connect(
+                    database=database, user=user, loop=self._loop,
+                    server_settings={
+                        'application_name': defines.BACKEND_APP_NAME,
+                    })
+
+            pool = self._pools[key] = Pool(
+                connect, min_size=self._min_size, max_size=self._max_size,
+                idle_timeout=self._idle_timeout,
+                stmt_cache_size=self._stmt_cache_size, loop=self._loop)
+
+            try:
+                await pool.start()
+            except Exception:
+                del self._pools[key]
+                await pool.close()
+                raise
+
+        return pool
+
+    async def drop_pool(self, database):
+        for key in [k for k in self._pools if k[0] == database]:
+            await self._pools.pop(key).close()
+
+    async def close(self):
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await pool.close()
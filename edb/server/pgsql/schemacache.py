@@ -0,0 +1,307 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Server-wide registry of introspected database schemas."""
+
+
+import asyncio
+import contextlib
+import copyreg
+import functools
+import io
+import itertools
+import logging
+import os
+import pickle
+import sys
+
+import asyncpg
+
+from edb.lang.schema import objects as s_obj
+
+
+logger = logging.getLogger('edb.server')
+
+# Notifications on this channel are sent by the server processes
+# when DDL changes the schema of the database.
+SCHEMA_CHANGE_CHANNEL = '__edgedb_schema_change__'
+
+
+class SchemaCacheEntry:
+    """An immutable snapshot of an introspected database schema.
+
+    The snapshot is shared by all backends connected to the database.
+    Backends must never mutate ``schema`` or the introspection caches
+    in ``intro_caches``; DDL is applied to a private schema copy and
+    the result is published as a new entry.
+    """
+
+    __slots__ = ('dbname', 'schema', 'checksum', 'version', 'intro_caches',
+                 '_pickled')
+
+    def __init__(self, dbname, schema, checksum, version, intro_caches):
+        self.dbname = dbname
+        self.schema = schema
+        self.checksum = checksum
+        self.version = version
+        self.intro_caches = intro_caches
+        self._pickled = None
+
+    def get_snapshot(self):
+        """Return a snapshot of this entry for SchemaCache.load_snapshot()."""
+        if self._pickled is None:
+            self._pickled = dumps({self.dbname: self._get_state()})
+        return self._pickled
+
+    def copy_schema(self):
+        """Return a private copy of the schema, which may be modified."""
+        return loads(self.get_snapshot())[self.dbname][0]
+
+    def _get_state(self):
+        return self.schema, self.checksum, self.version, self.intro_caches
+
+    def __repr__(self):
+        return (f'<{type(self).__name__} {self.dbname!r} '
+                f'version={self.version} at 0x{id(self):x}>')
+
+
+class SchemaCache:
+    """Per-database schema snapshots shared by all client connections.
+
+    The first backend connecting to a database introspects the schema,
+    concurrent connections wait for that introspection to complete, and
+    all subsequent connections reuse the published snapshot.  Every
+    published schema gets a new entry version, which tells backends
+    and compiler workers to switch to it.
+    """
+
+    def __init__(self, *, connect=None):
+        self._entries = {}
+        self._loading = {}
+        # Versions are unique across databases and are never reused,
+        # so that (dbname, version) identifies a schema.
+        self._versions = itertools.count(1)
+
+        # When the database is served by multiple server processes,
+        # *connect* is a coroutine function returning a new connection
+        # to the given database.  It is used to listen for schema
+        # changes made by other processes.
+        self._connect = connect
+        self._listeners = {}
+
+    def get(self, dbname):
+        if self._connect is not None and not self._is_listening(dbname):
+            # Changes made by other processes might have been missed.
+            self._entries.pop(dbname, None)
+
+        return self._entries.get(dbname)
+
+    def get_version(self, dbname):
+        entry = self.get(dbname)
+        return entry.version if entry is not None else None
+
+    async def load(self, dbname, intro_mech):
+        entry = self.get(dbname)
+        if entry is not None:
+            return entry
+
+        loading = self._loading.get(dbname)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        loading = asyncio.get_event_loop().create_future()
+        self._loading[dbname] = loading
+
+        try:
+            if self._connect is not None:
+                # Start listening before introspecting, so that
+                # no concurrent change is missed.
+                await self._listen(dbname)
+            await intro_mech.getschema()
+            entry = self.publish(dbname, intro_mech)
+        except Exception as e:
+            loading.set_exception(e)
+            # Mark the exception as retrieved, as there might be
+            # no other waiters.
+            loading.exception()
+            raise
+        else:
+            loading.set_result(entry)
+            return entry
+        finally:
+            self._loading.pop(dbname, None)
+
+    def publish(self, dbname, intro_mech):
+        schema = intro_mech.schema
+
+        # The version is bumped even if the checksum did not change:
+        # the checksum is not relied upon to detect every change.
+        entry = SchemaCacheEntry(
+            dbname=dbname, schema=schema, checksum=schema.get_checksum(),
+            version=next(self._versions),
+            intro_caches=intro_mech.get_cache_snapshot())
+
+        self._entries[dbname] = entry
+        return entry
+
+    def invalidate(self, dbname):
+        self._entries.pop(dbname, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def start(self):
+        """Start listening for changes of the snapshot schemas."""
+        if self._connect is not None:
+            for dbname in list(self._entries):
+                await self._listen(dbname)
+
+    async def notify_change(self, connection):
+        """Notify other server processes that the schema is changing.
+
+        Must be called in the transaction that changes the schema,
+        Postgres delivers the notification only if it is committed.
+        """
+        if self._connect is not None:
+            await connection.execute(
+                'SELECT pg_notify($1, $2)',
+                SCHEMA_CHANGE_CHANNEL, str(os.getpid()))
+
+    async def forget(self, dbname):
+        """Drop the schema and close connections to the database."""
+        self.invalidate(dbname)
+        listener = self._listeners.pop(dbname, None)
+        if listener is not None and not listener.is_closed():
+            await listener.close()
+
+    async def close(self):
+        listeners, self._listeners = self._listeners, {}
+        for listener in listeners.values():
+            if not listener.is_closed():
+                await listener.close()
+
+    def dump_snapshot(self):
+        """Return a pickled snapshot of all cached schemas."""
+        return dumps({
+            dbname: e._get_state() for dbname, e in self._entries.items()
+        })
+
+    def load_snapshot(self, data):
+        """Populate the cache from a snapshot made by dump_snapshot()."""
+        max_version = 0
+
+        for dbname, state in loads(data).items():
+            schema, checksum, version, intro_caches = state
+            self._entries[dbname] = SchemaCacheEntry(
+                dbname=dbname, schema=schema, checksum=checksum,
+                version=version, intro_caches=intro_caches)
+            max_version = max(max_version, version)
+
+        self._versions = itertools.count(
+            max(max_version + 1, next(self._versions)))
+
+    def _is_listening(self, dbname):
+        listener = self._listeners.get(dbname)
+        return listener is not None and not listener.is_closed()
+
+    async def _listen(self, dbname):
+        if self._is_listening(dbname):
+            return
+
+        listener = await self._connect(dbname)
+        await listener.add_listener(
+            SCHEMA_CHANGE_CHANNEL,
+            functools.partial(self._on_schema_change, dbname))
+        self._listeners[dbname] = listener
+
+    def _on_schema_change(self, dbname, connection, pid, channel, payload):
+        if payload != str(os.getpid()):
+            logger.debug('schema of %r changed by another process', dbname)
+            self.invalidate(dbname)
+
+
+class SnapshotRecord(dict):
+    """A picklable substitute of asyncpg.Record in schema snapshots."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self.values())[key]
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        # Like records, iterate over the values.
+        return iter(self.values())
+
+
+def _reduce_schema_object(obj):
+    # Object.__getstate__ replaces references to other objects with
+    # names, which is suitable for pickling standalone objects only.
+    # A snapshot contains the whole object graph, so the state is
+    # pickled as is.
+    return copyreg.__newobj__, (type(obj),), obj.__dict__
+
+
+def _reduce_record(record):
+    return SnapshotRecord, (), None, None, iter(record.items())
+
+
+class _SnapshotDispatchTable(dict):
+
+    def __missing__(self, cls):
+        if issubclass(cls, s_obj.Object):
+            reducer = _reduce_schema_object
+        elif issubclass(cls, asyncpg.Record):
+            reducer = _reduce_record
+        else:
+            raise KeyError(cls)
+
+        self[cls] = reducer
+        return reducer
+
+
+_snapshot_dispatch_table = _SnapshotDispatchTable()
+
+
+@contextlib.contextmanager
+def _deep_recursion():
+    # Schema object graphs are deep.
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 10000))
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def dumps(obj):
+    """Pickle schemas and introspection state."""
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = _snapshot_dispatch_table
+
+    with _deep_recursion():
+        pickler.dump(obj)
+
+    return buf.getvalue()
+
+
+def loads(data):
+    with _deep_recursion():
+        return pickle.loads(data)
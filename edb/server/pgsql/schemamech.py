@@ -226,8 +226,14 @@ class ConstraintMech:
             ref.name[0] = 'OLD'
         old_expr = codegen.SQLSourceGenerator.to_source(sql_expr)
 
+        # The expression over the rows of a statement-level trigger.
+        for ref in refs:
+            ref.name[0] = deltadbops.NEW_ROWS_TABLE
+        new_rows_expr = codegen.SQLSourceGenerator.to_source(sql_expr)
+
         exprdata = dict(
-            plain=plain_expr, plain_chunks=chunks, new=new_expr, old=old_expr)
+            plain=plain_expr, plain_chunks=chunks, new=new_expr, old=old_expr,
+            new_rows=new_rows_expr)
 
         return dict(
             exprdata=exprdata, is_multicol=is_multicol, is_trivial=is_trivial)
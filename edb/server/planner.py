@@ -17,6 +17,8 @@
 #
 
 
+from edb.lang import edgeql
+from edb.lang import graphql as graphql_compiler
 from edb.lang.edgeql import ast as qlast
 from edb.lang.edgeql import compiler as ql_compiler
 from edb.lang.schema import ddl as s_ddl
@@ -41,7 +43,25 @@ class TransactionStatement:
         return '<{} {!r} at 0x{:x}>'.format(self.__name__, self.op, id(self))
 
 
-def plan_statement(stmt, backend, flags={}, *, timer):
+def parse_script(script, schema, *, graphql, timer):
+    if graphql:
+        with timer.timeit('graphql_translation'):
+            script = graphql_compiler.translate(
+                schema, script, variables={}) + ';'
+
+    with timer.timeit('parse_eql'):
+        return edgeql.parse_block(script)
+
+
+def is_query(stmt):
+    """Return True if planning *stmt* has no side effects."""
+    return not isinstance(
+        stmt, (qlast.Database, qlast.Delta, qlast.DDL,
+               qlast.Transaction, qlast.SessionStateDecl))
+
+
+def plan_statement(stmt, backend, flags={}, *, timer,
+                   output_format=compiler.OutputFormat.JSON):
     schema = backend.schema
     modaliases = backend.modaliases
 
@@ -75,5 +95,4 @@ def plan_statement(stmt, backend, flags={}, *, timer):
             ir = ql_compiler.compile_ast_to_ir(
                 stmt, schema=schema, modaliases=modaliases)
 
-        return backend.compile(ir, output_format=compiler.OutputFormat.JSON,
-                               timer=timer)
+        return backend.compile(ir, output_format=output_format, timer=timer)
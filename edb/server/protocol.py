@@ -18,19 +18,22 @@
 
 
 import asyncio
+import collections
 import contextlib
 import enum
 import json
-import struct
 import time
 import traceback
 
-from edb.lang import edgeql
-from edb.lang import graphql as graphql_compiler
+from edb.api import wire
 
+
+from edb.server import defines
 from edb.server import pgsql as backend
+from edb.server.pgsql import compiler as pg_compiler
 from edb.server import executor
 from edb.server import planner
+from edb.server import query as edgedb_query
 
 from edb.lang.schema import database as s_db
 from edb.lang.schema import delta as s_delta
@@ -42,9 +45,6 @@ from edb.lang.common import exceptions
 from edb.lang.common import parsing
 
 
-msg_header = struct.Struct('!L')
-
-
 class Timer:
     __slots__ = ('parse_eql', 'compile_eql_to_ir', 'compile_ir_to_sql',
                  'graphql_translation', 'execution')
@@ -66,6 +66,11 @@ class Timer:
     def as_dict(self):
         return {k: getattr(self, k) for k in self.__slots__}
 
+    def add(self, timings):
+        """Add timings measured elsewhere, as returned by as_dict()."""
+        for k, v in timings.items():
+            setattr(self, k, getattr(self, k) + v)
+
 
 class ConnectionState(enum.Enum):
     NOT_CONNECTED = 0
@@ -73,8 +78,7 @@ class ConnectionState(enum.Enum):
     READY = 2
 
 
-class ProtocolError(Exception):
-    pass
+ProtocolError = wire.ProtocolError
 
 
 def is_ddl(plan):
@@ -84,13 +88,30 @@ def is_ddl(plan):
 
 
 class Protocol(asyncio.Protocol):
-    def __init__(self, pg_cluster, loop):
+    def __init__(self, pg_cluster, loop, *, schema_cache=None, pool=None,
+                 compiler_pool=None):
         self._pg_cluster = pg_cluster
         self._loop = loop
+        self._schema_cache = schema_cache
+        self._compiler_pool = compiler_pool
+        # If a pool manager is given, Postgres connections are taken
+        # from the pool only for the duration of a request or
+        # a transaction, otherwise a dedicated connection is used.
+        self._pool = pool
+        self._backend_pool = None
+        self.database = None
         self.pgconn = None
+        self.backend = None
         self.state = ConnectionState.NOT_CONNECTED
         self.transactions = []
-        self.buffer = bytearray()
+        self._reader = wire.FrameReader()
+        self._init_request_id = None
+        # Pipelined requests are executed strictly in order,
+        # as they share the backend connection.
+        self._pipeline = collections.deque()
+        self._pipeline_task = None
+        self._write_ready = asyncio.Event(loop=loop)
+        self._write_ready.set()
 
     def connection_made(self, transport):
         self.transport = transport
@@ -98,83 +119,179 @@ class Protocol(asyncio.Protocol):
 
     def connection_lost(self, exc):
         self.transport.close()
+        self._pipeline.clear()
+        if self._pipeline_task is not None:
+            # The task releases the backend connection when cancelled.
+            self._pipeline_task.cancel()
+            self._pipeline_task = None
+        else:
+            self._release_backend_connection(discard=True)
         if self.pgconn is not None:
             self.pgconn.terminate()
 
+    def pause_writing(self):
+        self._write_ready.clear()
+
+    def resume_writing(self):
+        self._write_ready.set()
+
     def data_received(self, data):
-        self.buffer.extend(data)
-        buf_len = len(self.buffer)
-        header_size = msg_header.size
-        if buf_len > header_size:
-            msg_len, = msg_header.unpack(self.buffer[:header_size])
-            if buf_len >= header_size + msg_len:
-                msg = self.buffer[header_size:header_size + msg_len]
-                self.buffer = self.buffer[header_size + msg_len:]
-                msg = json.loads(msg.decode('utf-8'))
-                self._loop.call_soon(self.process_message, msg)
-
-    def process_message(self, message):
-        if message['__type__'] == 'init':
+        try:
+            messages = self._reader.feed(data)
+        except wire.ProtocolError as e:
+            # The stream is no longer in sync.
+            self.send_error(e)
+            self.transport.close()
+            return
+
+        for mtype, request_id, payload in messages:
+            try:
+                self.process_message(mtype, request_id, payload)
+            except ProtocolError as e:
+                self.send_error(e, request_id=request_id)
+
+    def process_message(self, mtype, request_id, message):
+        if message is None:
+            message = {}
+        elif not isinstance(message, dict):
+            raise ProtocolError(f'invalid message: {mtype!r}')
+
+        if mtype == wire.MSG_INIT:
+            if self.state != ConnectionState.NEW:
+                raise ProtocolError('unexpected message: init')
+
+            version = message.get('version')
+            if version != wire.PROTOCOL_VERSION:
+                raise ProtocolError(
+                    f'unsupported protocol version: {version!r}')
+
             database = message.get('database')
             user = message.get('user')
 
             if not database or not user:
                 raise ProtocolError('invalid startup packet')
 
-            fut = self._loop.create_task(
-                self._pg_cluster.connect(
-                    database=database, user=user, loop=self._loop))
+            self.database = database
+            self._init_request_id = request_id
 
-            fut.add_done_callback(self._on_pg_connect)
+            fut = self._loop.create_task(self._connect(database, user))
+            fut.add_done_callback(self._on_edge_connect)
 
-        elif message['__type__'] == 'query':
+        elif mtype == wire.MSG_SCRIPT:
             if self.state != ConnectionState.READY:
-                raise ProtocolError('unexpected message: query')
+                raise ProtocolError('unexpected message: script')
+
+            script = message.get('script')
+            if not script:
+                raise ProtocolError('invalid script message')
 
-            query = message.get('query')
-            if not query:
-                raise ProtocolError('invalid query message')
+            self._enqueue(
+                request_id,
+                self._run_script, script, graphql=message.get('graphql'),
+                flags=message.get('flags'))
 
-            fut = self._loop.create_task(self._run_query(query))
-            fut.add_done_callback(self._on_query_done)
+        elif mtype == wire.MSG_STREAM:
+            if self.state != ConnectionState.READY:
+                raise ProtocolError('unexpected message: stream')
 
-        elif message['__type__'] == 'gql_query':
+            script = message.get('script')
+            chunk_size = message.get('chunk_size')
+            if (not script or not isinstance(chunk_size, int) or
+                    chunk_size <= 0):
+                raise ProtocolError('invalid stream message')
+
+            self._enqueue(
+                request_id,
+                self._stream_script, request_id, script,
+                chunk_size=chunk_size, graphql=message.get('graphql'),
+                flags=message.get('flags'))
+
+        elif mtype == wire.MSG_LIST_DBS:
             if self.state != ConnectionState.READY:
-                raise ProtocolError('unexpected message: query')
+                raise ProtocolError('unexpected message: list_dbs')
 
-            query = message.get('query')
-            if not query:
-                raise ProtocolError('invalid graphql query message')
+            self._enqueue(request_id, self._list_dbs)
 
-            fut = self._loop.create_task(self._run_query(query))
-            fut.add_done_callback(self._on_query_done)
+        elif mtype == wire.MSG_GET_PGCON:
+            self._enqueue(request_id, self._get_pgcon)
 
-        elif message['__type__'] == 'script':
-            if self.state != ConnectionState.READY:
-                raise ProtocolError('unexpected message: script')
+        else:
+            raise ProtocolError(f'unexpected message type: {mtype!r}')
 
-            script = message.get('script')
-            if not script:
-                raise ProtocolError('invalid script message')
+    def _enqueue(self, request_id, handler, *args, **kwargs):
+        self._pipeline.append((request_id, handler, args, kwargs))
 
-            fut = self._loop.create_task(
-                self._run_script(script, graphql=message.get('__graphql__'),
-                                 flags=message.get('__flags__')))
-            fut.add_done_callback(self._on_script_done)
+        if self._pipeline_task is None:
+            self._pipeline_task = self._loop.create_task(
+                self._process_pipeline())
 
-        elif message['__type__'] == 'list_dbs':
-            fut = self._loop.create_task(self._list_dbs())
-            fut.add_done_callback(self._on_script_done)
+    async def _process_pipeline(self):
+        try:
+            while self._pipeline:
+                request_id, handler, args, kwargs = self._pipeline.popleft()
+
+                try:
+                    await self._acquire_backend_connection()
+                    result = await handler(*args, **kwargs)
+                except asyncio.CancelledError:
+                    # The state of the connection is unknown.
+                    self._release_backend_connection(discard=True)
+                    raise
+                except Exception as e:
+                    self._release_backend_connection()
+                    self.send_error(e, request_id=request_id)
+                else:
+                    self._release_backend_connection()
+                    self.send_result(request_id, *result)
+        finally:
+            self._pipeline_task = None
 
-        elif message['__type__'] == 'get_pgcon':
-            fut = self._loop.create_task(self._get_pgcon())
-            fut.add_done_callback(self._on_script_done)
+    async def _acquire_backend_connection(self):
+        if self._backend_pool is not None and self.backend.connection is None:
+            pconn = await self._backend_pool.acquire()
+            self.backend.attach_connection(pconn)
+
+    def _release_backend_connection(self, *, discard=False):
+        if (self._backend_pool is None or self.backend is None or
+                self.backend.connection is None):
+            return
 
-    def send_message(self, msg):
-        msg = json.dumps(msg).encode('utf-8')
-        self.transport.write(msg_header.pack(len(msg)) + msg)
+        if discard:
+            self.transactions.clear()
+            self._backend_pool.discard(self.backend.detach_connection())
+        elif not self.transactions:
+            # The connection is held until the end of the transaction.
+            self._backend_pool.release(self.backend.detach_connection())
+
+    async def drop_database_connections(self, database):
+        """Close pooled connections to a database that is being dropped."""
+        if self._pool is not None:
+            await self._pool.drop_pool(database)
+
+        if self._schema_cache is not None:
+            await self._schema_cache.forget(database)
+
+        # Idle connections of other server processes would prevent
+        # dropping the database as well.
+        await self.backend.connection.execute('''
+            SELECT pg_terminate_backend(pid)
+                FROM pg_stat_activity
+            WHERE
+                datname = $1 AND application_name = $2 AND
+                state = 'idle' AND pid != pg_backend_pid();
+        ''', database, defines.BACKEND_APP_NAME)
+
+    def send_message(self, mtype, request_id, msg):
+        self.transport.write(wire.encode_message(mtype, request_id, msg))
+
+    def send_result(self, request_id, result, timings, descriptors=None):
+        self.send_message(wire.MSG_RESULT, request_id, {
+            'result': result,
+            'timings': timings,
+            'descriptors': descriptors,
+        })
 
-    def send_error(self, err):
+    def send_error(self, err, *, request_id=0):
         try:
             srcctx = exceptions.get_context(err, parsing.ParserContext)
         except LookupError:
@@ -190,22 +307,19 @@ class Protocol(asyncio.Protocol):
             debug.header('Error')
             debug.dump(err)
 
-        self.send_message({
-            '__type__': 'error',
-            'data': {
-                'C': getattr(err, 'code', 0),
-                'M': str(err),
-                'D': hintctx.details if hintctx is not None else None,
-                'H': hintctx.hint if hintctx is not None else None,
-                'P': (srcctx.start.pointer
-                      if srcctx is not None and
-                      srcctx.start is not None else None),
-                'p': (srcctx.end.pointer
-                      if srcctx is not None and
-                      srcctx.end is not None else None),
-                'Q': markup.dumps(srcctx) if srcctx is not None else None,
-                'T': traceback.format_tb(err.__traceback__),
-            }
+        self.send_message(wire.MSG_ERROR, request_id, {
+            'C': getattr(err, 'code', 0),
+            'M': str(err),
+            'D': hintctx.details if hintctx is not None else None,
+            'H': hintctx.hint if hintctx is not None else None,
+            'P': (srcctx.start.pointer
+                  if srcctx is not None and
+                  srcctx.start is not None else None),
+            'p': (srcctx.end.pointer
+                  if srcctx is not None and
+                  srcctx.end is not None else None),
+            'Q': markup.dumps(srcctx) if srcctx is not None else None,
+            'T': traceback.format_tb(err.__traceback__),
         })
 
     async def _get_pgcon(self):
@@ -220,89 +334,163 @@ class Protocol(asyncio.Protocol):
         timer = Timer()
 
         with timer.timeit('execution'):
-            result = await self.pgconn.fetch('''
-                SELECT d.datname
-                    FROM pg_database d
-                    INNER JOIN pg_shdescription c ON c.objoid = d.oid
-                WHERE
-                    d.datistemplate = false AND
-                    substr(c.description, 1, 4) = '$CMR';
-            ''')
-
-        result = [r['datname'] for r in result]
+            result = await backend.list_databases(self.backend.connection)
+
         return result, timer.as_dict()
 
+    def _plan_script(self, script, *, graphql, flags, timer,
+                     output_format=pg_compiler.OutputFormat.JSON):
+        statements = planner.parse_script(
+            script, self.backend.schema, graphql=graphql, timer=timer)
+
+        # Statements are planned lazily, as planning of a statement
+        # may depend on the effects of the preceding ones (e.g. DDL).
+        for statement in statements:
+            yield planner.plan_statement(
+                statement, self.backend, flags, timer=timer,
+                output_format=output_format)
+
+    async def _compile_script(self, script, *, graphql, flags, timer,
+                              output_format=pg_compiler.OutputFormat.JSON):
+        if self._compiler_pool is not None:
+            entry = self.backend.get_shared_schema()
+            if entry is not None:
+                plans = await self._compiler_pool.compile(
+                    entry, script, modaliases=self.backend.modaliases,
+                    graphql=graphql, flags=flags, timer=timer,
+                    output_format=output_format)
+                if plans is not None:
+                    return plans
+
+        # Scripts that are not just queries, or are run against
+        # a schema modified in the current transaction are compiled
+        # in process.
+        return self._plan_script(
+            script, graphql=graphql, flags=flags, timer=timer,
+            output_format=output_format)
+
     async def _run_script(self, script, *, graphql=False, flags={}):
         timer = Timer()
 
-        if graphql:
-            with timer.timeit('graphql_translation'):
-                script = graphql_compiler.translate(
-                    self.backend.schema, script,
-                    variables={}) + ';'
+        await self.backend.sync_schema()
 
-        with timer.timeit('parse_eql'):
-            statements = edgeql.parse_block(script)
+        plans = self.backend.get_cached_queries(script, graphql=graphql)
+        if plans is not None:
+            compiled = None
+        else:
+            plans = await self._compile_script(
+                script, graphql=graphql, flags=flags, timer=timer)
+            compiled = []
 
         results = []
-
-        for statement in statements:
-            plan = planner.plan_statement(
-                statement, self.backend, flags, timer=timer)
+        descriptors = []
+
+        for plan in plans:
+            if isinstance(plan, edgedb_query.Query) and plan.output_desc:
+                descriptors.append(plan.output_desc.as_dict())
+            else:
+                descriptors.append(None)
+
+            if compiled is not None:
+                if isinstance(plan, edgedb_query.Query):
+                    compiled.append(plan)
+                else:
+                    # Only scripts consisting entirely of queries are
+                    # cached, anything else might alter the schema or
+                    # the session state.
+                    compiled = None
 
             with timer.timeit('execution'):
                 result = await executor.execute_plan(plan, self)
 
             if result is not None and isinstance(result, list):
-                loaded = []
-                for row in result:
-                    if isinstance(row, str):
-                        # JSON result
-                        row = json.loads(row)
-                        loaded.extend(row)
-                    else:
-                        loaded.append(row)
-                result = loaded
+                if len(result) == 1 and isinstance(result[0], str):
+                    # The whole result was aggregated into a JSON
+                    # array by Postgres, send it to the client as is.
+                    result = wire.RawJSON(result[0].encode('utf-8'))
+                else:
+                    loaded = []
+                    for row in result:
+                        if isinstance(row, str):
+                            # JSON result
+                            row = json.loads(row)
+                            loaded.extend(row)
+                        else:
+                            loaded.append(row)
+                    result = loaded
             results.append(result)
 
-        return results, timer.as_dict()
+        if compiled:
+            self.backend.cache_queries(script, compiled, graphql=graphql)
 
-    def _on_pg_connect(self, fut):
-        try:
-            self.pgconn = fut.result()
-        except asyncio.CancelledError:
-            return
-        except Exception as e:
-            self.send_error(e)
-            return
+        return results, timer.as_dict(), descriptors
 
-        fut = self._loop.create_task(backend.open_database(self.pgconn))
+    async def _stream_script(self, request_id, script, *, chunk_size,
+                             graphql=False, flags={}):
+        timer = Timer()
 
-        fut.add_done_callback(self._on_edge_connect)
+        await self.backend.sync_schema()
 
-    def _on_edge_connect(self, fut):
-        try:
-            self.backend = fut.result()
-        except asyncio.CancelledError:
-            return
-        except Exception as e:
-            self.send_error(e)
-            return
+        plans = list(await self._compile_script(
+            script, graphql=graphql, flags=flags, timer=timer,
+            output_format=pg_compiler.OutputFormat.JSON_ELEMENTS))
 
-        self.state = ConnectionState.READY
+        if len(plans) != 1 or not isinstance(plans[0], edgedb_query.Query):
+            raise ProtocolError(
+                'only scripts consisting of a single query '
+                'can be streamed')
+
+        plan = plans[0]
+
+        with timer.timeit('execution'):
+            chunks = executor.execute_plan_streaming(
+                plan, self, chunk_size=chunk_size)
+
+            async for chunk in chunks:
+                # Do not fetch more data from Postgres until the client
+                # has consumed what was sent already.
+                await self._write_ready.wait()
+
+                data = '[' + ','.join(chunk) + ']'
+                self.send_message(
+                    wire.MSG_DATA, request_id,
+                    wire.RawJSON(data.encode('utf-8')))
+
+        return None, timer.as_dict(), [plan.output_desc.as_dict()]
 
-        self.send_message({'__type__': 'authresult', 'result': 'OK'})
+    async def _connect(self, database, user):
+        if self._pool is None:
+            self.pgconn = await self._pg_cluster.connect(
+                database=database, user=user, loop=self._loop)
 
-    def _on_script_done(self, fut):
+            return await backend.open_database(
+                self.pgconn, dbname=database,
+                schema_cache=self._schema_cache)
+
+        pool = await self._pool.get_pool(database, user)
+        pconn = await pool.acquire()
+
+        try:
+            bk = await backend.open_database(
+                pconn, dbname=database, schema_cache=self._schema_cache)
+        except Exception:
+            pool.release(pconn)
+            raise
+
+        pool.release(bk.detach_connection())
+        self._backend_pool = pool
+        return bk
+
+    def _on_edge_connect(self, fut):
         try:
-            result, timings = fut.result()
+            self.backend = fut.result()
         except asyncio.CancelledError:
             return
         except Exception as e:
-            self.send_error(e)
+            self.send_error(e, request_id=self._init_request_id)
             return
 
         self.state = ConnectionState.READY
 
-        self.send_message({'__type__': 'result', 'result': result,
-                           'timings': timings})
+        self.send_message(
+            wire.MSG_AUTHRESULT, self._init_request_id, {'result': 'OK'})
@@ -0,0 +1,210 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Management of server worker processes."""
+
+
+import asyncio
+import logging
+import os
+import signal
+
+
+logger = logging.getLogger('edb.server')
+
+# Seconds to wait before restarting a worker that exited unexpectedly.
+RESPAWN_DELAY = 1.0
+
+
+class WorkerStartup:
+    """The startup handshake between a worker and the supervisor.
+
+    A worker calls prepared() once it is ready to accept connections
+    and then waits for all other workers to get prepared before
+    serving, so that no worker starts serving with a stale state.
+    """
+
+    def __init__(self, prepared_fd, go_fd):
+        self._prepared_fd = prepared_fd
+        self._go_fd = go_fd
+
+    def prepared(self):
+        os.write(self._prepared_fd, b'.')
+        os.close(self._prepared_fd)
+
+    async def wait_go(self, loop):
+        waiter = loop.create_future()
+        loop.add_reader(self._go_fd, waiter.set_result, None)
+        try:
+            await waiter
+        finally:
+            loop.remove_reader(self._go_fd)
+            os.close(self._go_fd)
+
+
+class Supervisor:
+    """Runs the server in a number of forked worker processes.
+
+    *worker_main* is called in every worker process with a
+    WorkerStartup instance, or None for workers restarted after
+    a failure, which must not wait for other workers.
+    """
+
+    def __init__(self, worker_main, *, workers, loop,
+                 on_ready=None, on_stopping=None):
+        self._worker_main = worker_main
+        self._nworkers = workers
+        self._loop = loop
+        self._on_ready = on_ready
+        self._on_stopping = on_stopping
+
+        self._workers = set()
+        self._stopping = False
+        self._stopped = None
+
+    def run(self):
+        loop = self._loop
+        self._stopped = loop.create_future()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        watcher = asyncio.get_child_watcher()
+        watcher.attach_loop(loop)
+
+        try:
+            loop.run_until_complete(self._start())
+            loop.run_until_complete(self._stopped)
+        finally:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(sig)
+
+    def stop(self):
+        if self._stopping:
+            return
+
+        logger.info('Shutting down.')
+        self._stopping = True
+        if self._on_stopping is not None:
+            self._on_stopping()
+
+        for pid in self._workers:
+            self._kill(pid, signal.SIGTERM)
+
+        if not self._workers and not self._stopped.done():
+            self._stopped.set_result(None)
+
+    async def _start(self):
+        prepared_r, prepared_w = os.pipe()
+        go_r, go_w = os.pipe()
+
+        try:
+            for _ in range(self._nworkers):
+                self._spawn(
+                    WorkerStartup(prepared_w, go_r),
+                    # The supervisor ends of the pipes must be closed
+                    # in workers for EOF to be seen on the other end.
+                    close_fds=(prepared_r, go_w))
+        finally:
+            os.close(prepared_w)
+            os.close(go_r)
+
+        try:
+            prepared = 0
+            while prepared < self._nworkers:
+                data = await self._read(prepared_r)
+                if not data:
+                    # All workers have exited.
+                    break
+                prepared += len(data)
+        finally:
+            os.close(prepared_r)
+            # Closing the pipe lets the workers proceed.
+            os.close(go_w)
+
+        if self._stopping:
+            return
+
+        logger.info('Started %d workers.', self._nworkers)
+        if self._on_ready is not None:
+            self._on_ready()
+
+    async def _read(self, fd):
+        loop = self._loop
+        waiter = loop.create_future()
+        loop.add_reader(fd, lambda: waiter.set_result(os.read(fd, 1024)))
+        try:
+            return await waiter
+        finally:
+            loop.remove_reader(fd)
+
+    def _spawn(self, startup=None, *, close_fds=()):
+        pid = os.fork()
+
+        if pid == 0:
+            status = 1
+            try:
+                for fd in close_fds:
+                    os.close(fd)
+                self._init_worker()
+                self._worker_main(startup)
+                status = 0
+            except BaseException:
+                logger.exception('worker process failed')
+            finally:
+                os._exit(status)
+
+        logger.debug('Started worker process %d.', pid)
+        self._workers.add(pid)
+        asyncio.get_child_watcher().add_child_handler(pid, self._on_exit)
+
+    def _init_worker(self):
+        # Do not inherit the signal handling of the supervisor loop,
+        # the worker will set up its own event loop.
+        signal.set_wakeup_fd(-1)
+        for sig in (signal.SIGTERM, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+
+        asyncio.set_event_loop(None)
+
+    def _on_exit(self, pid, returncode):
+        # Called by the child watcher in the loop thread.
+        self._loop.call_soon_threadsafe(self._worker_exited, pid, returncode)
+
+    def _worker_exited(self, pid, returncode):
+        self._workers.discard(pid)
+
+        if self._stopping:
+            if not self._workers and not self._stopped.done():
+                self._stopped.set_result(None)
+            return
+
+        logger.error(
+            'Worker process %d exited unexpectedly with code %d, restarting.',
+            pid, returncode)
+        self._loop.call_later(RESPAWN_DELAY, self._respawn)
+
+    def _respawn(self):
+        if not self._stopping:
+            self._spawn()
+
+    def _kill(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
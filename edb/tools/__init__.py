@@ -20,3 +20,4 @@
 from .edb import edbcommands  # noqa
 from . import test  # noqa
 from . import inittestdb  # noqa
+from . import bench  # noqa
@@ -0,0 +1,458 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+import os.path
+import time
+import tracemalloc
+
+import asyncpg
+import click
+
+from edb.server import cluster as edgedb_cluster
+from edb.server.pgsql import intromech
+from edb.tools.edb import edbcommands
+
+
+@edbcommands.group()
+def bench():
+    """Run performance benchmarks."""
+
+
+def _parse_counts(ctx, param, value):
+    try:
+        return [int(v) for v in value.split(',')]
+    except ValueError:
+        raise click.BadParameter('expected a comma-separated list of numbers')
+
+
+def _make_schema(num_types):
+    types = ['type Type0:\n    property name -> str\n']
+    for i in range(1, num_types):
+        types.append(
+            f'type Type{i} extending Type0:\n'
+            f'    link ref{i} -> Type{i - 1}\n')
+    return '\n'.join(types)
+
+
+def _init_cluster(data_dir):
+    if data_dir is None:
+        cluster = edgedb_cluster.TempCluster()
+        destroy = True
+    else:
+        cluster = edgedb_cluster.Cluster(data_dir)
+        destroy = False
+
+    if cluster.get_status().startswith('not-initialized'):
+        cluster.init()
+
+    return cluster, destroy
+
+
+async def _bench_schema_load(cluster, counts, repeat, loop):
+    con = await cluster.connect(
+        user='edgedb', database='edgedb', loop=loop)
+    try:
+        pgspec = await con.get_pgcon()
+
+        for num_types in counts:
+            dbname = f'bench_schema_load_{num_types}'
+            await con.execute(f'CREATE DATABASE {dbname};')
+            try:
+                dbcon = await cluster.connect(
+                    user='edgedb', database=dbname, loop=loop)
+                try:
+                    await dbcon.execute(f'''
+                        CREATE MODULE bench;
+                        CREATE MIGRATION bench::d1
+                            TO eschema $${_make_schema(num_types)}$$;
+                        COMMIT MIGRATION bench::d1;
+                    ''')
+                finally:
+                    dbcon.close()
+
+                pgcon = await asyncpg.connect(
+                    host=pgspec['host'], port=pgspec['port'],
+                    user='postgres', database=dbname, loop=loop)
+                try:
+                    timings = []
+                    for _ in range(repeat):
+                        started = time.monotonic()
+                        await intromech.IntrospectionMech(pgcon).readschema()
+                        timings.append(time.monotonic() - started)
+                finally:
+                    await pgcon.close()
+
+                print(f'{num_types:>6} types: {min(timings):.3f}s '
+                      f'(best of {repeat})')
+
+            finally:
+                await con.execute(f'DROP DATABASE {dbname};')
+    finally:
+        con.close()
+
+
+@bench.command('schema-load')
+@click.option(
+    '-D', '--data-dir', type=str,
+    help='database cluster directory (default: a temporary cluster)')
+@click.option(
+    '--types', 'counts', type=str, default='100,500,1000',
+    callback=_parse_counts,
+    help='comma-separated numbers of object types to benchmark')
+@click.option('--repeat', type=click.IntRange(min=1), default=3,
+              help='number of timed introspections for each schema')
+def schema_load(*, data_dir, counts, repeat):
+    """Measure schema introspection time by the number of types."""
+
+    cluster, destroy = _init_cluster(data_dir)
+    cluster.start(port='dynamic', timezone='UTC')
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(
+            _bench_schema_load(cluster, counts, repeat, loop))
+    finally:
+        loop.close()
+        cluster.stop()
+        if destroy:
+            cluster.destroy()
+
+
+async def _first_query(cluster, loop):
+    con = await cluster.connect(
+        user='edgedb', database='edgedb', loop=loop)
+    try:
+        await con.execute('SELECT 1;')
+    finally:
+        con.close()
+
+
+@bench.command('startup')
+@click.option(
+    '-D', '--data-dir', type=str,
+    help='database cluster directory (default: a temporary cluster)')
+@click.option('--repeat', type=click.IntRange(min=1), default=3,
+              help='number of server starts')
+def startup(*, data_dir, repeat):
+    """Measure server startup time and the latency of the first query."""
+
+    cluster, destroy = _init_cluster(data_dir)
+    loop = asyncio.new_event_loop()
+
+    try:
+        for _ in range(repeat):
+            started = time.monotonic()
+            cluster.start(port='dynamic', timezone='UTC')
+            try:
+                ready = time.monotonic()
+                loop.run_until_complete(_first_query(cluster, loop))
+                done = time.monotonic()
+            finally:
+                cluster.stop()
+
+            print(f'startup: {ready - started:.3f}s, '
+                  f'first query: {done - ready:.3f}s')
+    finally:
+        loop.close()
+        if destroy:
+            cluster.destroy()
+
+
+@bench.command('bootstrap')
+@click.option('--repeat', type=click.IntRange(min=1), default=1,
+              help='number of clusters to bootstrap')
+def bootstrap(*, repeat):
+    """Measure the time it takes to bootstrap a new cluster."""
+
+    for _ in range(repeat):
+        cluster = edgedb_cluster.TempCluster()
+        try:
+            started = time.monotonic()
+            cluster.init()
+            print(f'bootstrap: {time.monotonic() - started:.3f}s')
+        finally:
+            cluster.destroy()
+
+
+def _make_unique_schema(depth, per_statement):
+    ddl = [f'''
+        CREATE MODULE bench;
+        CREATE ABSTRACT CONSTRAINT bench::bench_unique
+                EXTENDING std::unique {{
+            SET check_per_statement := {str(per_statement).lower()};
+        }};
+        CREATE TYPE bench::Type0 {{
+            CREATE PROPERTY bench::name -> std::str {{
+                CREATE CONSTRAINT bench::bench_unique;
+            }};
+        }};
+    ''']
+    for i in range(1, depth + 1):
+        ddl.append(f'CREATE TYPE bench::Type{i} EXTENDING bench::Type{i - 1};')
+    return '\n'.join(ddl)
+
+
+async def _bench_bulk_insert(cluster, depth, counts, repeat, loop):
+    con = await cluster.connect(
+        user='edgedb', database='edgedb', loop=loop)
+    try:
+        for per_statement in (False, True):
+            mode = 'statement' if per_statement else 'row'
+            dbname = f'bench_bulk_insert_{mode}'
+            await con.execute(f'CREATE DATABASE {dbname};')
+            try:
+                dbcon = await cluster.connect(
+                    user='edgedb', database=dbname, loop=loop)
+                try:
+                    await dbcon.execute(
+                        _make_unique_schema(depth, per_statement))
+
+                    for num_rows in counts:
+                        timings = []
+                        for i in range(repeat):
+                            names = ', '.join(
+                                f"'{num_rows}-{i}-{j}'"
+                                for j in range(num_rows))
+                            await dbcon.execute(f'''
+                                WITH MODULE bench
+                                FOR x IN {{{names}}} UNION (
+                                    INSERT Type{depth} {{ name := x }}
+                                );
+                            ''')
+                            timings.append(
+                                dbcon.get_last_timings()['execution'])
+
+                        print(f'{mode:>9} triggers, {num_rows:>6} rows: '
+                              f'{min(timings):.3f}s (best of {repeat})')
+                finally:
+                    dbcon.close()
+            finally:
+                await con.execute(f'DROP DATABASE {dbname};')
+    finally:
+        con.close()
+
+
+@bench.command('bulk-insert')
+@click.option(
+    '-D', '--data-dir', type=str,
+    help='database cluster directory (default: a temporary cluster)')
+@click.option('--depth', type=click.IntRange(min=1), default=5,
+              help='depth of the type hierarchy under the unique property')
+@click.option(
+    '--rows', 'counts', type=str, default='1000,10000',
+    callback=_parse_counts,
+    help='comma-separated numbers of objects inserted by one statement')
+@click.option('--repeat', type=click.IntRange(min=1), default=3,
+              help='number of timed inserts for each number of objects')
+def bulk_insert(*, data_dir, depth, counts, repeat):
+    """Compare row and statement triggers enforcing inherited uniqueness."""
+
+    cluster, destroy = _init_cluster(data_dir)
+    cluster.start(port='dynamic', timezone='UTC')
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(
+            _bench_bulk_insert(cluster, depth, counts, repeat, loop))
+    finally:
+        loop.close()
+        cluster.stop()
+        if destroy:
+            cluster.destroy()
+
+
+_SHORT_QUERIES = [
+    'SELECT 1;',
+    'SELECT User { name } FILTER User.name = $name;',
+    'SELECT count(Issue) FILTER Issue.owner.name = "Elvis";',
+    'INSERT User { name := "Yury", active := true };',
+    'UPDATE User FILTER User.name = "Yury" SET { active := false };',
+]
+
+
+@bench.command('parse')
+@click.option('-n', '--number', type=click.IntRange(min=1), default=10000,
+              help='number of times each query is parsed')
+def parse(*, number):
+    """Measure EdgeQL parse throughput for short queries."""
+
+    from edb.lang import edgeql
+
+    # Exclude loading of the parser tables.
+    edgeql.parse_block(_SHORT_QUERIES[0])
+
+    for query in _SHORT_QUERIES:
+        started = time.monotonic()
+        for _ in range(number):
+            edgeql.parse_block(query)
+        elapsed = time.monotonic() - started
+
+        print(f'{number / elapsed:>10.0f} queries/s  {query}')
+
+
+@bench.command('std-script')
+@click.option('-n', '--number', type=click.IntRange(min=1), default=20,
+              help='number of times the script is processed')
+def std_script(*, number):
+    """Measure lexing and parsing of the std library script."""
+
+    from edb.lang import edgeql
+    from edb.lang import schema as edgedb_schema
+    from edb.lang.edgeql.parser.grammar import lexer as ql_lexer
+
+    path = os.path.join(os.path.dirname(edgedb_schema.__file__), '_std.eql')
+    with open(path, 'r') as f:
+        script = f.read()
+
+    def lex():
+        lexer = ql_lexer.EdgeQLLexer()
+        lexer.setinputstr(script)
+        return sum(1 for _ in lexer.lex())
+
+    def parse():
+        return edgeql.parse_block(script)
+
+    # Exclude loading of the parser tables.
+    parse()
+
+    print(f'{path}: {len(script)} characters, {lex()} tokens')
+
+    for name, func in [('lex', lex), ('parse', parse)]:
+        started = time.monotonic()
+        for _ in range(number):
+            func()
+        elapsed = (time.monotonic() - started) / number
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        print(f'{name:>6}: {elapsed * 1000:.1f}ms, '
+              f'{len(script) / elapsed / 1e6:.2f}M characters/s, '
+              f'peak memory {peak / 1024:.0f}KiB')
+
+
+def _make_query(num_paths, shapes=False):
+    if shapes:
+        paths = ',\n    '.join(
+            f'Type{i} {{ name, ref{i}: {{ name }} }}'
+            for i in range(1, num_paths + 1))
+    else:
+        paths = ',\n    '.join(
+            f'Type{i}.ref{i}.name' for i in range(1, num_paths + 1))
+    return f'WITH MODULE bench\nSELECT (\n    {paths}\n)'
+
+
+@bench.command('compile')
+@click.option(
+    '--paths', 'counts', type=str, default='100,200,500',
+    callback=_parse_counts,
+    help='comma-separated numbers of paths in the benchmarked query')
+@click.option('--repeat', type=click.IntRange(min=1), default=3,
+              help='number of timed compilations for each query')
+@click.option('--shapes', is_flag=True,
+              help='select a shape for every path, deriving views')
+def compile_query(*, counts, repeat, shapes):
+    """Measure EdgeQL to IR compilation time by the number of paths."""
+
+    from edb.lang.edgeql import compiler as ql_compiler
+    from edb.lang.schema import declarative as s_decl
+    from edb.lang.schema import std as s_std
+
+    for num_paths in counts:
+        schema = s_decl.parse_module_declarations(
+            s_std.load_std_schema(),
+            [('bench', _make_schema(num_paths + 1))])
+        query = _make_query(num_paths, shapes=shapes)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.monotonic()
+            ql_compiler.compile_to_ir(query, schema)
+            timings.append(time.monotonic() - started)
+
+        tracemalloc.start()
+        try:
+            ql_compiler.compile_to_ir(query, schema)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        print(f'{num_paths:>6} paths: {min(timings):.3f}s '
+              f'(best of {repeat}), peak memory {peak / 1024:.0f}KiB')
+
+
+def _rebuild_ast(node):
+    from edb.lang.common import ast
+
+    if isinstance(node, ast.AST):
+        return type(node)(**{
+            field: _rebuild_ast(value)
+            for field, value in ast.iter_fields(node)
+        })
+    elif isinstance(node, list):
+        return [_rebuild_ast(n) for n in node]
+    else:
+        return node
+
+
+@bench.command('ast')
+@click.option('-n', '--number', type=click.IntRange(min=1), default=20,
+              help='number of times each operation is performed')
+@click.option('--paths', type=click.IntRange(min=1), default=100,
+              help='number of shaped paths in the benchmarked query')
+def ast_nodes(*, number, paths):
+    """Measure construction and copying of EdgeQL AST nodes."""
+
+    import copy
+
+    from edb.lang import edgeql
+    from edb.lang.common import ast
+
+    tree = edgeql.parse(_make_query(paths, shapes=True))
+    nodes = [tree] + ast.find_children(tree, lambda n: True)
+    num_nodes = len(nodes)
+
+    print(f'{num_nodes} nodes')
+
+    operations = [
+        ('construct', lambda: _rebuild_ast(tree)),
+        ('copy', lambda: [copy.copy(n) for n in nodes]),
+        ('deepcopy', lambda: copy.deepcopy(tree)),
+    ]
+
+    try:
+        for type_checks in (True, False):
+            ast.enable_type_checks(type_checks)
+            print(f'type checks {"on" if type_checks else "off"}:')
+
+            for name, func in operations:
+                started = time.monotonic()
+                for _ in range(number):
+                    func()
+                elapsed = (time.monotonic() - started) / number
+
+                print(f'{name:>10}: {elapsed * 1000:.2f}ms, '
+                      f'{num_nodes / elapsed / 1e6:.2f}M nodes/s')
+    finally:
+        ast.enable_type_checks()
@@ -50,7 +50,7 @@ EXTRA_DEPS = {
 
 
 def _compile_parsers(build_lib, inplace=False):
-    import parsing
+    from edb.lang.common import parsing
 
     import edb.lang.edgeql.parser.grammar.single as edgeql_spec
     import edb.lang.edgeql.parser.grammar.block as edgeql_spec2
@@ -62,15 +62,18 @@ def _compile_parsers(build_lib, inplace=False):
 
     for spec in (edgeql_spec, edgeql_spec2, pgsql_spec,
                  schema_spec, graphql_spec):
-        spec_path = pathlib.Path(spec.__file__).parent
-        subpath = pathlib.Path(str(spec_path)[len(str(base_path)) + 1:])
-        pickle_name = spec.__name__.rpartition('.')[2] + '.pickle'
-        pickle_path = subpath / pickle_name
-        cache = build_lib / pickle_path
+        spec_path = pathlib.Path(parsing.get_spec_path(spec))
+        subpath = spec_path.relative_to(base_path)
+        cache = build_lib / subpath
         cache.parent.mkdir(parents=True, exist_ok=True)
-        parsing.Spec(spec, pickleFile=str(cache), verbose=True)
+
+        if parsing.load_spec(spec, path=str(cache)) is None:
+            print(f'generating parser tables for {spec.__name__}')
+            parsing.save_spec(
+                spec, parsing.build_spec(spec), path=str(cache))
+
         if inplace:
-            shutil.copy2(cache, base_path / pickle_path)
+            shutil.copy2(cache, spec_path)
 
 
 def _compile_build_meta(build_lib, pg_config):
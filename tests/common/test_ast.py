@@ -162,6 +162,27 @@ class ASTBaseTests(unittest.TestCase):
         self.assertEqual(Node().field1, None)
         self.assertEqual(Node().field3, 123)
 
+    def test_common_ast_type_checks(self):
+        class Node(ast.AST):
+            field_str: str
+            field_int: int = 123
+
+        self.assertIn('field_str', Node.__slots__)
+        self.assertFalse(hasattr(Node(), '__dict__'))
+
+        try:
+            ast.enable_type_checks(False)
+            node = Node(field_str=1)
+            node.field_int = 'aaa'
+            self.assertEqual(node.field_str, 1)
+        finally:
+            ast.enable_type_checks()
+
+        with self.assertRaises(TypeError):
+            Node(field_str=1)
+        with self.assertRaises(TypeError):
+            Node().field_int = 'aaa'
+
     def test_common_ast_type_anno(self):
         with self.assertRaisesRegex(RuntimeError, r"Any is not a type"):
             class Node1(ast.AST):
@@ -0,0 +1,46 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2008-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import unittest
+
+from edb.lang.common import context
+
+
+class SourcePointTests(unittest.TestCase):
+
+    def test_common_context_lazy_point(self):
+        linemap = context.LineMap('ab\ncde\n\nf')
+
+        for pointer, line, column in [(0, 1, 1), (2, 1, 3), (3, 2, 1),
+                                      (5, 2, 3), (7, 3, 1), (8, 4, 1),
+                                      (9, 4, 2)]:
+            point = context.SourcePoint.from_offset(linemap, pointer)
+            self.assertEqual(
+                (point.line, point.column, point.pointer),
+                (line, column, pointer))
+
+    def test_common_context_lazy_point_update(self):
+        linemap = context.LineMap('ab\ncde')
+        point = context.SourcePoint.from_offset(linemap, 4)
+        copy = point.copy()
+
+        point.pointer += 10
+        point.column += 1
+        self.assertEqual((point.line, point.column, point.pointer), (2, 3, 14))
+        self.assertEqual((copy.line, copy.column, copy.pointer), (2, 2, 4))
@@ -0,0 +1,60 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2008-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import unittest
+
+from edb.lang.common import lru
+
+
+class LRUMappingTests(unittest.TestCase):
+
+    def test_common_lru_eviction(self):
+        evicted = []
+        m = lru.LRUMapping(maxsize=2, on_evict=evicted.append)
+
+        m['a'] = 1
+        m['b'] = 2
+        self.assertEqual(m.get('a'), 1)
+
+        m['c'] = 3
+        self.assertEqual(evicted, [2])
+        self.assertNotIn('b', m)
+        self.assertEqual(list(m), ['a', 'c'])
+
+        m.clear()
+        self.assertEqual(evicted, [2, 1, 3])
+        self.assertEqual(len(m), 0)
+
+    def test_common_lru_stats(self):
+        m = lru.LRUMapping(maxsize=10)
+        m['a'] = 1
+
+        m.get('a')
+        m.get('a')
+        m.get('b')
+
+        self.assertEqual(
+            m.get_stats(),
+            {'size': 1, 'maxsize': 10, 'hits': 2, 'misses': 1})
+
+    def test_common_lru_disabled(self):
+        m = lru.LRUMapping(maxsize=0)
+        m['a'] = 1
+        self.assertNotIn('a', m)
+        self.assertIsNone(m.get('a'))
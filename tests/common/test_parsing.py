@@ -0,0 +1,85 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2008-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os
+import tempfile
+import unittest
+
+from edb.lang.common import parsing
+from edb.lang.edgeql.parser import parser as ql_parser
+from edb.lang.edgeql.parser.grammar import block, single
+
+
+class ParserSpecTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.spec = ql_parser.EdgeQLExpressionParser().get_parser_spec()
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.spec')
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_common_parsing_spec_roundtrip(self):
+        parsing.save_spec(single, self.spec, path=self.path)
+        spec = parsing.load_spec(single, path=self.path)
+
+        self.assertIsNotNone(spec)
+        self.assertEqual(len(spec._action), len(self.spec._action))
+        self.assertEqual(len(spec._goto), len(self.spec._goto))
+
+    def test_common_parsing_spec_other_grammar(self):
+        parsing.save_spec(single, self.spec, path=self.path)
+        self.assertIsNone(parsing.load_spec(block, path=self.path))
+
+    def test_common_parsing_spec_damaged(self):
+        parsing.save_spec(single, self.spec, path=self.path)
+
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+
+        self.assertIsNone(parsing.load_spec(single, path=self.path))
+
+    def test_common_parsing_spec_missing(self):
+        os.unlink(self.path)
+        self.assertIsNone(parsing.load_spec(single, path=self.path))
+        # Recreate the file for tearDown().
+        open(self.path, 'wb').close()
+
+    def test_common_parsing_pooled(self):
+        cls = ql_parser.EdgeQLExpressionParser
+
+        with cls.pooled() as p1:
+            with cls.pooled() as p2:
+                self.assertIsNot(p1, p2)
+
+        with cls.pooled() as p3:
+            self.assertIn(p3, (p1, p2))
+            p3.parse('SELECT 1')
+
+        with cls.pooled() as p4:
+            # The lexer and the parser driver are reused.
+            self.assertIs(p4.lexer, p3.lexer)
+            self.assertIs(p4.parser, p3.parser)
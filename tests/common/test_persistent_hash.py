@@ -22,6 +22,7 @@ import uuid
 
 from edb.lang.common.persistent_hash import persistent_hash
 from edb.lang.common.persistent_hash import PersistentlyHashable
+from edb.lang.common.persistent_hash import SetHash
 
 
 class PersistentHashTests(unittest.TestCase):
@@ -63,3 +64,17 @@ class PersistentHashTests(unittest.TestCase):
         self.assertTrue(isinstance(PH(), PersistentlyHashable))
 
         self.assertEqual(persistent_hash(PH()), 123)
+
+    def test_common_persistent_hash_set_1(self):
+        items = ('aaaa', 'bbb', 21, 33.123, b'aaa', True, None)
+
+        h = SetHash(persistent_hash(item) for item in items)
+        self.assertEqual(h.value(), persistent_hash(frozenset(items)))
+
+        h.discard(persistent_hash('bbb'))
+        h.add(persistent_hash(42))
+        self.assertEqual(
+            h.value(),
+            persistent_hash(frozenset(items) - {'bbb'} | {42}))
+
+        self.assertEqual(SetHash().value(), persistent_hash(frozenset()))
@@ -838,6 +838,47 @@ class TestConstraintsDDL(tb.DDLTestCase):
                     };
                 """)
 
+    async def test_constraints_ddl_05(self):
+        # unique constraints checked by statement-level triggers
+        qry = r"""
+            CREATE ABSTRACT CONSTRAINT test::batch_unique
+                    EXTENDING std::unique {
+                SET check_per_statement := true;
+            };
+
+            CREATE TYPE test::ConstraintOnTest5 {
+                CREATE PROPERTY test::foo -> std::str {
+                    CREATE CONSTRAINT test::batch_unique;
+                };
+            };
+
+            CREATE TYPE test::ConstraintOnTest5Child
+                EXTENDING test::ConstraintOnTest5;
+        """
+
+        await self.con.execute(qry)
+
+        async with self._run_and_rollback():
+            await self.con.execute("""
+                WITH MODULE test
+                FOR x IN {'a', 'b', 'c'} UNION (
+                    INSERT ConstraintOnTest5Child {
+                        foo := x
+                    }
+                );
+            """)
+
+            with self.assertRaisesRegex(exceptions.ConstraintViolationError,
+                                        'foo violates unique constraint'):
+                await self.con.execute("""
+                    WITH MODULE test
+                    FOR x IN {'c', 'd'} UNION (
+                        INSERT ConstraintOnTest5Child {
+                            foo := x
+                        }
+                    );
+                """)
+
     async def test_constraints_ddl_error_01(self):
         # testing various incorrect create constraint DDL commands
         async with self._run_and_rollback():
@@ -32,3 +32,80 @@ class TestDatabase(tb.ConnectedTestCase):
 
         finally:
             await self.con.execute('DROP DATABASE mytestdb;')
+
+    async def test_database_schema_shared01(self):
+        await self.con.execute('CREATE DATABASE mytestdb2;')
+
+        try:
+            conn1 = await self.cluster.connect(
+                user='edgedb', database='mytestdb2', loop=self.loop)
+            conn2 = await self.cluster.connect(
+                user='edgedb', database='mytestdb2', loop=self.loop)
+
+            try:
+                await conn1.execute('''
+                    CREATE MODULE test;
+                    CREATE TYPE test::SharedSchema01 {
+                        CREATE PROPERTY test::name -> std::str;
+                    };
+                    INSERT test::SharedSchema01 { name := 'one' };
+                ''')
+
+                # The second connection must observe the DDL
+                # committed through the first one.
+                result = await conn2.execute('''
+                    SELECT test::SharedSchema01.name;
+                ''')
+                self.assertEqual(result, [['one']])
+
+            finally:
+                conn1.close()
+                conn2.close()
+
+        finally:
+            await self.con.execute('DROP DATABASE mytestdb2;')
+
+    async def test_database_schema_shared02(self):
+        await self.con.execute('CREATE DATABASE mytestdb3;')
+
+        try:
+            conn1 = await self.cluster.connect(
+                user='edgedb', database='mytestdb3', loop=self.loop)
+            conn2 = await self.cluster.connect(
+                user='edgedb', database='mytestdb3', loop=self.loop)
+
+            try:
+                await conn1.execute('''
+                    CREATE MODULE test;
+                    CREATE TYPE test::SharedSchema02 {
+                        CREATE PROPERTY test::name -> std::str;
+                    };
+                    INSERT test::SharedSchema02 { name := 'one' };
+                ''')
+
+                # Both connections use the shared schema now.
+                result = await conn2.execute('''
+                    SELECT test::SharedSchema02.name;
+                ''')
+                self.assertEqual(result, [['one']])
+
+                # Alter a type in an existing module.
+                await conn1.execute('''
+                    ALTER TYPE test::SharedSchema02 {
+                        CREATE PROPERTY test::title -> std::str;
+                    };
+                    UPDATE test::SharedSchema02 SET { title := 'One' };
+                ''')
+
+                # The second connection must observe the change.
+                result = await conn2.execute('''
+                    SELECT test::SharedSchema02.title;
+                ''')
+                self.assertEqual(result, [['One']])
+
+            finally:
+                conn1.close()
+                conn2.close()
+
+        finally:
+            await self.con.execute('DROP DATABASE mytestdb3;')
@@ -19,8 +19,14 @@
 
 import unittest  # NOQA
 
+import asyncpg
+
 from edb.client import exceptions as client_errors
 from edb.server import _testbase as tb
+from edb.server import planner
+from edb.server import protocol
+from edb.server.pgsql import backend
+from edb.server.pgsql import intromech
 
 
 class TestEdgeQLDDL(tb.DDLTestCase):
@@ -585,3 +591,190 @@ class TestEdgeQLDDL(tb.DDLTestCase):
             await self.con.execute(r"""
                 CREATE ABSTRACT ATTRIBUTE test::bad_attr array<>;
             """)
+
+    async def test_edgeql_ddl_query_cache_01(self):
+        await self.con.execute("""
+            CREATE MODULE qc_a;
+            CREATE MODULE qc_b;
+
+            CREATE FUNCTION qc_a::qc_func() -> std::str
+                FROM SQL $$
+                    SELECT 'a'::text
+                $$;
+
+            CREATE FUNCTION qc_b::qc_func() -> std::str
+                FROM SQL $$
+                    SELECT 'b'::text
+                $$;
+        """)
+
+        # The same query text must not be reused across
+        # different module aliases.
+        await self.con.execute('SET MODULE qc_a;')
+        await self.assert_query_result('SELECT qc_func();', [['a']])
+        await self.assert_query_result('SELECT qc_func();', [['a']])
+
+        await self.con.execute('SET MODULE qc_b;')
+        await self.assert_query_result('SELECT qc_func();', [['b']])
+
+        await self.con.execute('SET MODULE default;')
+
+    async def test_edgeql_ddl_ptr_ids_01(self):
+        # Pointers and types created earlier in the same transaction
+        # are not in the id caches yet, so DML must look their ids up.
+        async with self.con.transaction():
+            await self.con.execute("""
+                CREATE TYPE test::PtrIdTarget {
+                    CREATE PROPERTY test::name -> std::str;
+                };
+
+                CREATE TYPE test::PtrIdSource {
+                    CREATE PROPERTY test::name -> std::str;
+                    CREATE LINK test::ptr_id_target -> test::PtrIdTarget {
+                        CREATE PROPERTY test::weight -> std::int64;
+                    };
+                };
+
+                INSERT test::PtrIdTarget { name := 't1' };
+
+                INSERT test::PtrIdSource {
+                    name := 's1',
+                    ptr_id_target := (
+                        SELECT test::PtrIdTarget { @weight := 7 }
+                        FILTER .name = 't1'
+                    )
+                };
+            """)
+
+            await self.assert_query_result(r"""
+                WITH MODULE test
+                SELECT PtrIdSource {
+                    name,
+                    ptr_id_target: {
+                        name,
+                        @weight
+                    }
+                };
+            """, [
+                [{
+                    'name': 's1',
+                    'ptr_id_target': {
+                        'name': 't1',
+                        '@weight': 7,
+                    },
+                }],
+            ])
+
+        await self.assert_query_result(r"""
+            WITH MODULE test
+            UPDATE PtrIdSource
+            SET {
+                ptr_id_target := (
+                    SELECT PtrIdTarget { @weight := 8 }
+                    FILTER .name = 't1'
+                )
+            };
+
+            WITH MODULE test
+            SELECT PtrIdSource.ptr_id_target@weight;
+        """, [
+            [1],
+            [8],
+        ])
+
+
+class TestEdgeQLDDLSchema(tb.DDLTestCase):
+    """Tests of the schema modified in memory by DDL."""
+
+    async def open_backend(self):
+        pg_spec = await self.con.get_pgcon()
+        pgconn = await asyncpg.connect(
+            host=pg_spec['host'], port=pg_spec['port'],
+            database=self.get_database_name(), user='edgedb',
+            loop=self.loop)
+        self.addCleanup(self.loop.run_until_complete, pgconn.close())
+
+        return await backend.open_database(pgconn)
+
+    async def run_ddl(self, bk, script):
+        timer = protocol.Timer()
+        for stmt in planner.parse_script(
+                script, bk.schema, graphql=False, timer=timer):
+            plan = planner.plan_statement(stmt, bk, timer=timer)
+            await bk.run_ddl_command(plan)
+
+    async def assert_schema_introspected(self, bk):
+        introspected = await intromech.IntrospectionMech(
+            bk.connection).readschema()
+
+        self.assertEqual(
+            dict(bk.schema.get_checksum_details()),
+            dict(introspected.get_checksum_details()))
+
+    async def test_edgeql_ddl_schema_01(self):
+        bk = await self.open_backend()
+
+        for script in ['''
+            CREATE ABSTRACT LINK test::ddl_schema_link {
+                CREATE PROPERTY test::weight -> std::int64;
+            };
+            CREATE TYPE test::DDLSchemaBase {
+                CREATE PROPERTY test::name -> std::str;
+            };
+            CREATE TYPE test::DDLSchema EXTENDING test::DDLSchemaBase {
+                CREATE LINK test::ddl_schema_link -> test::DDLSchemaBase;
+            };
+        ''', '''
+            ALTER TYPE test::DDLSchema {
+                CREATE REQUIRED PROPERTY test::title -> std::str;
+                ALTER LINK test::ddl_schema_link {
+                    SET cardinality := '**';
+                };
+            };
+        ''', '''
+            ALTER TYPE test::DDLSchemaBase RENAME TO test::DDLSchemaBase2;
+        ''', '''
+            ALTER TYPE test::DDLSchema {
+                DROP PROPERTY test::title;
+                DROP LINK test::ddl_schema_link;
+            };
+            DROP TYPE test::DDLSchema;
+            DROP TYPE test::DDLSchemaBase2;
+            DROP ABSTRACT LINK test::ddl_schema_link;
+        ''']:
+            with self.subTest(script=script):
+                await self.run_ddl(bk, script)
+                await self.assert_schema_introspected(bk)
+
+    async def test_edgeql_ddl_schema_02(self):
+        bk = await self.open_backend()
+
+        process_delta = bk.process_delta
+        reloads = []
+        reload_schema = bk._reload_schema
+
+        def bad_process_delta(delta, schema):
+            # Modify the schema unlike the dry run did.
+            plan = process_delta(delta, schema)
+            schema.get('test::DDLSchemaFallback').getptr(
+                schema, 'name').set_attribute('required', True)
+            return plan
+
+        async def counting_reload_schema():
+            reloads.append(True)
+            await reload_schema()
+
+        bk.process_delta = bad_process_delta
+        bk._reload_schema = counting_reload_schema
+
+        await self.run_ddl(bk, '''
+            CREATE TYPE test::DDLSchemaFallback {
+                CREATE PROPERTY test::name -> std::str;
+            };
+        ''')
+
+        # The schema was re-read from Postgres.
+        self.assertEqual(reloads, [True])
+        obj = bk.schema.get('test::DDLSchemaFallback')
+        self.assertFalse(obj.getptr(bk.schema, 'name').required)
+        await self.assert_schema_introspected(bk)
@@ -160,3 +160,124 @@ class TestEdgeQLIRPathID(tb.BaseEdgeQLCompilerTest):
                 '.>(test::deck)[IS test::Card]',
             ]
         )
+
+    def test_edgeql_ir_pathid_memoized_01(self):
+        User = self.schema.get('test::User')
+        deck_ptr = User.getptr(self.schema, 'deck')
+        count_prop = deck_ptr.getptr(self.schema, 'count')
+
+        pid_1 = pathid.PathId(User)
+        pid_2 = pid_1.extend(deck_ptr)
+        prop_pid = pid_2.ptr_path().extend(count_prop)
+
+        # Results are memoized...
+        self.assertIs(pid_1.extend(deck_ptr), pid_2)
+        self.assertIs(prop_pid.src_path(), prop_pid.src_path())
+        self.assertIs(prop_pid.get_prefix(1), prop_pid.get_prefix(1))
+
+        # ...and equal to the freshly computed ones.
+        fresh_1 = pathid.PathId(User)
+        fresh_2 = fresh_1.extend(deck_ptr)
+        fresh_prop = fresh_2.ptr_path().extend(count_prop)
+
+        pairs = [
+            (pid_2, fresh_2),
+            (prop_pid, fresh_prop),
+            (prop_pid.src_path(), fresh_prop.src_path()),
+            (prop_pid.get_prefix(1), fresh_1),
+            (prop_pid.get_prefix(3), fresh_2.ptr_path()),
+            (pid_2.src_path(), fresh_1),
+        ]
+
+        for memoized, fresh in pairs:
+            self.assertIsNot(memoized, fresh)
+            self.assertEqual(memoized, fresh)
+            self.assertEqual(hash(memoized), hash(fresh))
+            self.assertEqual(str(memoized), str(fresh))
+
+    def test_edgeql_ir_pathid_memoized_02(self):
+        User = self.schema.get('test::User')
+        deck_ptr = User.getptr(self.schema, 'deck')
+        count_prop = deck_ptr.getptr(self.schema, 'count')
+
+        ns = frozenset(('foo',))
+        pid_1 = pathid.PathId(User)
+        pid_2 = pid_1.extend(deck_ptr)
+        pid_2_ns = pid_1.extend(deck_ptr, ns=ns)
+
+        # The namespace is a part of the memoization key.
+        self.assertIs(pid_1.extend(deck_ptr, ns=ns), pid_2_ns)
+        self.assertIsNot(pid_2_ns, pid_2)
+        self.assertNotEqual(pid_2_ns, pid_2)
+        self.assertEqual(pid_2_ns.namespace, ns)
+        self.assertIsNone(pid_2.namespace)
+
+        # Results memoized before a namespace change are not reused
+        # for the path with the new namespace.
+        pid_1.extend(deck_ptr).src_path()
+        replaced = pid_2.replace_namespace(ns)
+        self.assertEqual(replaced.namespace, ns)
+        self.assertEqual(replaced.src_path().namespace, ns)
+        self.assertIsNone(pid_2.src_path().namespace)
+        self.assertEqual(
+            replaced.ptr_path().extend(count_prop).namespace, ns)
+
+        stripped = replaced.strip_namespace(ns)
+        self.assertEqual(stripped, pid_2)
+        self.assertEqual(hash(stripped), hash(pid_2))
+
+    def test_edgeql_ir_pathid_memoized_03(self):
+        User = self.schema.get('test::User')
+        deck_ptr = User.getptr(self.schema, 'deck')
+        count_prop = deck_ptr.getptr(self.schema, 'count')
+
+        pid_2 = pathid.PathId(User).extend(deck_ptr)
+        ptr_pid = pid_2.ptr_path()
+        prop_pid = ptr_pid.extend(count_prop)
+
+        self.assertNotEqual(ptr_pid, pid_2)
+        self.assertEqual(ptr_pid.tgt_path(), pid_2)
+        self.assertEqual(hash(ptr_pid.tgt_path()), hash(pid_2))
+        self.assertIs(ptr_pid.extend(count_prop), prop_pid)
+
+        # Extensions of the pointer path are not memoized on the
+        # target path.
+        with self.assertRaisesRegex(ValueError, 'non-link path'):
+            pid_2.extend(count_prop)
+
+    def test_edgeql_ir_pathid_hash_01(self):
+        Card = self.schema.get('test::Card')
+        User = self.schema.get('test::User')
+        owners_ptr = Card.getptr(self.schema, 'owners')
+        deck_ptr = User.getptr(self.schema, 'deck')
+        count_prop = deck_ptr.getptr(self.schema, 'count')
+
+        ns = frozenset(('foo',))
+        path_ids = []
+        for root in (pathid.PathId(Card), pathid.PathId(Card)):
+            for owners in (root.extend(owners_ptr),
+                           root.extend(owners_ptr, ns=ns)):
+                deck = owners.extend(deck_ptr)
+                path_ids.extend([
+                    root, owners, deck, deck.ptr_path(),
+                    deck.ptr_path().extend(count_prop),
+                    deck.ptr_path().tgt_path(),
+                    deck.src_path(), deck.get_prefix(1),
+                    owners.strip_namespace(ns),
+                    owners.merge_namespace(ns),
+                ])
+
+        by_id = {}
+        for path_id in path_ids:
+            by_id.setdefault(path_id, []).append(path_id)
+
+        # Paths built from different roots are the same keys.
+        self.assertLessEqual(len(by_id), len(path_ids) // 2)
+
+        for path_id in path_ids:
+            for other in path_ids:
+                if path_id == other:
+                    self.assertEqual(hash(path_id), hash(other))
+                    self.assertEqual(str(path_id), str(other))
+
+            self.assertIn(path_id, by_id[path_id])
@@ -24,6 +24,8 @@ import textwrap
 from edb.lang import _testbase as tb
 
 from edb.lang.edgeql import compiler, errors
+from edb.lang.ir import pathid
+from edb.lang.ir import scopetree
 
 
 class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
@@ -34,6 +36,7 @@ class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
 
     def run_test(self, *, source, spec, expected):
         ir = compiler.compile_to_ir(source, self.schema)
+        self.assert_indexes_consistent(ir.scope_tree)
 
         path_scope = textwrap.indent(ir.scope_tree.pformat(), '    ')
         expected_scope = textwrap.indent(
@@ -48,6 +51,134 @@ class TestEdgeQLIRScopeTree(tb.BaseEdgeQLCompilerTest):
                 f'\nEXPECTED:\n{expected_scope}\nACTUAL:\n{path_scope}'
                 f'\nDIFF:\n{diff}')
 
+    def assert_indexes_consistent(self, tree):
+        """Check the indexes of every node in *tree* against a full walk."""
+
+        def index(nodes, key):
+            result = {}
+            for node in nodes:
+                if key(node) is not None:
+                    result.setdefault(key(node), set()).add(node)
+            return result
+
+        def path_key(node):
+            return scopetree._path_key(node.path_id)
+
+        def unique_id(node):
+            return node.unique_id
+
+        for node in tree.descendants:
+            with self.subTest(node=node.debugname()):
+                self.assertEqual(
+                    node._child_index, index(node.children, path_key))
+                self.assertEqual(
+                    node._descendant_index,
+                    index(node.strict_descendants, path_key))
+                self.assertEqual(
+                    node._unfenced_index,
+                    index(node.strict_unfenced_descendants, path_key))
+                self.assertEqual(
+                    node._unique_id_index,
+                    index(node.strict_descendants, unique_id))
+
+    def get_path_ids(self):
+        User = self.schema.get('test::User')
+        deck_ptr = User.getptr(self.schema, 'deck')
+        name_ptr = User.getptr(self.schema, 'name')
+
+        user = pathid.PathId(User)
+        deck = user.extend(deck_ptr)
+        name = user.extend(name_ptr)
+
+        return user, deck, name
+
+    def test_edgeql_ir_scope_tree_indexes_01(self):
+        user, deck, name = self.get_path_ids()
+        ns_deck = deck.merge_namespace({'foo'})
+
+        tree = scopetree.ScopeTreeNode(fenced=True)
+        tree.attach_path(deck)
+        self.assert_indexes_consistent(tree)
+
+        branch = tree.attach_branch()
+        fence = branch.attach_fence()
+        fence.attach_path(name)
+        fence.attach_path(ns_deck)
+        self.assert_indexes_consistent(tree)
+
+        self.assertIsNotNone(tree.find_descendant(name))
+        self.assertIsNone(tree.find_unfenced(name)[0])
+        self.assertIs(fence.find_visible(user), tree.find_child(user))
+
+        # Fence changes the reachability of the subtree.
+        fence.fenced = False
+        self.assert_indexes_consistent(tree)
+        self.assertIsNotNone(tree.find_unfenced(name)[0])
+
+        fence.fenced = True
+        self.assert_indexes_consistent(tree)
+        self.assertIsNone(tree.find_unfenced(name)[0])
+
+    def test_edgeql_ir_scope_tree_indexes_02(self):
+        user, deck, name = self.get_path_ids()
+
+        tree = scopetree.ScopeTreeNode(fenced=True)
+        tree.attach_path(user)
+
+        # Fuse a subtree with a path already in the tree.
+        subtree = scopetree.ScopeTreeNode(fenced=True)
+        subtree.attach_path(deck)
+        subtree.attach_path(name)
+        tree.attach_subtree(subtree)
+        self.assert_indexes_consistent(tree)
+        self.assert_indexes_consistent(subtree)
+
+        user_node = tree.find_descendant(user)
+        self.assertIsNotNone(user_node)
+        self.assertIsNotNone(tree.find_descendant(deck))
+
+        # Collapse reattaches the children to the parent.
+        branch = tree.attach_branch()
+        branch.attach_child(scopetree.ScopeTreeNode(path_id=name))
+        branch.collapse()
+        self.assert_indexes_consistent(tree)
+
+        # Removed subtrees are removed from the ancestor indexes
+        # and keep their own.
+        user_node.remove()
+        self.assert_indexes_consistent(tree)
+        self.assert_indexes_consistent(user_node)
+        self.assertIsNone(tree.find_descendant(user))
+
+        tree.remove_descendants(name)
+        self.assert_indexes_consistent(tree)
+        self.assertIsNone(tree.find_descendant(name))
+
+    def test_edgeql_ir_scope_tree_indexes_03(self):
+        user, deck, name = self.get_path_ids()
+
+        tree = scopetree.ScopeTreeNode(fenced=True)
+        tree.attach_path(deck)
+        node = tree.find_descendant(deck)
+
+        node.unique_id = 1
+        self.assert_indexes_consistent(tree)
+        self.assertIs(tree.find_by_unique_id(1), node)
+
+        node.unique_id = 2
+        self.assert_indexes_consistent(tree)
+        self.assertIsNone(tree.find_by_unique_id(1))
+        self.assertIs(tree.find_by_unique_id(2), node)
+
+        node.path_id = deck.merge_namespace({'foo'})
+        self.assert_indexes_consistent(tree)
+        self.assertIsNone(tree.find_descendant(deck))
+        self.assertIs(tree.find_descendant(node.path_id), node)
+
+        copy = tree.copy()
+        self.assert_indexes_consistent(copy)
+        self.assertIsNot(copy.find_by_unique_id(2), node)
+
     def test_edgeql_ir_scope_tree_01(self):
         """
         WITH MODULE test
@@ -0,0 +1,192 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2012-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os.path
+import re
+import uuid
+
+from edb.lang import _testbase as tb
+
+from edb.lang.edgeql import compiler
+
+from edb.server.pgsql import compiler as pgcompiler
+
+
+class TestEdgeQLSQLCodegen(tb.BaseEdgeQLCompilerTest):
+    """Unit tests for the EdgeQL to SQL compilation."""
+
+    SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
+                          'cards.eschema')
+
+    TYPES = ('Named', 'User', 'Card', 'SpecialCard')
+
+    @classmethod
+    def get_id(cls, name):
+        return uuid.uuid5(uuid.NAMESPACE_URL, name)
+
+    @classmethod
+    def get_type_ids(cls, *, exclude=()):
+        return {f'test::{name}': cls.get_id(f'test::{name}')
+                for name in cls.TYPES if name not in exclude}
+
+    def compile(self, source, **kwargs):
+        ir = compiler.compile_to_ir(source, self.schema)
+        sql, _ = pgcompiler.compile_ir_to_sql(
+            ir, schema=self.schema,
+            output_format=pgcompiler.OutputFormat.NATIVE, **kwargs)
+        return sql
+
+    def get_ptr_ids(self, *, exclude=()):
+        user = self.schema.get('test::User')
+        ptr_ids = {}
+        for name in ('deck', 'friends'):
+            ptr = user.getptr(self.schema, name).material_type()
+            if name not in exclude:
+                ptr_ids[ptr.name] = self.get_id(ptr.name)
+        return ptr_ids
+
+    def get_matched_type_ids(self, sql):
+        # The ids of the types matched by IS are inlined as
+        # a uuid[] constant.
+        m = re.search(r"= ANY \(\s*'\{([^}]*)\}'::uuid\[\]", sql)
+        if m is None:
+            return None
+        return {uuid.UUID(type_id) for type_id in m.group(1).split(',')}
+
+    def assert_type_check(self, source, expected, *, type_ids=None):
+        if type_ids is None:
+            type_ids = self.get_type_ids()
+
+        sql = self.compile(source, type_ids=type_ids)
+
+        if expected is None:
+            self.assertIsNone(self.get_matched_type_ids(sql), sql)
+            self.assertIn('edgedb.issubclass(', sql)
+        else:
+            self.assertEqual(
+                self.get_matched_type_ids(sql),
+                {self.get_id(f'test::{name}') for name in expected}, sql)
+            self.assertNotIn('edgedb.issubclass(', sql)
+
+        return sql
+
+    def test_edgeql_sql_codegen_type_check_01(self):
+        self.assert_type_check(
+            'WITH MODULE test SELECT Named IS User', {'User'})
+
+    def test_edgeql_sql_codegen_type_check_02(self):
+        # Subtypes are matched too.
+        self.assert_type_check(
+            'WITH MODULE test SELECT User.deck IS Card',
+            {'Card', 'SpecialCard'})
+
+    def test_edgeql_sql_codegen_type_check_03(self):
+        # An abstract type matches all of its descendants.
+        self.assert_type_check(
+            'WITH MODULE test SELECT Card IS Named',
+            {'Named', 'User', 'Card', 'SpecialCard'})
+
+    def test_edgeql_sql_codegen_type_check_04(self):
+        sql = self.assert_type_check(
+            'WITH MODULE test SELECT Named IS NOT Card',
+            {'Card', 'SpecialCard'})
+        self.assertRegex(sql, r'NOT \(\S+ = ANY \(')
+
+    def test_edgeql_sql_codegen_type_check_05(self):
+        self.assert_type_check(
+            'WITH MODULE test SELECT Named FILTER Named IS (User | Card)',
+            {'User', 'Card', 'SpecialCard'})
+
+    def test_edgeql_sql_codegen_type_check_06(self):
+        # Without the type ids the MRO of the object is checked.
+        self.assert_type_check(
+            'WITH MODULE test SELECT Named IS Card', None, type_ids={})
+
+    def test_edgeql_sql_codegen_type_check_07(self):
+        # The id of a subtype is missing, e.g. because it was
+        # created by an uncommitted DDL command.
+        self.assert_type_check(
+            'WITH MODULE test SELECT Named IS Card', None,
+            type_ids=self.get_type_ids(exclude={'SpecialCard'}))
+
+    def test_edgeql_sql_codegen_type_check_08(self):
+        # Views are derived types, their ids are not known statically.
+        self.assert_type_check(
+            '''
+                WITH
+                    MODULE test,
+                    V := (SELECT Card FILTER .cost > 1)
+                SELECT Named IS V
+            ''', None)
+
+    def test_edgeql_sql_codegen_insert_type_id_01(self):
+        sql = self.compile(
+            'WITH MODULE test INSERT User { name := "x" }',
+            type_ids=self.get_type_ids())
+
+        self.assertIn(f"'{self.get_id('test::User')}'::uuid", sql)
+        self.assertNotIn('edgedb.objecttype', sql)
+
+    def test_edgeql_sql_codegen_insert_type_id_02(self):
+        # The type was created by an uncommitted DDL command.
+        sql = self.compile(
+            'WITH MODULE test INSERT User { name := "x" }',
+            type_ids=self.get_type_ids(exclude={'User'}))
+
+        self.assertNotIn(f"'{self.get_id('test::User')}'::uuid", sql)
+        self.assertIn('edgedb.objecttype', sql)
+        self.assertIn("'test::User'", sql)
+
+    def test_edgeql_sql_codegen_link_ptr_id_01(self):
+        deck = self.schema.get('test::User').getptr(
+            self.schema, 'deck').material_type()
+
+        cards = '(SELECT Card { @count := 2 })'
+        for stmt in (f'INSERT User {{ name := "x", deck := {cards} }}',
+                     f'UPDATE User SET {{ deck := {cards} }}'):
+            with self.subTest(stmt=stmt):
+                sql = self.compile(
+                    f'WITH MODULE test {stmt}',
+                    type_ids=self.get_type_ids(),
+                    ptr_ids=self.get_ptr_ids())
+
+                self.assertIn(f"'{self.get_id(deck.name)}'::uuid", sql)
+                self.assertNotIn('edgedb.pointer', sql)
+
+    def test_edgeql_sql_codegen_link_ptr_id_02(self):
+        deck = self.schema.get('test::User').getptr(
+            self.schema, 'deck').material_type()
+
+        # The link was created earlier in the same transaction,
+        # so its id is not known yet and is looked up by name.
+        for ptr_ids in (None, self.get_ptr_ids(exclude={'deck'})):
+            with self.subTest(ptr_ids=ptr_ids):
+                sql = self.compile(
+                    """
+                        WITH MODULE test
+                        INSERT User {
+                            name := "x",
+                            deck := (SELECT Card { @count := 2 })
+                        }
+                    """,
+                    type_ids=self.get_type_ids(), ptr_ids=ptr_ids)
+
+                self.assertNotIn(f"'{self.get_id(deck.name)}'::uuid", sql)
+                self.assertIn('edgedb.pointer', sql)
+                self.assertIn(f"'{deck.name}'", sql)
@@ -0,0 +1,130 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import unittest
+
+from edb.lang import edgeql
+from edb.lang.common import lexer
+from edb.lang.edgeql.parser.grammar import keywords as ql_keywords
+from edb.lang.edgeql.parser.grammar import lexer as ql_lexer
+from edb.lang.schema.parser.grammar import keywords as s_keywords
+from edb.lang.schema.parser.grammar import lexer as s_lexer
+from edb.server.pgsql.parser import keywords as pg_keywords
+from edb.server.pgsql.parser import lexer as pg_lexer
+
+
+class LexerTest(unittest.TestCase):
+    lexer_class = None
+
+    def lex(self, text, *, skip=('WS', 'NL', 'NEWLINE')):
+        lex = self.lexer_class()
+        lex.setinputstr(text)
+        return [(tok.type, tok.text) for tok in lex.lex()
+                if tok.type not in skip]
+
+    def assert_keywords(self, keywords):
+        for keyword, (token, _) in keywords.items():
+            for text in (keyword, keyword.upper(), keyword.capitalize()):
+                with self.subTest(text=text):
+                    self.assertEqual(self.lex(text), [(token, text)])
+
+
+class TestEdgeQLLexer(LexerTest):
+    lexer_class = ql_lexer.EdgeQLLexer
+
+    def test_edgeql_lexer_keywords_01(self):
+        self.assert_keywords(ql_keywords.edgeql_keywords)
+
+    def test_edgeql_lexer_keywords_02(self):
+        self.assertEqual(
+            self.lex('SELECT select Select sElEcT 1select select1 select_x'),
+            [('SELECT', 'SELECT'), ('SELECT', 'select'),
+             ('SELECT', 'Select'), ('SELECT', 'sElEcT'),
+             ('ICONST', '1'), ('IDENT', 'select'),
+             ('IDENT', 'select1'), ('IDENT', 'select_x')])
+
+    def test_edgeql_lexer_keywords_03(self):
+        self.assertEqual(
+            self.lex('User.set Object {name} FILTER .name = `select`'),
+            [('IDENT', 'User'), ('.', '.'), ('SET', 'set'),
+             ('IDENT', 'Object'), ('{', '{'), ('IDENT', 'name'),
+             ('}', '}'), ('FILTER', 'FILTER'), ('.', '.'),
+             ('IDENT', 'name'), ('=', '='), ('IDENT', '`select`')])
+
+    def test_edgeql_lexer_unreserved_keywords_01(self):
+        # Unreserved keywords are lexed as keywords, the grammar
+        # accepts them as identifiers.
+        self.assertEqual(
+            self.lex('WITH MODULE scalar SELECT Abstract.EVENT'),
+            [('WITH', 'WITH'), ('MODULE', 'MODULE'),
+             ('SCALAR', 'scalar'), ('SELECT', 'SELECT'),
+             ('ABSTRACT', 'Abstract'), ('.', '.'), ('EVENT', 'EVENT')])
+
+        tree = edgeql.parse('WITH MODULE scalar SELECT Abstract.EVENT')
+        self.assertEqual(
+            edgeql.generate_source(tree, pretty=False),
+            'WITH MODULE scalar SELECT Abstract.EVENT')
+
+    def test_edgeql_lexer_badident_01(self):
+        self.assertEqual(
+            self.lex('__source__ __Subject__'),
+            [('DUNDERSOURCE', '__source__'),
+             ('DUNDERSUBJECT', '__Subject__')])
+
+        with self.assertRaisesRegex(lexer.UnknownTokenError, '__foo__'):
+            self.lex('SELECT __foo__')
+
+        with self.assertRaisesRegex(lexer.UnknownTokenError, '__foo__'):
+            self.lex('SELECT `__foo__`')
+
+
+class TestEdgeSchemaLexer(LexerTest):
+    lexer_class = s_lexer.EdgeSchemaLexer
+
+    def test_schema_lexer_keywords_01(self):
+        self.assertEqual(
+            self.lex('Abstract TYPE Foo:\n    property event -> str\n'),
+            [('ABSTRACT', 'Abstract'), ('TYPE', 'TYPE'), ('IDENT', 'Foo'),
+             ('COLON', ':'), ('INDENT', ''), ('PROPERTY', 'property'),
+             ('EVENT', 'event'), ('ARROW', '->'), ('RAWSTRING', ' str'),
+             ('RAWSTRING', ''), ('DEDENT', '')])
+
+    def test_schema_lexer_keywords_02(self):
+        self.assertEqual(
+            self.lex('type typeX extending Bar\n'),
+            [('TYPE', 'type'), ('IDENT', 'typeX'),
+             ('EXTENDING', 'extending'), ('RAWSTRING', ' Bar'),
+             ('RAWSTRING', '')])
+
+    def test_schema_lexer_keywords_03(self):
+        self.assert_keywords(s_keywords.edge_schema_keywords)
+
+
+class TestPgSQLLexer(LexerTest):
+    lexer_class = pg_lexer.PgSQLLexer
+
+    def test_pgsql_lexer_keywords_01(self):
+        self.assert_keywords(pg_keywords.pg_keywords)
+
+    def test_pgsql_lexer_keywords_02(self):
+        self.assertEqual(
+            self.lex('SELECT select$x, Foo FROM bar where x'),
+            [('SELECT', 'SELECT'), ('IDENT', 'select$x'), (',', ','),
+             ('IDENT', 'Foo'), ('FROM', 'FROM'), ('IDENT', 'bar'),
+             ('WHERE', 'where'), ('IDENT', 'x')])
@@ -18,9 +18,14 @@
 
 
 from edb.lang import _testbase as tb
+from edb.lang import edgeql
+from edb.lang.schema import ddl as s_ddl
+from edb.lang.schema import delta as sd
 from edb.lang.schema import error as s_err
 from edb.lang.schema import pointers as s_pointers
 
+from edb.server.pgsql import schemacache
+
 
 class TestSchema(tb.BaseSchemaTest):
     def test_schema_inherited_01(self):
@@ -129,3 +134,148 @@ class TestSchema(tb.BaseSchemaTest):
         obj = schema.get('test::Object')
         self.assertEqual(obj.getptr(schema, 'foo_plus_bar').cardinality,
                          s_pointers.PointerCardinality.ManyToMany)
+
+    def test_schema_snapshot_01(self):
+        schema = self.load_schema("""
+            type Object:
+                property foo -> str
+                link bar -> Object
+        """)
+
+        restored = schemacache.loads(schemacache.dumps(schema))
+
+        self.assertEqual(restored.get_checksum(), schema.get_checksum())
+
+        obj = restored.get('test::Object')
+        self.assertIsNot(obj, schema.get('test::Object'))
+        self.assertIs(obj.getptr(restored, 'bar').target, obj)
+
+    def test_schema_snapshot_02(self):
+        schema = self.load_schema("""
+            type Object:
+                property foo -> str
+        """)
+
+        entry = schemacache.SchemaCacheEntry(
+            dbname='test', schema=schema, checksum=schema.get_checksum(),
+            version=1, intro_caches={})
+
+        copy = entry.copy_schema()
+        self.assertIsNot(copy, entry.copy_schema())
+
+        ddl = edgeql.parse_block(
+            'ALTER TYPE test::Object { CREATE PROPERTY test::bar -> str; };')
+        cmd = s_ddl.delta_from_ddl(ddl[0], schema=copy, modaliases={})
+        cmd.apply(copy, sd.CommandContext())
+
+        self.assertIsNotNone(copy.get('test::Object').getptr(copy, 'bar'))
+        self.assertIsNone(schema.get('test::Object').getptr(schema, 'bar'))
+        self.assertNotEqual(copy.get_checksum(), entry.checksum)
+        self.assertEqual(schema.get_checksum(), entry.checksum)
+
+    def test_schema_snapshot_03(self):
+        schema = self.load_schema("""
+            type Object:
+                property foo -> str
+        """)
+
+        class IntrospectionMech:
+            def __init__(self, schema):
+                self.schema = schema
+
+            def get_cache_snapshot(self):
+                return {}
+
+        cache = schemacache.SchemaCache()
+        entry1 = cache.publish('test', IntrospectionMech(schema))
+        self.assertIs(cache.get('test'), entry1)
+
+        # Every published schema is a new version, whether or not
+        # the checksum has changed.
+        entry2 = cache.publish('test', IntrospectionMech(schema))
+        self.assertEqual(entry2.checksum, entry1.checksum)
+        self.assertGreater(entry2.version, entry1.version)
+        self.assertIs(cache.get('test'), entry2)
+
+    def test_schema_inheritance_index_01(self):
+        schema = self.load_schema("""
+            type Base:
+                property name -> str
+
+            type Child1 extending Base
+
+            type Child2 extending Base
+
+            type GrandChild extending Child1
+        """)
+
+        base = schema.get('test::Base')
+        child1 = schema.get('test::Child1')
+        child2 = schema.get('test::Child2')
+        grandchild = schema.get('test::GrandChild')
+
+        self.assertEqual(base.children(schema), {child1, child2})
+        self.assertEqual(child1.children(schema), {grandchild})
+
+        grandchild.bases = [base]
+        schema.drop_inheritance_cache_for_child(grandchild)
+
+        self.assertEqual(base.children(schema), {child1, child2, grandchild})
+        self.assertEqual(child1.children(schema), set())
+
+        schema.delete(child2)
+        self.assertEqual(base.children(schema), {child1, grandchild})
+
+    def test_schema_inheritance_index_02(self):
+        schema = self.load_schema("""
+            type Base:
+                property name -> str
+
+            type Child extending Base
+        """)
+
+        base = schema.get('test::Base')
+        child = schema.get('test::Child')
+        self.assertEqual(base.children(schema), {child})
+
+        ddl = edgeql.parse_block(
+            'ALTER TYPE test::Base RENAME TO test::Base2;')
+        cmd = s_ddl.delta_from_ddl(ddl[0], schema=schema, modaliases={})
+        cmd.apply(schema, sd.CommandContext())
+
+        self.assertIs(schema.get('test::Base2'), base)
+        self.assertEqual(base.children(schema), {child})
+        self.assertEqual(child.bases, [base])
+
+    def test_schema_checksum_01(self):
+        schema = self.load_schema("""
+            type Base:
+                property name -> str
+
+            type Object extending Base:
+                property foo -> str
+        """)
+
+        checksum = schema.get_checksum()
+        self.assertEqual(schema.get_checksum(), checksum)
+
+        obj = schema.get('test::Object')
+        foo = obj.getptr(schema, 'foo')
+
+        foo.set_attribute('required', True)
+        changed = schema.get_checksum()
+        self.assertNotEqual(changed, checksum)
+
+        # The incrementally maintained checksum must match the one
+        # computed from scratch.
+        self.assertEqual(
+            changed, self.load_schema("""
+                type Base:
+                    property name -> str
+
+                type Object extending Base:
+                    required property foo -> str
+            """).get_checksum())
+
+        foo.set_attribute('required', False)
+        self.assertEqual(schema.get_checksum(), checksum)
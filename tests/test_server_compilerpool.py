@@ -0,0 +1,144 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+
+import asyncio
+import os.path
+import uuid
+
+from edb.lang import _testbase as tb
+from edb.lang import edgeql
+from edb.lang.common import exceptions
+from edb.lang.common import parsing
+from edb.lang.edgeql import errors as ql_errors
+from edb.lang.schema import ddl as s_ddl
+from edb.lang.schema import delta as sd
+
+from edb.server import compilerpool
+from edb.server import protocol
+from edb.server.pgsql import compiler as pg_compiler
+from edb.server.pgsql import intromech
+from edb.server.pgsql import schemacache
+
+
+class TestServerCompilerPool(tb.BaseEdgeQLCompilerTest):
+    SCHEMA = os.path.join(os.path.dirname(__file__), 'schemas',
+                          'cards.eschema')
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+        self.pool = compilerpool.CompilerPool(size=1, loop=self.loop)
+        self.pool.start()
+        self.addCleanup(self.pool.close)
+
+    def make_entry(self, schema, version):
+        intro = intromech.IntrospectionMech(None)
+        intro.schema = schema
+        # Backend ids are assigned when types are created in the
+        # database, make up some.
+        for obj in schema.get_objects():
+            intro.type_cache[obj.name] = uuid.uuid5(
+                uuid.NAMESPACE_URL, obj.name)
+
+        return schemacache.SchemaCacheEntry(
+            dbname='test', schema=schema, checksum=schema.get_checksum(),
+            version=version, intro_caches=intro.get_cache_snapshot())
+
+    def compile(self, entry, script):
+        return self.loop.run_until_complete(
+            self.pool.compile(
+                entry, script, modaliases={None: 'test'}, graphql=False,
+                flags={}, timer=protocol.Timer(),
+                output_format=pg_compiler.OutputFormat.JSON))
+
+    def kill_worker(self):
+        [worker] = self.pool._workers
+        worker.process.kill()
+        worker.process.join()
+
+    def test_server_compilerpool_compile_01(self):
+        entry = self.make_entry(self.schema, 1)
+
+        plans = self.compile(entry, 'SELECT Card.name; SELECT User;')
+        self.assertEqual(len(plans), 2)
+        self.assertIn('SELECT', plans[0].text)
+
+        # Scripts that are not just queries are compiled in process.
+        self.assertIsNone(self.compile(
+            entry, 'SELECT Card; CREATE TYPE test::Foo;'))
+
+    def test_server_compilerpool_error_01(self):
+        entry = self.make_entry(self.schema, 1)
+
+        # Compilation errors are raised as if the script was
+        # compiled in process.
+        with self.assertRaises(ql_errors.EdgeQLSyntaxError) as ctx:
+            self.compile(entry, 'SELECT Card FILTER;')
+
+        srcctx = exceptions.get_context(ctx.exception, parsing.ParserContext)
+        self.assertEqual(srcctx.start.pointer, 18)
+
+        with self.assertRaisesRegex(exceptions.EdgeDBError, 'no_such_ptr'):
+            self.compile(entry, 'SELECT Card.no_such_ptr;')
+
+        # The worker is still usable.
+        self.assertEqual(len(self.compile(entry, 'SELECT Card;')), 1)
+
+    def test_server_compilerpool_schema_version_01(self):
+        entry1 = self.make_entry(self.schema, 1)
+        self.assertEqual(len(self.compile(entry1, 'SELECT Card;')), 1)
+
+        schema = entry1.copy_schema()
+        ddl = edgeql.parse_block(
+            'ALTER TYPE test::Card { CREATE PROPERTY test::rarity -> str; };')
+        cmd = s_ddl.delta_from_ddl(ddl[0], schema=schema, modaliases={})
+        cmd.apply(schema, sd.CommandContext())
+        entry2 = self.make_entry(schema, 2)
+
+        # The worker must switch to the schema of the new version.
+        plans = self.compile(entry2, 'SELECT Card.rarity;')
+        self.assertEqual(len(plans), 1)
+
+        # And back, the worker has the old version no longer.
+        with self.assertRaisesRegex(exceptions.EdgeDBError, 'rarity'):
+            self.compile(entry1, 'SELECT Card.rarity;')
+
+    def test_server_compilerpool_worker_crash_01(self):
+        entry = self.make_entry(self.schema, 1)
+        self.assertEqual(len(self.compile(entry, 'SELECT Card;')), 1)
+
+        self.kill_worker()
+
+        # The script is compiled in process and the worker
+        # is replaced.
+        self.assertIsNone(self.compile(entry, 'SELECT Card;'))
+        self.assertEqual(len(self.compile(entry, 'SELECT Card;')), 1)
+
+    def test_server_compilerpool_worker_crash_02(self):
+        entry = self.make_entry(self.schema, 1)
+        # Make the snapshot unloadable.
+        entry._pickled = b'not a snapshot'
+
+        self.assertIsNone(self.compile(entry, 'SELECT Card;'))
+
+        # The worker is still usable.
+        entry = self.make_entry(self.schema, 2)
+        self.assertEqual(len(self.compile(entry, 'SELECT Card;')), 1)
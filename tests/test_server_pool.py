@@ -0,0 +1,284 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+
+import asyncio
+import unittest
+
+from edb.server.pgsql import pool as pgpool
+
+
+class Connection:
+    """A stand-in for an asyncpg connection."""
+
+    def __init__(self, num):
+        self.num = num
+        self.closed = False
+        self.terminated = False
+        self.in_transaction = False
+
+    def is_closed(self):
+        return self.closed
+
+    def is_in_transaction(self):
+        return self.in_transaction
+
+    async def close(self):
+        self.closed = True
+
+    def terminate(self):
+        self.closed = True
+        self.terminated = True
+
+
+class TestServerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.connections = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    async def connect(self):
+        await asyncio.sleep(0)
+        con = Connection(len(self.connections))
+        self.connections.append(con)
+        return con
+
+    def make_pool(self, *, min_size=0, max_size=2, idle_timeout=0,
+                  connect=None):
+        return pgpool.Pool(
+            connect or self.connect, min_size=min_size, max_size=max_size,
+            idle_timeout=idle_timeout, stmt_cache_size=10, loop=self.loop)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_server_pool_acquire_01(self):
+        pool = self.make_pool(min_size=1)
+        self.run_async(pool.start())
+        self.assertEqual(len(self.connections), 1)
+
+        pconn1 = self.run_async(pool.acquire())
+        self.assertIs(pconn1.connection, self.connections[0])
+
+        pconn2 = self.run_async(pool.acquire())
+        self.assertIs(pconn2.connection, self.connections[1])
+
+        # Released connections are reused, the most recently
+        # released one first.
+        pool.release(pconn1)
+        pool.release(pconn2)
+        self.assertIs(self.run_async(pool.acquire()), pconn2)
+        self.assertIs(self.run_async(pool.acquire()), pconn1)
+        self.assertEqual(len(self.connections), 2)
+
+    def test_server_pool_acquire_02(self):
+        failing = True
+
+        async def connect():
+            if failing:
+                raise ConnectionError('cannot connect')
+            return await self.connect()
+
+        pool = self.make_pool(max_size=1, connect=connect)
+
+        with self.assertRaises(ConnectionError):
+            self.run_async(pool.acquire())
+
+        # The failed attempt does not count towards the pool size.
+        failing = False
+        pconn = self.run_async(pool.acquire())
+        self.assertIs(pconn.connection, self.connections[0])
+
+    def test_server_pool_waiters_01(self):
+        pool = self.make_pool(max_size=1)
+        pconn = self.run_async(pool.acquire())
+
+        order = []
+
+        async def client(num):
+            pconn = await pool.acquire()
+            order.append(num)
+            await asyncio.sleep(0)
+            pool.release(pconn)
+
+        async def test():
+            clients = [self.loop.create_task(client(i)) for i in range(3)]
+            await asyncio.sleep(0.01)
+            # All clients wait for the connection to be released.
+            self.assertEqual(order, [])
+
+            pool.release(pconn)
+            await asyncio.gather(*clients)
+
+        self.run_async(test())
+
+        # The waiters are served in order, with a single connection.
+        self.assertEqual(order, [0, 1, 2])
+        self.assertEqual(len(self.connections), 1)
+
+    def test_server_pool_waiters_02(self):
+        pool = self.make_pool(max_size=1)
+        pconn = self.run_async(pool.acquire())
+
+        async def test():
+            waiter1 = self.loop.create_task(pool.acquire())
+            waiter2 = self.loop.create_task(pool.acquire())
+            await asyncio.sleep(0)
+
+            # The first waiter is woken up, but cancelled before
+            # it gets the connection, the turn is passed on.
+            pool.release(pconn)
+            waiter1.cancel()
+
+            self.assertIs(await waiter2, pconn)
+
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter1
+
+        self.run_async(test())
+
+    def test_server_pool_waiters_03(self):
+        pool = self.make_pool(max_size=1)
+        self.run_async(pool.acquire())
+
+        async def test():
+            waiter = self.loop.create_task(pool.acquire())
+            await asyncio.sleep(0)
+
+            await pool.close()
+
+            with self.assertRaisesRegex(RuntimeError, 'closed'):
+                await waiter
+
+        self.run_async(test())
+
+    def test_server_pool_reap_01(self):
+        pool = self.make_pool(min_size=1, max_size=3, idle_timeout=0.05)
+        self.run_async(pool.start())
+
+        async def test():
+            pconns = [await pool.acquire() for _ in range(3)]
+            for pconn in pconns:
+                pool.release(pconn)
+
+            await asyncio.sleep(0.2)
+
+        self.run_async(test())
+
+        # Connections above the minimum size are closed once idle.
+        self.assertEqual(
+            [con.closed for con in self.connections], [True, True, False])
+
+        # The remaining connection is still used.
+        pconn = self.run_async(pool.acquire())
+        self.assertIs(pconn.connection, self.connections[2])
+        pconn2 = self.run_async(pool.acquire())
+        self.assertIs(pconn2.connection, self.connections[3])
+
+    def test_server_pool_reap_02(self):
+        pool = self.make_pool(max_size=2, idle_timeout=0.2)
+
+        async def test():
+            pconn1 = await pool.acquire()
+            pconn2 = await pool.acquire()
+            pool.release(pconn1)
+            await asyncio.sleep(0.1)
+
+            # Recently released connections are kept.
+            pool.release(pconn2)
+            await asyncio.sleep(0.15)
+            self.assertEqual(
+                [con.closed for con in self.connections], [True, False])
+
+            await asyncio.sleep(0.3)
+            self.assertEqual(
+                [con.closed for con in self.connections], [True, True])
+
+        self.run_async(test())
+
+    def test_server_pool_transaction_01(self):
+        pool = self.make_pool(max_size=2)
+
+        pconn1 = self.run_async(pool.acquire())
+        pconn1.connection.in_transaction = True
+
+        # A connection inside a transaction is held by its client,
+        # other clients get a different one.
+        pconn2 = self.run_async(pool.acquire())
+        self.assertIsNot(pconn2, pconn1)
+        pool.release(pconn2)
+        self.assertIs(self.run_async(pool.acquire()), pconn2)
+        pool.release(pconn2)
+
+        # Once committed, the connection is shared again.
+        pconn1.connection.in_transaction = False
+        pool.release(pconn1)
+        self.assertIs(self.run_async(pool.acquire()), pconn1)
+
+    def test_server_pool_transaction_02(self):
+        pool = self.make_pool(max_size=1)
+
+        pconn = self.run_async(pool.acquire())
+        pconn.connection.in_transaction = True
+
+        # A connection released in the middle of a transaction
+        # cannot be reused, it is closed and replaced.
+        pool.release(pconn)
+        self.assertTrue(pconn.connection.terminated)
+
+        pconn2 = self.run_async(pool.acquire())
+        self.assertIsNot(pconn2, pconn)
+        self.assertFalse(pconn2.connection.closed)
+
+    def test_server_pool_broken_01(self):
+        pool = self.make_pool(max_size=2)
+
+        pconn1 = self.run_async(pool.acquire())
+        pconn2 = self.run_async(pool.acquire())
+        pool.release(pconn1)
+        pool.release(pconn2)
+
+        # Idle connections closed by the server are skipped.
+        pconn2.connection.closed = True
+        self.assertIs(self.run_async(pool.acquire()), pconn1)
+
+        # The broken connection no longer counts towards the size.
+        pconn3 = self.run_async(pool.acquire())
+        self.assertIs(pconn3.connection, self.connections[2])
+
+    def test_server_pool_broken_02(self):
+        pool = self.make_pool(max_size=1)
+        pconn = self.run_async(pool.acquire())
+
+        async def test():
+            waiter = self.loop.create_task(pool.acquire())
+            await asyncio.sleep(0)
+
+            # A connection in an unknown state is discarded and
+            # a waiting client gets a new one.
+            pool.discard(pconn)
+            self.assertTrue(pconn.connection.terminated)
+
+            pconn2 = await waiter
+            self.assertIsNot(pconn2, pconn)
+
+        self.run_async(test())
@@ -17,6 +17,8 @@
 #
 
 
+import asyncio
+
 from edb.client import exceptions as err
 from edb.server import _testbase as tb
 
@@ -117,3 +119,49 @@ class TestSession(tb.QueryTestCase):
 
             [['entity', 'user']]
         ])
+
+    async def test_session_pipelining_01(self):
+        # Requests sent without waiting for the preceding results
+        # are executed in order and matched to their responses.
+        results = await asyncio.gather(
+            self.con.execute('SELECT User.name;'),
+            self.con.execute('SELECT 1 / 0;'),
+            self.con.execute('WITH MODULE foo SELECT Entity.name;'),
+            return_exceptions=True)
+
+        self.assertEqual(results[0], [['user']])
+        self.assertIsInstance(results[1], err.EdgeDBError)
+        self.assertEqual(results[2], [['entity']])
+
+    async def test_session_stream_01(self):
+        result = []
+        async for obj in self.con.stream('''
+            SELECT {User.name, (WITH MODULE foo SELECT Entity.name)}
+        ''', chunk_size=1):
+            result.append(obj)
+
+        self.assertEqual(sorted(result), ['entity', 'user'])
+
+    async def test_session_stream_02(self):
+        with self.assertRaisesRegex(err.EdgeDBError, 'single query'):
+            async for _ in self.con.stream('SELECT 1; SELECT 2;'):
+                pass
+
+        # The connection is still usable.
+        await self.assert_query_result('SELECT 1;', [[1]])
+
+    async def test_session_stream_03(self):
+        query = 'SELECT {1, 2, 3, 4, 5, 6, 7, 8, 9, 10};'
+
+        # Abandoning a stream does not block later requests.
+        async for _ in self.con.stream(query, chunk_size=1):
+            break
+
+        await self.assert_query_result('SELECT 1;', [[1]])
+
+        async with self.con.stream(query, chunk_size=1) as stream:
+            async for _ in stream:
+                break
+
+        self.assertEqual([obj async for obj in stream], [])
+        await self.assert_query_result('SELECT 1;', [[1]])
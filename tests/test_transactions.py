@@ -216,3 +216,41 @@ class TestTransactions(tb.QueryTestCase):
             async with tr:
                 async with tr:
                     pass
+
+    async def test_transaction_isolation_01(self):
+        # Backend connections are shared by client connections
+        # between requests, but one held by an open transaction
+        # must not be used for other clients' requests.
+        con2 = await self.cluster.connect(
+            user='edgedb', database=self.get_database_name(),
+            loop=self.loop)
+
+        try:
+            async with self.con.transaction():
+                await self.con.execute('''
+                    INSERT test::TransactionTest {
+                        name := 'Isolation 01'
+                    };
+                ''')
+
+                for _ in range(3):
+                    result = await con2.execute('''
+                        SELECT test::TransactionTest.name
+                        FILTER test::TransactionTest.name = 'Isolation 01';
+                    ''')
+                    self.assertEqual(result, [[]])
+
+                result = await self.con.execute('''
+                    SELECT test::TransactionTest.name
+                    FILTER test::TransactionTest.name = 'Isolation 01';
+                ''')
+                self.assertEqual(result, [['Isolation 01']])
+
+            result = await con2.execute('''
+                SELECT test::TransactionTest.name
+                FILTER test::TransactionTest.name = 'Isolation 01';
+            ''')
+            self.assertEqual(result, [['Isolation 01']])
+
+        finally:
+            con2.close()
@@ -0,0 +1,139 @@
+#
+# This source file is part of the EdgeDB open source project.
+#
+# Copyright 2016-present MagicStack Inc. and the EdgeDB authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+import unittest
+
+from edb.api import wire
+from edb.server import protocol
+
+
+class TestWire(unittest.TestCase):
+
+    def test_wire_value_roundtrip(self):
+        values = [
+            None, True, False, 0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 80,
+            1.5, '', 'строка', b'\x00\x01', [], [1, [2, [3]]],
+            {'a': {'b': None}, 1: [True]},
+        ]
+
+        for value in values:
+            buf = bytearray()
+            wire.encode_value(value, buf)
+            decoded, pos = wire.decode_value(buf)
+            self.assertEqual(decoded, value)
+            self.assertEqual(pos, len(buf))
+
+    def test_wire_value_unsupported(self):
+        with self.assertRaisesRegex(TypeError, 'cannot encode'):
+            wire.encode_value(object(), bytearray())
+
+    def test_wire_frames_split(self):
+        data = b''.join(
+            wire.encode_message(wire.MSG_SCRIPT, i, {'script': 'x' * i})
+            for i in range(10))
+
+        # Feed the stream in small chunks that do not line up
+        # with frame boundaries.
+        reader = wire.FrameReader()
+        messages = []
+        for i in range(0, len(data), 7):
+            messages.extend(reader.feed(data[i:i + 7]))
+
+        self.assertEqual(
+            messages,
+            [(wire.MSG_SCRIPT, i, {'script': 'x' * i}) for i in range(10)])
+
+    def test_wire_frames_batch(self):
+        data = b''.join(
+            wire.encode_message(wire.MSG_RESULT, i, [i]) for i in range(3))
+
+        # All complete messages are returned at once, the incomplete
+        # one is retained.
+        reader = wire.FrameReader()
+        messages = reader.feed(data + data[:5])
+        self.assertEqual([m[1] for m in messages], [0, 1, 2])
+
+        messages = reader.feed(data[5:])
+        self.assertEqual([m[1] for m in messages], [0, 1, 2])
+
+    def test_wire_frames_truncated_payload(self):
+        msg = wire.encode_message(wire.MSG_SCRIPT, 1, 'abc')
+        # Shorten the string but keep the frame length consistent.
+        msg[-4:] = b''
+        msg[5:9] = (len(msg) - wire.frame_header.size).to_bytes(4, 'big')
+
+        with self.assertRaisesRegex(wire.ProtocolError, 'unexpected end'):
+            wire.FrameReader().feed(msg)
+
+    def test_wire_raw_json(self):
+        buf = bytearray()
+        wire.encode_value(
+            {'result': [wire.RawJSON(b'[{"a": 1}, null]')]}, buf)
+
+        decoded, _ = wire.decode_value(buf)
+        self.assertEqual(decoded, {'result': [[{'a': 1}, None]]})
+
+    def make_frame(self, payload, *, mtype=wire.MSG_SCRIPT, request_id=1):
+        return bytes(wire.frame_header.pack(mtype, request_id, len(payload)) +
+                     payload)
+
+    def test_wire_frames_malformed(self):
+        nested = bytes([wire.TAG_LIST]) + (1).to_bytes(4, 'big')
+
+        payloads = {
+            'invalid utf-8': b's\x00\x00\x00\x02\xff\xfe',
+            'invalid bigint': b'I\x00\x00\x00\x03abc',
+            'invalid json': b'j\x00\x00\x00\x01{',
+            'unhashable key': b'm\x00\x00\x00\x01l\x00\x00\x00\x00N',
+            'excessive nesting': nested * 100000 + b'N',
+        }
+
+        for name, payload in payloads.items():
+            with self.subTest(name=name):
+                with self.assertRaisesRegex(wire.ProtocolError,
+                                            'malformed message'):
+                    wire.FrameReader().feed(self.make_frame(payload))
+
+    def test_wire_protocol_malformed(self):
+        class Transport:
+            closed = False
+            data = b''
+
+            def write(self, data):
+                self.data += data
+
+            def close(self):
+                self.closed = True
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        transport = Transport()
+        proto = protocol.Protocol(None, loop)
+        proto.connection_made(transport)
+
+        # The error is reported to the client instead of escaping
+        # from the event loop callback.
+        proto.data_received(self.make_frame(b's\x00\x00\x00\x01\xff'))
+
+        self.assertTrue(transport.closed)
+        [(mtype, _, error)] = wire.FrameReader().feed(transport.data)
+        self.assertEqual(mtype, wire.MSG_ERROR)
+        self.assertIn('malformed message', error['M'])